@@ -1,18 +1,25 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Taken before the heavy imports so startup timing covers them
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from tkinterdnd2 import DND_FILES, TkinterDnD
-from PIL import Image, ImageTk
 import os
 import sys
-import pygame
+import threading
+import queue
 import json
 import base64
+import codecs
 import pickle
 import zlib
 from datetime import datetime
 import shutil
+import sqlite3
 import uuid  # Added for proper widget IDs
+import weakref
+import atexit
+from collections import deque
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -24,6 +31,339 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+# Set True to draw background.png (from the notebook, current or app directory) behind pages
+PAGE_BACKGROUNDS = False
+
+# Page surfaces kept alive: the visible spread plus the spreads either side of it
+PAGE_POOL_SIZE = 6
+
+# Estimated memory (decoded images, PhotoImages, widgets) that bound pages may use
+# before the least recently viewed hidden pages are unloaded
+MEMORY_BUDGET_MB = 256
+
+# Image extensions accepted by import and drag and drop
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+
+# Draw textboxes that aren't being edited as canvas text (a real Text widget is
+# only built while a box is being edited)
+STATIC_TEXTBOXES = True
+
+# Keep every saved version in .history next to the notebook (pages shared between versions)
+NOTEBOOK_HISTORY = True
+
+# Notebooks saved with this extension are kept in SQLite (pages, widgets and text runs as rows)
+STORE_EXTENSION = ".notebookdb"
+NOTEBOOK_FILETYPES = [("Notebook files", "*.notebook"), ("Notebook database", "*.notebookdb"), ("All files", "*.*")]
+
+# Catalog of known notebooks (page names, counts, covers, full-text index) for the Library window
+LIBRARY_FILE = os.path.join(os.path.expanduser("~"), ".notebook_library.sqlite")
+
+# Arrow key presses closer together than this (key auto-repeat) are collapsed into one jump
+FLIP_SETTLE_MS = 90
+
+# Set NOTEBOOK_DEBUG=1 to also log routine actions (page switches, copied images, ...)
+LOG_DEBUG = bool(os.environ.get("NOTEBOOK_DEBUG"))
+
+class StartupTimer:
+    """Records startup milestones relative to process start"""
+    def __init__(self, t0):
+        self.t0 = t0
+        self.marks = []
+        
+    def mark(self, label):
+        """Record a milestone and return seconds since process start"""
+        elapsed = time.perf_counter() - self.t0
+        self.marks.append((label, elapsed))
+        return elapsed
+    
+    def report(self):
+        """Get a one-line summary of all milestones"""
+        return ", ".join(f"{label} {elapsed * 1000:.0f} ms" for label, elapsed in self.marks)
+
+class EventLog:
+    """Levelled log kept in a ring buffer and written to stdout by a background thread
+    
+    A record is (time, level, message, fields). The message is only formatted
+    with its fields when the writer thread gets to it, so logging costs the
+    caller one deque append, and a disabled level costs one comparison. If
+    the console can't keep up, the oldest unwritten records are dropped
+    instead of blocking the UI.
+    """
+    DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+    LEVEL_NAMES = {10: "DEBUG", 20: "INFO", 30: "WARNING", 40: "ERROR"}
+    SIZE = 1000             # Records kept in memory
+    FLUSH_INTERVAL = 0.25   # Seconds between writes (warnings and errors wake the writer at once)
+    
+    def __init__(self, level):
+        self.level = level
+        self.records = deque(maxlen=self.SIZE)
+        self.appended = 0   # Records logged so far
+        self.written = 0    # Of those, written out or dropped
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.writer = None
+    
+    def debug(self, message, **fields):
+        if self.level <= self.DEBUG:
+            self.log(self.DEBUG, message, fields)
+    
+    def info(self, message, **fields):
+        if self.level <= self.INFO:
+            self.log(self.INFO, message, fields)
+    
+    def warning(self, message, **fields):
+        if self.level <= self.WARNING:
+            self.log(self.WARNING, message, fields)
+    
+    def error(self, message, **fields):
+        self.log(self.ERROR, message, fields)
+    
+    def log(self, level, message, fields):
+        """Queue a record; message is a str.format template for fields"""
+        with self.lock:
+            self.records.append((time.time(), level, message, fields))
+            self.appended += 1
+        if self.writer is None:
+            self.start()
+        if level >= self.WARNING:
+            self.wake.set()
+    
+    def start(self):
+        with self.lock:
+            if self.writer is not None:
+                return
+            self.writer = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.flush)
+    
+    def run(self):
+        while True:
+            self.wake.wait(self.FLUSH_INTERVAL)
+            self.wake.clear()
+            self.flush()
+    
+    def flush(self):
+        """Write out everything logged since the last flush"""
+        with self.lock:
+            pending = self.appended - self.written
+            kept = min(pending, len(self.records))
+            batch = list(self.records)[len(self.records) - kept:] if kept else []
+            self.written = self.appended
+        if not pending:
+            return
+        
+        lines = []
+        if pending > kept:
+            lines.append(f"... {pending - kept} log records dropped")
+        for record in batch:
+            lines.append(self.format(record))
+        stream = sys.stdout
+        if stream is None:
+            return  # pythonw has no console
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            pass  # Console closed
+    
+    def format(self, record):
+        timestamp, level, message, fields = record
+        if fields:
+            try:
+                message = message.format(**fields)
+            except (KeyError, IndexError, ValueError):
+                message = f"{message} {fields}"
+        return f"{time.strftime('%H:%M:%S', time.localtime(timestamp))} {self.LEVEL_NAMES[level]:7} {message}"
+
+
+LOG = EventLog(EventLog.DEBUG if LOG_DEBUG else EventLog.INFO)
+
+
+class LatencyMonitor:
+    """Watchdog for the Tk event loop
+    
+    A tick scheduled with root.after every TICK_MS records how late it fires;
+    instrumented handlers record how long they ran. Anything over STALL_MS
+    goes into a rolling log, and a late tick is blamed on the slowest handler
+    that ran since the previous one.
+    """
+    TICK_MS = 100
+    STALL_MS = 150
+    LOG_SIZE = 200
+    
+    def __init__(self, root):
+        self.root = root
+        self.log = deque(maxlen=self.LOG_SIZE)  # (time, source, ms, detail)
+        self.stack = []          # [name, start, slowest child] of handlers running now
+        self.slowest = None      # (name, ms) of the slowest handler since the last tick
+        self.expected = None
+        self.job = None
+    
+    def start(self):
+        self.expected = time.perf_counter() + self.TICK_MS / 1000
+        self.job = self.root.after(self.TICK_MS, self.tick)
+    
+    def stop(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+    
+    def tick(self):
+        now = time.perf_counter()
+        late = (now - self.expected) * 1000
+        if late > self.STALL_MS:
+            culprit = f"{self.slowest[0]} ran {self.slowest[1]:.0f} ms" if self.slowest else "no instrumented handler"
+            self.record("event loop", late, culprit)
+        self.slowest = None
+        self.expected = now + self.TICK_MS / 1000
+        self.job = self.root.after(self.TICK_MS, self.tick)
+    
+    def wrap(self, name, handler):
+        """handler, timed under name"""
+        def timed(*args, **kwargs):
+            frame = [name, time.perf_counter(), None]
+            self.stack.append(frame)
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                self.stack.pop()
+                self.finished(frame)
+        
+        timed.__name__ = getattr(handler, "__name__", name)
+        timed.__wrapped__ = handler
+        return timed
+    
+    def finished(self, frame):
+        name, start, child = frame
+        ms = (time.perf_counter() - start) * 1000
+        if self.stack:
+            # Nested call - the outermost handler is the one reported
+            parent = self.stack[-1]
+            if parent[2] is None or ms > parent[2][1]:
+                parent[2] = (name, ms)
+            return
+        if self.slowest is None or ms > self.slowest[1]:
+            self.slowest = (name, ms)
+        if ms > self.STALL_MS:
+            self.record(name, ms, f"mostly in {child[0]} ({child[1]:.0f} ms)" if child else "")
+    
+    def instrument(self, owner, names):
+        """Replace owner's methods with timed ones (before they are bound to events)"""
+        for name in names:
+            handler = getattr(owner, name, None)
+            if handler is not None and not hasattr(handler, "__wrapped__"):
+                setattr(owner, name, self.wrap(f"{getattr(owner, '__name__', type(owner).__name__)}.{name}", handler))
+    
+    def record(self, source, ms, detail=""):
+        self.log.append((datetime.now(), source, ms, detail))
+        LOG.warning("UI stall: {source} {ms:.0f} ms{detail}", source=source, ms=ms, detail=f" - {detail}" if detail else "")
+    
+    def report(self):
+        """The rolling log as text, newest last"""
+        if not self.log:
+            return f"No stalls over {self.STALL_MS} ms recorded"
+        return "\n".join(
+            f"{when:%H:%M:%S}  {ms:6.0f} ms  {source}" + (f"  ({detail})" if detail else "")
+            for when, source, ms, detail in self.log
+        )
+
+
+class ResourceTracker:
+    """Live counts of objects whose cleanup is done by hand, through weak references
+    
+    Objects are registered where they are created and drop out of the count
+    when they are garbage collected, so a count that keeps climbing over
+    identical work is a leak.
+    """
+    def __init__(self):
+        self.live = {}     # kind -> {id: weakref}
+        self.created = {}  # kind -> total registered
+    
+    def track(self, obj, kind=None):
+        """Count obj until it is collected; returns obj"""
+        kind = kind or type(obj).__name__
+        refs = self.live.setdefault(kind, {})
+        key = id(obj)
+        # Keyed by id - not every tracked type is hashable (PIL images compare by content)
+        refs[key] = weakref.ref(obj, lambda ref, refs=refs, key=key: refs.get(key) is ref and refs.pop(key))
+        self.created[kind] = self.created.get(kind, 0) + 1
+        return obj
+    
+    def counts(self):
+        return {kind: len(refs) for kind, refs in self.live.items()}
+    
+    def report(self):
+        return "\n".join(
+            f"{kind:20} {len(refs):7} live {self.created[kind]:9} created"
+            for kind, refs in sorted(self.live.items())
+        )
+
+
+RESOURCES = ResourceTracker()
+
+
+def current_rss():
+    """Resident memory of this process in bytes (None where it can't be read)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+        
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+        
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(
+                ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def tracemalloc_report(limit):
+    """Top allocation sites by line (the first call only starts tracing)"""
+    import tracemalloc
+    
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        return "Allocation tracing started.\nUse the notebook for a while, then take another snapshot."
+    
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f"Traced since start: {format_bytes(current)} now, {format_bytes(peak)} peak", ""]
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{format_bytes(stat.size):>10} {stat.count:8} blocks  {os.path.basename(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+# Allocation sites listed by the memory window's snapshot
+TRACEMALLOC_TOP = 25
+
+# RSS growth the leak test tolerates (allocator noise) before calling it a leak
+LEAK_RSS_SLACK = 16 * 1024 * 1024
+
+# NotebookApp methods timed by the LatencyMonitor (event handlers and what they commonly run)
+UI_HANDLERS = (
+    "next_page", "previous_page", "next_focus_page", "previous_focus_page", "go_to_page", "focus_on_page",
+    "check_mouse_position", "check_mouse_for_top_bar", "handle_global_click", "check_click_outside_sidebar",
+    "update_sidebar_page_list", "update_visible_thumbnails", "toggle_sidebar", "toggle_overview",
+    "save_notebook", "load_notebook", "paste_from_clipboard", "apply_flip"
+)
+
 # Try to load custom fonts
 def load_custom_fonts():
     """Load custom fonts if they exist"""
@@ -45,20 +385,235 @@ def load_custom_fonts():
             
             for path in paths_to_try:
                 if os.path.exists(path):
-                    print(f"Found font file: {path}")
+                    LOG.debug("Found font file: {path}", path=path)
                     loaded_fonts.append(path)
                     break
         except Exception as e:
-            print(f"Could not load font {font_file}: {e}")
+            LOG.warning("Could not load font {font}: {error}", font=font_file, error=e)
     
     return loaded_fonts
 
-# Load fonts at module level
-CUSTOM_FONTS = load_custom_fonts()
-HAS_CUSTOM_FONT = len(CUSTOM_FONTS) > 0
+# Fonts are discovered in the background so the filesystem probing stays off the startup path
+CUSTOM_FONTS = []
+HAS_CUSTOM_FONT = False
+_font_discovery_thread = None
+
+def _discover_fonts():
+    """Populate CUSTOM_FONTS/HAS_CUSTOM_FONT (runs on a worker thread)"""
+    global CUSTOM_FONTS, HAS_CUSTOM_FONT
+    CUSTOM_FONTS = load_custom_fonts()
+    HAS_CUSTOM_FONT = len(CUSTOM_FONTS) > 0
+
+def start_font_discovery():
+    """Start font discovery in the background if it isn't running yet"""
+    global _font_discovery_thread
+    if _font_discovery_thread is None:
+        _font_discovery_thread = threading.Thread(target=_discover_fonts, daemon=True)
+        _font_discovery_thread.start()
+
+def wait_for_fonts():
+    """Block until font discovery has finished (normally already done)"""
+    start_font_discovery()
+    _font_discovery_thread.join()
+
+class LightWidget:
+    """Plain Tk stand-in for the CustomTkinter widgets used many times over
+    
+    CTk widgets draw their rounded corners and borders on a canvas of their own;
+    the Light* classes take the same CTk options (fg_color, text_color,
+    border_color, ...) and map them onto plain Tk ones. Corners are square.
+    """
+    def _tk_options(self, options):
+        """Translate CTk-style options to Tk ones"""
+        result = {}
+        for key, value in options.items():
+            if key == "fg_color":
+                result["bg"] = self._resolve_color(value)
+            elif key == "text_color":
+                result["fg"] = value
+            elif key == "border_color":
+                result["highlightbackground"] = value
+                result["highlightcolor"] = value
+            elif key == "border_width":
+                result["highlightthickness"] = value
+            elif key == "hover_color":
+                self.hover_color = value
+            elif key == "corner_radius":
+                pass
+            else:
+                result[key] = value
+        return result
+    
+    def _resolve_color(self, color):
+        """'transparent' means the parent's background"""
+        if color != "transparent":
+            return color
+        try:
+            return self.master.cget("bg")
+        except (tk.TclError, ValueError):
+            return "#c1a273"
+    
+    def configure(self, cnf=None, **kwargs):
+        return super().configure(cnf, **self._tk_options(kwargs))
+    
+    config = configure
+    
+    def cget(self, key):
+        key = {"fg_color": "bg", "text_color": "fg", "border_color": "highlightbackground",
+               "border_width": "highlightthickness"}.get(key, key)
+        if key == "hover_color":
+            return self.hover_color
+        return super().cget(key)
+
+
+class LightFrame(LightWidget, tk.Frame):
+    """tk.Frame that takes CTkFrame options"""
+    def __init__(self, master, **kwargs):
+        self.master = master
+        self.hover_color = None
+        options = {"highlightthickness": 0, "borderwidth": 0}
+        options.update(self._tk_options(kwargs))
+        tk.Frame.__init__(self, master, **options)
+
+
+_BLANK_IMAGE = None
+
+
+class LightLabel(LightWidget, tk.Label):
+    """tk.Label that takes CTkLabel options (width/height in pixels)"""
+    def __init__(self, master, **kwargs):
+        global _BLANK_IMAGE
+        self.master = master
+        self.hover_color = None
+        options = {"borderwidth": 0, "highlightthickness": 0}
+        options.update(self._tk_options(kwargs))
+        if "width" in options or "height" in options:
+            # With an image a Label is sized in pixels, like the CTk widgets
+            if _BLANK_IMAGE is None:
+                _BLANK_IMAGE = tk.PhotoImage(width=1, height=1)
+            options.setdefault("image", _BLANK_IMAGE)
+            options.setdefault("compound", "center")
+            options.setdefault("padx", 0)
+            options.setdefault("pady", 0)
+        tk.Label.__init__(self, master, **options)
+
+
+class LightButton(LightLabel):
+    """LightLabel that behaves like a CTkButton (hover color, command on release)"""
+    def __init__(self, master, command=None, state="normal", **kwargs):
+        kwargs.setdefault("cursor", "hand2")
+        super().__init__(master, **kwargs)
+        self.command = command
+        self.state = state
+        self.normal_color = self.cget("bg")
+        self.bind("<Enter>", self._on_enter)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<ButtonRelease-1>", self._on_release)
+    
+    def configure(self, cnf=None, **kwargs):
+        if "command" in kwargs:
+            self.command = kwargs.pop("command")
+        if "state" in kwargs:
+            self.state = kwargs.pop("state")
+        result = super().configure(cnf, **kwargs)
+        if "fg_color" in kwargs:
+            self.normal_color = self.cget("bg")
+        return result
+    
+    config = configure
+    
+    def cget(self, key):
+        if key == "fg_color":
+            return self.normal_color  # Not the hover color while the pointer is over it
+        return super().cget(key)
+    
+    def _on_enter(self, event):
+        if self.hover_color and self.state != "disabled":
+            tk.Label.configure(self, bg=self.hover_color)
+    
+    def _on_leave(self, event):
+        tk.Label.configure(self, bg=self.normal_color)
+    
+    def _on_release(self, event):
+        # Like a button: only fires if released over it
+        if (self.state != "disabled" and self.command is not None
+                and 0 <= event.x < self.winfo_width() and 0 <= event.y < self.winfo_height()):
+            self.command()
+
+
+# Bindtags routed by the EventDispatcher
+TEXTBOX_TAG = "NotebookTextbox"
+TEXTBOX_FRAME_TAG = "NotebookTextboxFrame"
+MOVE_HANDLE_TAG = "NotebookMoveHandle"
+RESIZE_HANDLE_TAG = "NotebookResizeHandle"
+PAGE_CANVAS_TAG = "NotebookPageCanvas"
+
+
+class EventDispatcher:
+    """Class-level event bindings for widgets that exist many times over
+    
+    Instead of binding handlers on each widget, a widget gets a shared bindtag
+    and is registered with the object that owns it. Each handler is bound once
+    per (tag, sequence) with bind_class and looks the owner up by widget path.
+    """
+    def __init__(self, root, monitor=None):
+        self.root = root
+        self.monitor = monitor  # LatencyMonitor timing the handlers
+        self.owners = {}  # Widget path -> owning object
+        self.tags = set()
+    
+    def bind(self, tag, sequence, handler):
+        """Call handler(owner, event) for the sequence on every widget registered under tag"""
+        if tag not in self.tags:
+            self.tags.add(tag)
+            self.root.bind_class(tag, "<Destroy>", self._forget, add="+")
+        if self.monitor is not None:
+            name = getattr(handler, "__name__", "<lambda>")
+            handler = self.monitor.wrap(f"{tag if name == '<lambda>' else name} {sequence}", handler)
+        
+        def dispatch(event):
+            owner = self.owners.get(str(event.widget))
+            if owner is not None:
+                return handler(owner, event)
+        
+        self.root.bind_class(tag, sequence, dispatch, add="+")
+    
+    def register(self, widget, tag, owner):
+        """Route the tag's events on widget to owner"""
+        self.owners[str(widget)] = owner
+        tags = widget.bindtags()
+        if tag not in tags:
+            # Right after the widget's own tag, where per-widget bindings used to run
+            widget.bindtags(tags[:1] + (tag,) + tags[1:])
+    
+    def _forget(self, event):
+        self.owners.pop(str(event.widget), None)
+
+
+class OutlineRect:
+    """Rectangle outline drawn with four thin frames over a parent widget"""
+    def __init__(self, parent, color="#5d4037", thickness=2):
+        self.edges = [tk.Frame(parent, bg=color, borderwidth=0, highlightthickness=0) for _ in range(4)]
+        self.thickness = thickness
+    
+    def show(self, x, y, width, height):
+        t = self.thickness
+        top, bottom, left, right = self.edges
+        top.place(x=x, y=y, width=width, height=t)
+        bottom.place(x=x, y=y + height - t, width=width, height=t)
+        left.place(x=x, y=y, width=t, height=height)
+        right.place(x=x + width - t, y=y, width=t, height=height)
+        for edge in self.edges:
+            edge.lift()
+    
+    def destroy(self):
+        for edge in self.edges:
+            edge.destroy()
+
 
 class FormattedTextWidget:
     """Custom widget that combines CTkFrame with tk.Text for formatting"""
+    FRAME_MS = 16  # Drag/resize updates are applied at most this often
     def __init__(self, parent, x, y, width, height, page_color="#c1a273", widget_id=None):
         self.parent = parent
         self.x = x
@@ -69,9 +624,10 @@ class FormattedTextWidget:
         self.has_focus = False
         # Use UUID for permanent, portable widget IDs
         self.widget_id = widget_id or str(uuid.uuid4())
+        RESOURCES.track(self)
         
         # Create container frame
-        self.frame = ctk.CTkFrame(
+        self.frame = LightFrame(
             parent,
             fg_color="transparent",
             border_width=0,
@@ -114,17 +670,23 @@ class FormattedTextWidget:
         # Store all created tags for serialization
         self.created_tags = set()
         
+        # Shared FormattingToolbar and owning Page (set by the page)
+        self.toolbar = None
+        self.page = None
+        
 
         
         # Store position and size
         self.is_dragging = False
         self.is_resizing = False
+        self.pointer = None     # Latest (x_root, y_root) during a drag/resize
+        self.motion_job = None  # Pending per-frame update
+        self.outline = None     # OutlineRect while resizing
         
         # Create resize and move handles
         self.create_handles()
         
-        # Bind events
-        self.setup_event_bindings()
+        # Events reach this widget through the app's EventDispatcher (see register_events)
         
     def create_handles(self):
         """Create resize and move handles"""
@@ -184,42 +746,21 @@ class FormattedTextWidget:
         self.is_resizing = True
         self.frame.configure(cursor="sizing" if sys.platform != "darwin" else "bottom_right_corner")
         
-    def setup_event_bindings(self):
-        """Setup event bindings for text widget and handles"""
-        # TEXT WIDGET: Only for text editing, not moving
-        self.text_widget.bind("<Button-1>", self.on_text_click)
-        self.text_widget.bind("<B1-Motion>", self.on_text_motion)
-        
-        # FRAME: For moving via the frame itself (alternative to button)
-        self.frame.bind("<Button-1>", self.start_drag_via_frame)
-        self.frame.bind("<B1-Motion>", self.do_drag)
-        self.frame.bind("<ButtonRelease-1>", self.stop_drag)
-        
-        # RESIZE HANDLE events
-        self.resize_handle.bind("<Button-1>", self.start_resize)
-        self.resize_handle.bind("<B1-Motion>", self.do_resize)
-        self.resize_handle.bind("<ButtonRelease-1>", self.stop_resize)
-        
-        # MOVE HANDLE events
-        self.move_handle.bind("<Button-1>", self.start_drag)
-        self.move_handle.bind("<B1-Motion>", self.do_drag)
-        self.move_handle.bind("<ButtonRelease-1>", self.stop_drag)
-        
-        # Show/hide handles on hover
-        self.frame.bind("<Enter>", self.show_handles)
-        self.frame.bind("<Leave>", self.hide_handles)
-        self.text_widget.bind("<Enter>", self.show_handles)
-        self.text_widget.bind("<Leave>", self.hide_handles)
-        
-        # NEW: Bind focus events directly to the text widget
-        self.text_widget.bind("<FocusIn>", self.on_focus_in)
-        self.text_widget.bind("<FocusOut>", self.on_focus_out)
-        
-        # NEW: Clear placeholder on first click
-        self.text_widget.bind("<Button-1>", self.clear_placeholder_on_first_click, add="+")
-        
-        # NEW: Track text selection
-        self.text_widget.bind("<Button-1>", self.handle_text_selection, add="+")
+    def register_events(self, dispatcher):
+        """Route events on this textbox's widgets to it (bindings are per class)"""
+        dispatcher.register(self.text_widget, TEXTBOX_TAG, self)
+        dispatcher.register(self.frame, TEXTBOX_FRAME_TAG, self)
+        dispatcher.register(self.move_handle, MOVE_HANDLE_TAG, self)
+        dispatcher.register(self.resize_handle, RESIZE_HANDLE_TAG, self)
+
+    def widgets(self):
+        """Tk widgets that make up this textbox"""
+        return [self.text_widget, self.frame, self.handles_frame, self.move_handle, self.resize_handle]
+
+    def on_insert_moved(self, event=None):
+        """Refresh the shared toolbar when the insert point moves"""
+        if self.toolbar is not None and self.toolbar.target is self:
+            self.toolbar.refresh_font_size()
 
     def clear_placeholder_on_first_click(self, event):
         """Clear placeholder text on first click"""
@@ -237,18 +778,6 @@ class FormattedTextWidget:
         self.text_widget.focus_set()
         return "continue"  # Let tkinter continue with normal text selection
         
-    def on_text_click(self, event):
-        """Handle click inside text widget - only for text selection"""
-        # Don't start drag when clicking in text widget
-        self.is_dragging = False
-        # Let tkinter handle text selection normally
-        return
-    
-    def on_text_motion(self, event):
-        """Handle motion in text widget - only for text selection"""
-        # Don't drag when selecting text
-        return
-    
     def start_drag_via_frame(self, event):
         """Start dragging when clicking on frame (not text)"""
         # Check if we're clicking on the frame background, not text widget
@@ -277,14 +806,21 @@ class FormattedTextWidget:
         self.resize_handle.configure(bg="#5d4037")
         
         # Move toolbar if visible
-        if hasattr(self, "formatting_frame") and self.formatting_frame.winfo_ismapped():
-            self.formatting_frame.place(x=self.x, y=self.y-40)
+        if self.toolbar is not None:
+            self.toolbar.follow(self)
     
     def on_focus_out(self, event=None):
         """Handle focus out - hide border and handles"""
         self.has_focus = False
         self.is_dragging = False
         self.is_resizing = False
+        # Drop a drag/resize that was cut short
+        if self.motion_job is not None:
+            self.frame.after_cancel(self.motion_job)
+            self.motion_job = None
+        if self.outline is not None:
+            self.outline.destroy()
+            self.outline = None
         self.frame.configure(border_color=self.page_color, border_width=0)
         self.text_widget.configure(bg=self.page_color)
         # Hide handles when not focused
@@ -299,46 +835,69 @@ class FormattedTextWidget:
         self.is_resizing = False
         self.drag_start_x = event.x_root
         self.drag_start_y = event.y_root
-        self.drag_start_frame_x = self.frame.winfo_x()
-        self.drag_start_frame_y = self.frame.winfo_y()
+        self.drag_start_frame_x = self.x
+        self.drag_start_frame_y = self.y
+        # The page doesn't change size mid-drag - ask once
+        self.drag_bounds = (self.parent.winfo_width(), self.parent.winfo_height())
         
         # Change cursor to move cursor
         self.frame.configure(cursor="fleur" if sys.platform != "darwin" else "hand2")
         self.text_widget.configure(cursor="fleur" if sys.platform != "darwin" else "hand2")
         
     def do_drag(self, event):
-        """Drag the widget"""
+        """Drag the widget (applied at most once per frame)"""
         if not self.is_dragging:
             return
-
-        dx = event.x_root - self.drag_start_x
-        dy = event.y_root - self.drag_start_y
-
-        new_x = self.drag_start_frame_x + dx
-        new_y = self.drag_start_frame_y + dy
-
-        parent_width = self.parent.winfo_width()
-        parent_height = self.parent.winfo_height()
-
-        new_x = max(0, min(new_x, parent_width - self.width))
-        new_y = max(0, min(new_y, parent_height - self.height))
-
-        self.frame.place(x=new_x, y=new_y)
-        self.x = new_x
-        self.y = new_y
-
-        # Move toolbar if visible
-        if hasattr(self, "formatting_frame") and self.formatting_frame.winfo_ismapped():
-            self.formatting_frame.place(x=self.x, y=self.y-40)
-
-        self.drag_start_x = event.x_root
-        self.drag_start_y = event.y_root
-        self.drag_start_frame_x = new_x
-        self.drag_start_frame_y = new_y
+        self.pointer = (event.x_root, event.y_root)
+        self.schedule_motion()
+    
+    def schedule_motion(self):
+        """Coalesce motion events into one update per frame"""
+        if self.motion_job is None:
+            self.motion_job = self.frame.after(self.FRAME_MS, self.apply_motion)
+    
+    def flush_motion(self):
+        """Apply pending motion right away"""
+        if self.motion_job is not None:
+            self.frame.after_cancel(self.motion_job)
+            self.apply_motion()
+    
+    def apply_motion(self):
+        """Apply the latest pointer position to the drag or resize in progress"""
+        self.motion_job = None
+        if self.pointer is None:
+            return
+        x_root, y_root = self.pointer
+        parent_width, parent_height = self.drag_bounds
+        
+        if self.is_dragging:
+            new_x = self.drag_start_frame_x + x_root - self.drag_start_x
+            new_y = self.drag_start_frame_y + y_root - self.drag_start_y
+            new_x = max(0, min(new_x, parent_width - self.width))
+            new_y = max(0, min(new_y, parent_height - self.height))
+            
+            self.frame.place(x=new_x, y=new_y)
+            self.x = new_x
+            self.y = new_y
+            
+            # Move toolbar if visible
+            if self.toolbar is not None:
+                self.toolbar.follow(self)
+        
+        elif self.is_resizing:
+            # Only the outline follows the pointer; the text re-wraps on release
+            new_width = max(100, self.resize_start_width + x_root - self.resize_start_x)
+            new_height = max(60, self.resize_start_height + y_root - self.resize_start_y)
+            self.resize_width = min(new_width, parent_width - self.x)
+            self.resize_height = min(new_height, parent_height - self.y)
+            self.outline.show(self.x, self.y, self.resize_width, self.resize_height)
         
     def stop_drag(self, event):
         """Stop dragging"""
+        if self.is_dragging:
+            self.flush_motion()
         self.is_dragging = False
+        self.pointer = None
         # Reset cursor
         self.frame.configure(cursor="")
         self.text_widget.configure(cursor="xterm")
@@ -351,55 +910,39 @@ class FormattedTextWidget:
         self.resize_start_y = event.y_root
         self.resize_start_width = self.width
         self.resize_start_height = self.height
+        self.resize_width = self.width
+        self.resize_height = self.height
+        self.drag_bounds = (self.parent.winfo_width(), self.parent.winfo_height())
+        
+        # Outline shown while resizing
+        self.outline = OutlineRect(self.parent)
+        self.outline.show(self.x, self.y, self.width, self.height)
         
         # Change cursor to resize cursor
         self.frame.configure(cursor="sizing" if sys.platform != "darwin" else "bottom_right_corner")
         self.text_widget.configure(cursor="sizing" if sys.platform != "darwin" else "bottom_right_corner")
         
     def do_resize(self, event):
-        """Resize the widget"""
+        """Resize the widget (the outline is updated at most once per frame)"""
         if not self.is_resizing:
             return
-            
-        dx = event.x_root - self.resize_start_x
-        dy = event.y_root - self.resize_start_y
-        
-        new_width = max(100, self.resize_start_width + dx)
-        new_height = max(60, self.resize_start_height + dy)
-        
-        self.width = new_width
-        self.height = new_height
-        self.frame.configure(width=new_width, height=new_height)
-
-        if hasattr(self, "formatting_frame") and self.formatting_frame.winfo_ismapped():
-            self.formatting_frame.place(x=self.x, y=self.y-40)
-        
-        chars = max(10, int(new_width / 7))
-        lines = max(3, int(new_height / 20))
-        self.text_widget.configure(width=chars, height=lines)
-        
-        current_x = self.frame.winfo_x()
-        current_y = self.frame.winfo_y()
-        parent_width = self.parent.winfo_width()
-        parent_height = self.parent.winfo_height()
-        
-        if current_x + new_width > parent_width:
-            new_width = parent_width - current_x
-            self.width = new_width
-            self.frame.configure(width=new_width)
-            chars = max(10, int(new_width / 7))
-            self.text_widget.configure(width=chars)
-            
-        if current_y + new_height > parent_height:
-            new_height = parent_height - current_y
-            self.height = new_height
-            self.frame.configure(height=new_height)
-            lines = max(3, int(new_height / 20))
-            self.text_widget.configure(height=lines)
+        self.pointer = (event.x_root, event.y_root)
+        self.schedule_motion()
         
     def stop_resize(self, event):
-        """Stop resizing"""
+        """Stop resizing - apply the new size and re-wrap the text once"""
+        if self.is_resizing and self.outline is not None:
+            self.flush_motion()
+            self.outline.destroy()
+            self.outline = None
+            self.width = self.resize_width
+            self.height = self.resize_height
+            self.frame.configure(width=self.width, height=self.height)
+            self.text_widget.configure(width=max(10, int(self.width / 7)), height=max(3, int(self.height / 20)))
+            if self.toolbar is not None:
+                self.toolbar.follow(self)
         self.is_resizing = False
+        self.pointer = None
         # Reset cursor
         self.frame.configure(cursor="")
         self.text_widget.configure(cursor="xterm")
@@ -475,7 +1018,7 @@ class FormattedTextWidget:
             }
             
         except Exception as e:
-            print(f"Error in get_formatted_text: {e}")
+            LOG.error("Error in get_formatted_text: {error}", error=e)
             # Fallback to plain text
             return {
                 "content": text_content,
@@ -512,6 +1055,9 @@ class FormattedTextWidget:
         else:
             # Plain text (backward compatibility)
             self.text_widget.insert("1.0", formatted_data)
+        
+        # Loaded text is not a user modification
+        self.text_widget.edit_modified(False)
 
     def _ensure_tag_exists(self, tag_name):
         """Make sure a tag exists, creating it if necessary"""
@@ -548,6 +1094,17 @@ class FormattedTextWidget:
     
 
             
+    def get_font_size_at(self, index="insert"):
+        """Font size of the text at an index (the character before it if untagged)"""
+        for position in (index, f"{index}-1c"):
+            for tag in self.text_widget.tag_names(position):
+                if tag.startswith("size"):
+                    try:
+                        return int(tag.split("_")[0][4:])
+                    except ValueError:
+                        pass
+        return FormattingToolbar.DEFAULT_SIZE
+    
     def change_font_size(self, size):
         """Change font size for selected text - WITHOUT BOLD/ITALIC"""
         try:
@@ -579,13 +1136,22 @@ class FormattedTextWidget:
             
         except tk.TclError:
             pass
+    
+    def text_stats(self):
+        """(characters, tag ranges) held by the Text widget, ignoring the selection"""
+        chars = len(self.text_widget.get("1.0", "end-1c"))
+        ranges = sum(
+            len(self.text_widget.tag_ranges(tag)) // 2
+            for tag in self.text_widget.tag_names() if tag != "sel"
+        )
+        return chars, ranges
 
     def serialize(self):
         """Serialize widget data for saving"""
         try:
             formatted_text = self.get_formatted_text()
         except Exception as e:
-            print(f"Warning: Could not get formatted text for widget {self.widget_id}: {e}")
+            LOG.warning("Could not get formatted text for widget {widget}: {error}", widget=self.widget_id, error=e)
             # Fallback to plain text
             formatted_text = {
                 "content": self.get_text(),
@@ -609,61 +1175,445 @@ class FormattedTextWidget:
         }
 
 
-class ImageWidget:
-    """Canvas-based image that supports floating over text WITH RESIZE (locked aspect ratio)"""
-    def __init__(self, canvas, x, y, image_path, widget_id=None, width=None, height=None):
+_TEXTBOX_FONTS = {}
+
+
+def get_textbox_font(tags=()):
+    """Font a textbox's Text widget uses for text with these tags (cached)"""
+    family = "Adeliz" if HAS_CUSTOM_FONT else "Arial"
+    key = (family, FormattingToolbar.DEFAULT_SIZE)
+    tags = [tag for tag in tags if tag != "sel"]  # The selection carries no font
+    for tag in tags:
+        if tag.startswith("size"):
+            try:
+                key = (family, int(tag.split("_")[0][4:]))
+            except (ValueError, IndexError):
+                key = ("Arial", 11)
+            break
+    else:
+        if tags:
+            # Unknown tags are configured with the fallback font
+            key = ("Arial", 11)
+    
+    font = _TEXTBOX_FONTS.get(key)
+    if font is None:
+        font = tk.font.Font(family=key[0], size=key[1])
+        font.ascent = font.metrics("ascent")
+        font.linespace = font.metrics("linespace")
+        _TEXTBOX_FONTS[key] = font
+    return font
+
+
+def static_text_supported(data):
+    """Whether StaticTextbox can draw this textbox exactly as its Text widget would
+    
+    Only size tags carry a font; when a run has several tags Tk picks whichever
+    was created last, which the canvas can't know, so such boxes stay live.
+    """
+    text = data.get("text", "")
+    if not isinstance(text, dict):
+        return True
+    for segment in text.get("segments", []):
+        tags = [tag for tag in segment.get("tags", []) if tag != "sel"]
+        if not tags:
+            continue
+        if len(tags) > 1 or not tags[0].startswith("size"):
+            return False
+        try:
+            int(tags[0].split("_")[0][4:])
+        except ValueError:
+            return False
+    return True
+
+
+def text_data_stats(data):
+    """(characters, tagged runs) of a serialized textbox"""
+    text = data.get("text", "")
+    if not isinstance(text, dict):
+        return len(text), 0
+    segments = text.get("segments", [])
+    return sum(len(segment.get("text", "")) for segment in segments), sum(1 for segment in segments if segment.get("tags"))
+
+
+class StaticTextbox:
+    """Canvas-drawn stand-in for a textbox that isn't being edited
+    
+    Draws the serialized text as canvas text items (one per font run per line)
+    and keeps the data, so the page can build a FormattedTextWidget from it when
+    the box is clicked.
+    """
+    TAG = "static_textbox"
+    TEXT_COLOR = "#3d2c1e"
+    
+    def __init__(self, canvas, data):
+        RESOURCES.track(self)
         self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.image_path = image_path
-        self.widget_id = widget_id or str(uuid.uuid4())
-        self.is_dragging = False
-        self.is_resizing = False
+        self.data = dict(data)
+        if not self.data.get("id"):
+            self.data["id"] = str(uuid.uuid4())
+        self.widget_id = self.data["id"]
+        self.x = self.data["x"]
+        self.y = self.data["y"]
+        self.width = self.data["width"]
+        self.height = self.data["height"]
         self.has_focus = False
-        self.parent_page = None
-        
-        # Load image
-        self.original_image = Image.open(image_path)
-        self.original_width, self.original_height = self.original_image.size
-        
-        # Store original aspect ratio
-        self.aspect_ratio = self.original_height / self.original_width
+        self.item_tag = f"textbox-{self.widget_id}"
+        self.draw()
+    
+    def widgets(self):
+        """No Tk widgets - everything is on the page canvas"""
+        return []
+    
+    def contains(self, x, y):
+        """Is the canvas point inside the box?"""
+        return self.x <= x <= self.x + self.width and self.y <= y <= self.y + self.height
+    
+    def layout(self):
+        """Word-wrap the text like the Text widget: list of (x, y, text, font)"""
+        import re
         
-        # Use provided dimensions or calculate scaled size
-        if width is not None and height is not None:
-            self.width = width
-            self.height = height
-            # Ensure aspect ratio matches if both dimensions provided
-            if abs((height / width) - self.aspect_ratio) > 0.01:  # Allow small floating point differences
-                # Recalculate height based on width to maintain aspect ratio
-                self.height = int(width * self.aspect_ratio)
+        text = self.data.get("text", "")
+        if isinstance(text, dict):
+            segments = text.get("segments", [])
         else:
-            # Default scaling: 40% of canvas width, maintain aspect ratio
-            canvas_width = self.canvas.winfo_width() if self.canvas.winfo_exists() else 800
-            max_width = int(canvas_width * 0.4)
-            
-            # Calculate height to maintain aspect ratio
-            self.width = min(self.original_width, max_width)
-            self.height = int(self.width * self.aspect_ratio)
-            
-            # Also limit height (60% of canvas height)
-            max_height = int(canvas_width * 0.6)  # canvas is square-ish
-            if self.height > max_height:
-                self.height = max_height
-                self.width = int(self.height / self.aspect_ratio)
+            segments = [{"text": text, "tags": []}]
+        
+        wrap_width = self.width - 2  # tk.Text keeps 1px padding either side
+        lines = []
+        runs = []  # [x, text, font] on the current line
+        x = 0
+        font = get_textbox_font()
+        widths = {}
+        
+        def measure(font, word):
+            key = (font.name, word)
+            if key not in widths:
+                widths[key] = font.measure(word)
+            return widths[key]
+        
+        def end_line():
+            lines.append((runs, font))
+        
+        for segment in segments:
+            font = get_textbox_font(segment.get("tags", []))
+            for n, part in enumerate(segment["text"].split("\n")):
+                if n:
+                    end_line()
+                    runs, x = [], 0
+                for word in re.findall(r"\S+\s*|\s+", part):
+                    # Trailing spaces may hang past the edge, like in the Text widget
+                    if x and x + measure(font, word.rstrip()) > wrap_width:
+                        end_line()
+                        runs, x = [], 0
+                    if runs and runs[-1][2] is font:
+                        runs[-1][1] += word
+                    else:
+                        runs.append([x, word, font])
+                    x += measure(font, word)
+        end_line()
+        
+        items = []
+        top = 1
+        for line_runs, line_font in lines:
+            fonts = [run[2] for run in line_runs] or [line_font]
+            ascent = max(f.ascent for f in fonts)
+            linespace = max(f.linespace for f in fonts)
+            # Like the Text widget's frame, don't draw lines past the bottom
+            if items and top + linespace > self.height:
+                break
+            for run_x, run_text, run_font in line_runs:
+                items.append((1 + run_x, top + ascent - run_font.ascent, run_text, run_font))
+            top += linespace
+        return items
+    
+    def draw(self):
+        """(Re)create the canvas items"""
+        self.canvas.delete(self.item_tag)
+        for x, y, text, font in self.layout():
+            self.canvas.create_text(
+                self.x + x, self.y + y,
+                text=text,
+                font=font,
+                fill=self.TEXT_COLOR,
+                anchor="nw",
+                tags=(self.TAG, self.item_tag)
+            )
+    
+    def destroy(self):
+        """Remove the canvas items"""
+        self.canvas.delete(self.item_tag)
+    
+    def text_stats(self):
+        """(characters, tagged runs) of the drawn text"""
+        return text_data_stats(self.data)
+    
+    def serialize(self):
+        """Serialize widget data for saving"""
+        # Group moves update x/y
+        self.data["x"] = self.x
+        self.data["y"] = self.y
+        return self.data
+
+
+class FormattingToolbar:
+    """Formatting toolbar shared by every textbox
+    
+    There is one toolbar per app. It is placed above whichever FormattedTextWidget
+    has focus and shows the font size at that widget's insert point.
+    """
+    DEFAULT_SIZE = 45
+    
+    def __init__(self, app, parent):
+        self.app = app
+        self.parent = parent  # Common ancestor of all page frames
+        self.frame = None     # Built on first use
+        self.target = None    # Focused FormattedTextWidget
+    
+    def build(self):
+        """Create the toolbar widgets"""
+        self.frame = LightFrame(
+            self.parent,
+            fg_color="#f5e8c8",
+            width=140,  # Increased from 120 to fit reset button
+            height=35,
+            corner_radius=3,
+            border_width=1,
+            border_color="#a08c6e"
+        )
+        self.frame.pack_propagate(False)
         
-        # Minimum size
-        self.min_width = 50
-        self.min_height = int(self.min_width * self.aspect_ratio)
+        # Font size control frame (contains display + reset button)
+        font_size_frame = LightFrame(
+            self.frame,
+            fg_color="transparent",
+            width=85,  # Width for both elements
+            height=25
+        )
+        font_size_frame.pack_propagate(False)
+        font_size_frame.pack(side="left", padx=(2, 5), pady=5)
         
-        # Resize image for display
-        if (self.width, self.height) != (self.original_width, self.original_height):
-            self.display_image = self.original_image.resize((self.width, self.height), Image.Resampling.LANCZOS)
-        else:
-            self.display_image = self.original_image.copy()
+        # Font size display (scrollable)
+        self.font_size_var = ctk.StringVar(value=str(self.DEFAULT_SIZE))
+        
+        self.font_size_display = LightLabel(
+            font_size_frame,
+            textvariable=self.font_size_var,
+            width=50,
+            height=25,
+            fg_color="#e0d0b0",
+            text_color="#3d2c1e",
+            font=("Arial", 10),
+            corner_radius=2,
+            anchor="center",
+            cursor="sb_v_double_arrow"
+        )
+        self.font_size_display.pack(side="left", padx=(0, 2))
+        
+        # Reset button (↺ symbol)
+        self.reset_button = LightButton(
+            font_size_frame,
+            text="↺",  # Reset symbol
+            width=25,
+            height=25,
+            fg_color="#a08c6e",
+            hover_color="#8c704c",
+            text_color="#3d2c1e",
+            font=("Arial", 12, "bold"),
+            corner_radius=2,
+            command=self.reset_font_size
+        )
+        self.reset_button.pack(side="left")
+        
+        # Bind mouse wheel events to the display label
+        self.font_size_display.bind("<MouseWheel>", self.on_font_size_scroll)
+        self.font_size_display.bind("<Button-4>", self.on_font_size_scroll)  # Linux up
+        self.font_size_display.bind("<Button-5>", self.on_font_size_scroll)  # Linux down
+    
+    def attach(self, textbox):
+        """Show the toolbar above a textbox and target it"""
+        if self.frame is None:
+            self.build()
+        self.target = textbox
+        self.refresh_font_size()
+        self.frame.place(in_=textbox.parent, x=textbox.x, y=textbox.y - 40)
+        self.frame.lift()
+    
+    def detach(self, textbox=None):
+        """Hide the toolbar (only if it targets textbox, when one is given)"""
+        if textbox is not None and textbox is not self.target:
+            return
+        self.target = None
+        if self.frame is not None:
+            self.frame.place_forget()
+    
+    def follow(self, textbox):
+        """Keep the toolbar above its textbox while that textbox moves"""
+        if textbox is self.target and self.frame is not None:
+            self.frame.place(in_=textbox.parent, x=textbox.x, y=textbox.y - 40)
+    
+    def contains(self, widget):
+        """Check if a widget is part of the toolbar"""
+        while widget is not None and self.frame is not None:
+            if widget == self.frame:
+                return True
+            widget = getattr(widget, 'master', None)
+        return False
+    
+    def refresh_font_size(self):
+        """Show the target's font size at its insert point"""
+        if self.target is not None and self.frame is not None:
+            self.font_size_var.set(str(self.target.get_font_size_at("insert")))
+    
+    def on_font_size_scroll(self, event):
+        """Handle mouse wheel scrolling for font size"""
+        text_widget = self.target
+        if text_widget is None:
+            return "break"
+        
+        # Determine scroll direction
+        if event.num == 4 or (hasattr(event, 'delta') and event.delta > 0):  # Scroll up
+            delta = 1
+        elif event.num == 5 or (hasattr(event, 'delta') and event.delta < 0):  # Scroll down
+            delta = -1
+        else:
+            return
+        
+        # Get current font size
+        try:
+            current_size = int(self.font_size_var.get())
+        except:
+            current_size = self.DEFAULT_SIZE
+        
+        # Calculate new size (1-100 range)
+        new_size = current_size + delta
+        new_size = max(1, min(100, new_size))
+        
+        # Update display
+        self.font_size_var.set(str(new_size))
+        
+        # Check if text is selected
+        try:
+            text_widget.text_widget.index("sel.first")
+            has_selection = True
+        except tk.TclError:
+            has_selection = False
+        
+        if has_selection:
+            # Apply to selected text
+            text_widget.change_font_size(new_size)
+            self.app.set_modified(True)
+        else:
+            # No selection - set as default for new text
+            if hasattr(text_widget, 'default_font_size'):
+                text_widget.default_font_size = new_size
+        
+        # Visual feedback on the display
+        original_color = self.font_size_display.cget("fg_color")
+        self.font_size_display.configure(fg_color="#d0c0a0")  # Highlight
+        self.font_size_display.after(100, lambda: self.font_size_display.configure(fg_color=original_color))
+        
+        return "break"
+    
+    def reset_font_size(self):
+        """Reset font size to default (45)"""
+        text_widget = self.target
+        if text_widget is None:
+            return
+        
+        # Update the display
+        self.font_size_var.set(str(self.DEFAULT_SIZE))
+        
+        # Check if text is selected
+        try:
+            text_widget.text_widget.index("sel.first")
+            has_selection = True
+        except tk.TclError:
+            has_selection = False
+        
+        if has_selection:
+            # Apply reset to selected text only
+            text_widget.change_font_size(self.DEFAULT_SIZE)
+        else:
+            # No selection - reset ALL text in the widget
+            # Remove all font size tags
+            for tag in list(text_widget.created_tags):
+                if tag.startswith("size"):
+                    text_widget.text_widget.tag_remove(tag, "1.0", "end")
+            
+            # Apply default size to entire widget
+            text_widget.change_font_size(self.DEFAULT_SIZE)
+        
+        self.app.set_modified(True)
+        
+        # Visual feedback
+        original_color = self.reset_button.cget("fg_color")
+        self.reset_button.configure(fg_color="#3d2c1e", text_color="#f5e8c8")
+        self.reset_button.after(200, lambda: self.reset_button.configure(
+            fg_color=original_color, 
+            text_color="#3d2c1e"
+        ))
+
+
+class ImageWidget:
+    """Canvas-based image that supports floating over text WITH RESIZE (locked aspect ratio)"""
+    def __init__(self, canvas, x, y, image_path, widget_id=None, width=None, height=None):
+        from PIL import Image, ImageTk
+        
+        self.canvas = canvas
+        self.x = x
+        self.y = y
+        self.image_path = image_path
+        self.widget_id = widget_id or str(uuid.uuid4())
+        RESOURCES.track(self)
+        self.is_dragging = False
+        self.is_resizing = False
+        self.has_focus = False
+        self.parent_page = None
+        
+        # Load image
+        self.original_image = Image.open(image_path)
+        self.original_width, self.original_height = self.original_image.size
+        
+        # Store original aspect ratio
+        self.aspect_ratio = self.original_height / self.original_width
+        
+        # Use provided dimensions or calculate scaled size
+        if width is not None and height is not None:
+            self.width = width
+            self.height = height
+            # Ensure aspect ratio matches if both dimensions provided
+            if abs((height / width) - self.aspect_ratio) > 0.01:  # Allow small floating point differences
+                # Recalculate height based on width to maintain aspect ratio
+                self.height = int(width * self.aspect_ratio)
+        else:
+            # Default scaling: 40% of canvas width, maintain aspect ratio
+            canvas_width = self.canvas.winfo_width() if self.canvas.winfo_exists() else 800
+            max_width = int(canvas_width * 0.4)
+            
+            # Calculate height to maintain aspect ratio
+            self.width = min(self.original_width, max_width)
+            self.height = int(self.width * self.aspect_ratio)
+            
+            # Also limit height (60% of canvas height)
+            max_height = int(canvas_width * 0.6)  # canvas is square-ish
+            if self.height > max_height:
+                self.height = max_height
+                self.width = int(self.height / self.aspect_ratio)
+        
+        # Minimum size
+        self.min_width = 50
+        self.min_height = int(self.min_width * self.aspect_ratio)
+        
+        # Resize image for display
+        if (self.width, self.height) != (self.original_width, self.original_height):
+            self.display_image = self.original_image.resize((self.width, self.height), Image.Resampling.LANCZOS)
+        else:
+            self.display_image = self.original_image.copy()
         
         self.tk_image = ImageTk.PhotoImage(self.display_image)
+        self.track_images()
         self.image_id = self.canvas.create_image(x, y, image=self.tk_image, anchor="nw")
+        self.loaded = True  # False while pixels are evicted by the memory budget
         
         # Create selection border (invisible until selected)
         self.border_id = self.canvas.create_rectangle(
@@ -694,6 +1644,10 @@ class ImageWidget:
         self.canvas.tag_bind(self.image_id, "<Button-1>", self.on_image_click)
         self.canvas.tag_bind(self.border_id, "<Button-1>", self.on_image_click)
         
+        # Shift-click is multi-selection (handled by the page canvas)
+        self.canvas.tag_bind(self.image_id, "<Shift-Button-1>", lambda e: None)
+        self.canvas.tag_bind(self.border_id, "<Shift-Button-1>", lambda e: None)
+        
         # Drag image
         self.canvas.tag_bind(self.image_id, "<B1-Motion>", self.do_drag)
         self.canvas.tag_bind(self.image_id, "<ButtonRelease-1>", self.stop_drag)
@@ -729,6 +1683,10 @@ class ImageWidget:
             self.canvas.itemconfig(self.resize_handle_id, fill="", outline="")
     def on_image_click(self, event):
         """Handle click on image - select it"""
+        # Part of a group selection - the page canvas moves the whole group
+        if self.parent_page is not None and self.parent_page.get_app().selection.contains(self):
+            return
+        
         # If another image is focused, unfocus it first
         if hasattr(self.canvas, 'focused_image') and self.canvas.focused_image:
             if self.canvas.focused_image != self:
@@ -804,6 +1762,9 @@ class ImageWidget:
         """Start resizing the image"""
         if not self.has_focus:
             self.focus()
+        self.ensure_loaded()
+        if not self.loaded:
+            return  # Image file is gone - nothing to resize
         
         self.is_resizing = True
         self.is_dragging = False
@@ -817,6 +1778,8 @@ class ImageWidget:
         if not self.is_resizing:
             return
         
+        from PIL import Image, ImageTk
+        
         dx = event.x - self.resize_start_x
         dy = event.y - self.resize_start_y
         
@@ -852,6 +1815,7 @@ class ImageWidget:
             
             # Update tkinter image
             self.tk_image = ImageTk.PhotoImage(self.display_image)
+            self.track_images()
             self.canvas.itemconfig(self.image_id, image=self.tk_image)
             
             # Update border and resize handle positions
@@ -879,6 +1843,7 @@ class ImageWidget:
         # Remove from parent page's images list
         if self.parent_page and self in self.parent_page.images:
             self.parent_page.images.remove(self)
+            self.parent_page.get_app().selection.discard(self)
         
         # Then delete from canvas
         self.canvas.delete(self.image_id)
@@ -886,10 +1851,77 @@ class ImageWidget:
         self.canvas.delete(self.resize_handle_id)
         
         # Clean up resources
+        self.unload()
+
+    def unload(self):
+        """Free decoded pixels and the PhotoImage - ensure_loaded() brings them back"""
+        if not self.loaded:
+            return
+        self.loaded = False
+        try:
+            self.canvas.itemconfig(self.image_id, image="")
+        except tk.TclError:
+            pass  # Canvas item already gone
         self.original_image.close()
-        if hasattr(self, 'display_image'):
-            self.display_image.close()
-        del self.tk_image
+        self.display_image.close()
+        self.original_image = None
+        self.display_image = None
+        self.tk_image = None
+    
+    def ensure_loaded(self):
+        """Decode the image again after unload() (stays unloaded if the file is gone or unreadable)"""
+        if self.loaded:
+            return
+        
+        from PIL import Image, ImageTk
+        
+        try:
+            image = Image.open(self.image_path)
+            image.load()
+        except (OSError, ValueError) as e:
+            LOG.warning("Could not reload image {path}: {error}", path=self.image_path, error=e)
+            return
+        self.original_image = image
+        if (self.width, self.height) != self.original_image.size:
+            self.display_image = self.original_image.resize((self.width, self.height), Image.Resampling.LANCZOS)
+        else:
+            self.display_image = self.original_image.copy()
+        self.tk_image = ImageTk.PhotoImage(self.display_image)
+        self.track_images()
+        self.canvas.itemconfig(self.image_id, image=self.tk_image)
+        self.loaded = True
+    
+    def track_images(self):
+        """Count the decoded images and PhotoImage in the resource tracker"""
+        RESOURCES.track(self.original_image, "PIL Image")
+        RESOURCES.track(self.display_image, "PIL Image")
+        RESOURCES.track(self.tk_image, "PhotoImage")
+    
+    def memory_usage(self):
+        """Estimated bytes held by decoded pixels and by the PhotoImage"""
+        if not self.loaded:
+            return {"pixels": 0, "photos": 0}
+        pixels = 0
+        for image in (self.original_image, self.display_image):
+            width, height = image.size
+            pixels += width * height * len(image.getbands())
+        # Tk keeps PhotoImages as 32-bit RGBA
+        return {"pixels": pixels, "photos": self.width * self.height * 4}
+    
+    def image_bytes(self):
+        """Decoded bytes of original_image, display_image and tk_image (0 while unloaded)"""
+        if not self.loaded:
+            return {"original": 0, "display": 0, "photo": 0}
+        
+        def decoded(image):
+            width, height = image.size
+            return width * height * len(image.getbands())
+        
+        return {
+            "original": decoded(self.original_image),
+            "display": decoded(self.display_image),
+            "photo": self.tk_image.width() * self.tk_image.height() * 4
+        }
 
     def serialize(self):
         """Serialize image data for saving"""
@@ -904,231 +1936,2381 @@ class ImageWidget:
             "properties": {}
         }
 
-# Page class
-class Page:
-    """Represents a single page in the notebook"""
-    def __init__(self, parent, is_left_page, page_number, name=None):
-        self.parent = parent
-        self.is_left_page = is_left_page
-        self.page_number = page_number
-        self.name = name or f"Page {page_number + 1}"  # Default name
-        
-        # Create page frame
-        self.frame = ctk.CTkFrame(
-            parent,
-            fg_color="#c1a273",
-            border_width=0,
-            corner_radius=0
-        )
-        
-        # Canvas for drawing selection boxes and images
-        self.canvas = tk.Canvas(
-            self.frame,
-            highlightthickness=0
+class GroupSelection:
+    """Textboxes and images selected together on one page (rubber band / shift-click)
+    
+    Canvas items of the selected images and canvas-drawn textboxes, plus the
+    selection marks, carry GROUP_TAG, so a group drag is one canvas.move per
+    frame; only live textbox frames have to be placed one by one.
+    """
+    GROUP_TAG = "group_selection"
+    MARK_TAG = "group_mark"
+    BAND_TAG = "rubber_band"
+    FRAME_MS = 16  # Group drag updates are applied at most this often
+    
+    def __init__(self, app):
+        self.app = app
+        self.page = None
+        self.items = []
+        self.marks = {}  # id(item) -> mark rectangle
+        self.band_start = None
+        self.drag = None  # State of the group drag in progress
+        self.drag_job = None
+    
+    @property
+    def canvas(self):
+        return self.page.canvas if self.page is not None else None
+    
+    def contains(self, item):
+        return any(selected is item for selected in self.items)
+    
+    def item_at(self, page, x, y):
+        """Selected item under a canvas point"""
+        if page is not self.page:
+            return None
+        for item in reversed(self.items):
+            if item.x <= x <= item.x + item.width and item.y <= y <= item.y + item.height:
+                return item
+        return None
+    
+    def _canvas_tags(self, item):
+        """Canvas items that move with an item"""
+        if isinstance(item, ImageWidget):
+            return (item.image_id, item.border_id, item.resize_handle_id)
+        if isinstance(item, StaticTextbox):
+            return (item.item_tag,)
+        return ()  # Live textboxes are frames placed over the canvas
+    
+    def add(self, page, item):
+        """Add an item (starting over if it's on another page)"""
+        if page is not self.page:
+            self.clear()
+            self.page = page
+        if self.contains(item):
+            return
+        self.items.append(item)
+        canvas = self.canvas
+        for tag in self._canvas_tags(item):
+            canvas.addtag_withtag(self.GROUP_TAG, tag)
+        # Drawn just outside the item so it shows around textbox frames too
+        self.marks[id(item)] = canvas.create_rectangle(
+            item.x - 3, item.y - 3, item.x + item.width + 3, item.y + item.height + 3,
+            outline="#5d4037",
+            dash=(4, 2),
+            width=1,
+            tags=(self.MARK_TAG, self.GROUP_TAG)
         )
-        self.canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
-        ##self.try_load_background()
-        self.canvas.configure(bg="#c1a273")
-        
-        # Store widgets on this page
-        self.textboxes = []  # FormattedTextWidget objects
-        self.images = []     # ImageWidget objects
     
-    def set_name(self, name):
-        """Set the page name"""
-        self.name = name
-        
-    def get_display_text(self):
-        """Get display text for buttons/labels"""
-        return f"{self.page_number + 1}. {self.name}"
+    def discard(self, item):
+        """Remove an item from the selection (if it's in it)"""
+        if not self.contains(item):
+            return
+        self.items = [selected for selected in self.items if selected is not item]
+        canvas = self.canvas
+        try:
+            for tag in self._canvas_tags(item):
+                canvas.dtag(tag, self.GROUP_TAG)
+            canvas.delete(self.marks.pop(id(item)))
+        except tk.TclError:
+            pass  # Canvas items already gone
+        if not self.items:
+            self.page = None
     
-    def show(self):
-        """Show this page"""
-        if self.is_left_page:
-            self.frame.place(relx=0, rely=0, relwidth=0.5, relheight=1.0)
+    def replace(self, old, new):
+        """Put new in old's place (a textbox swapped between live and canvas-drawn)"""
+        if not self.contains(old):
+            return
+        self.items = [new if selected is old else selected for selected in self.items]
+        self.marks[id(new)] = self.marks.pop(id(old))
+        canvas = self.canvas
+        for tag in self._canvas_tags(new):
+            canvas.addtag_withtag(self.GROUP_TAG, tag)
+    
+    def toggle(self, page, item):
+        """Shift-click: add or remove an item"""
+        if page is self.page and self.contains(item):
+            self.discard(item)
         else:
-            self.frame.place(relx=0.5, rely=0, relwidth=0.5, relheight=1.0)
+            self.add(page, item)
     
-    def hide(self):
-        """Hide this page"""
-        self.frame.place_forget()
+    def clear(self):
+        """Deselect everything"""
+        if self.page is not None and self.canvas is not None:
+            self.canvas.dtag(self.GROUP_TAG, self.GROUP_TAG)
+            self.canvas.delete(self.MARK_TAG)
+        self.items = []
+        self.marks = {}
+        self.page = None
     
-    def add_textbox(self, x, y, width, height, widget_id=None):
-        """Add a textbox to this page"""
-        textbox = FormattedTextWidget(self.frame, x, y, width, height, page_color="#c1a273", widget_id=widget_id)
-        self.textboxes.append(textbox)
-        return textbox
+    def forget_page(self, page):
+        """The page is being hidden or unbound"""
+        if page is self.page:
+            self.clear()
     
-    def add_image(self, x, y, image_path, widget_id=None, width=None, height=None):
-        """Add an image to this page"""
-        image_widget = ImageWidget(self.canvas, x, y, image_path, widget_id=widget_id, width=width, height=height)
-        # Set the parent page reference
-        image_widget.parent_page = self
-        self.images.append(image_widget)
-        return image_widget
+    # Rubber band
     
-    def clear(self):
-        """Clear all widgets from this page"""
-        for textbox in self.textboxes:
-            textbox.frame.destroy()
-            if hasattr(textbox, 'formatting_frame'):
-                textbox.formatting_frame.destroy()
-        self.textboxes.clear()
-        
-        for image in self.images:
-            image.canvas.delete(image.image_id)
-            # Clean up image resources
-            if hasattr(image, 'original_image'):
-                image.original_image.close()
-            if hasattr(image, 'tk_image'):
-                del image.tk_image
-        self.images.clear()
-    def try_load_background(self):
-        """Try to load background.png as page background"""
-        bg_paths = [
-            "background.png",  # Current dir
-            os.path.join(os.path.dirname(__file__), "background.png"),  # App dir
-        ]
+    def start_band(self, page, x, y, extend=False):
+        """Start a rubber-band selection on empty canvas (extend: add to the selection)"""
+        self.band_start = (page, x, y, extend)
+        page.canvas.delete(self.BAND_TAG)
+        page.canvas.create_rectangle(
+            x, y, x, y,
+            outline="#5d4037",
+            dash=(2, 2),
+            width=1,
+            tags=self.BAND_TAG
+        )
+    
+    def update_band(self, x, y):
+        page, start_x, start_y, extend = self.band_start
+        page.canvas.coords(self.BAND_TAG, start_x, start_y, x, y)
+    
+    def finish_band(self, x, y):
+        """Select everything the band touches (a click without a drag deselects)"""
+        page, start_x, start_y, extend = self.band_start
+        self.band_start = None
+        page.canvas.delete(self.BAND_TAG)
+        
+        if not extend:
+            self.clear()
+        left, right = sorted((start_x, x))
+        top, bottom = sorted((start_y, y))
+        if right - left < 4 and bottom - top < 4:
+            return
+        for item in list(page.textboxes) + list(page.images):
+            if (item.x < right and item.x + item.width > left
+                    and item.y < bottom and item.y + item.height > top):
+                self.add(page, item)
+    
+    # Group drag
+    
+    def start_drag(self, x_root, y_root):
+        """Start moving the whole selection"""
+        canvas = self.canvas
+        # The page and the group's extent don't change during the drag - measure once
+        page_width, page_height = canvas.winfo_width(), canvas.winfo_height()
+        left = min(item.x for item in self.items)
+        top = min(item.y for item in self.items)
+        right = max(item.x + item.width for item in self.items)
+        bottom = max(item.y + item.height for item in self.items)
+        self.drag = {
+            "origin": (x_root, y_root),
+            "pointer": (x_root, y_root),
+            "offset": (0, 0),
+            "limits": (-left, page_width - right, -top, page_height - bottom),
+            "frames": [(item, item.x, item.y) for item in self.items if isinstance(item, FormattedTextWidget)]
+        }
+        canvas.configure(cursor="fleur" if sys.platform != "darwin" else "hand2")
+    
+    def drag_to(self, x_root, y_root):
+        """Record the pointer - applied once per frame"""
+        self.drag["pointer"] = (x_root, y_root)
+        if self.drag_job is None:
+            self.drag_job = self.canvas.after(self.FRAME_MS, self.apply_drag)
+    
+    def apply_drag(self):
+        self.drag_job = None
+        drag = self.drag
+        if drag is None:
+            return
+        min_dx, max_dx, min_dy, max_dy = drag["limits"]
+        dx = max(min_dx, min(max_dx, drag["pointer"][0] - drag["origin"][0]))
+        dy = max(min_dy, min(max_dy, drag["pointer"][1] - drag["origin"][1]))
+        step_x, step_y = dx - drag["offset"][0], dy - drag["offset"][1]
+        if not step_x and not step_y:
+            return
+        
+        # One call moves every image, drawn textbox and mark
+        self.canvas.move(self.GROUP_TAG, step_x, step_y)
+        for textbox, x, y in drag["frames"]:
+            textbox.frame.place(x=x + dx, y=y + dy)
+        drag["offset"] = (dx, dy)
+    
+    def stop_drag(self):
+        """Finish the move and store the new positions"""
+        if self.drag_job is not None:
+            self.canvas.after_cancel(self.drag_job)
+            self.apply_drag()
+        drag, self.drag = self.drag, None
+        if drag is None:
+            return
+        self.canvas.configure(cursor="")
+        
+        dx, dy = drag["offset"]
+        if not dx and not dy:
+            return
+        for item in self.items:
+            item.x += dx
+            item.y += dy
+            if isinstance(item, FormattedTextWidget) and item.toolbar is not None:
+                item.toolbar.follow(item)
+        self.app.set_modified(True)
+
+
+class BackgroundCache:
+    """Page backgrounds shared by all pages
+    
+    background.png is decoded once. Each (half, width, height) gets a single cropped,
+    resized PhotoImage that every page with that half and size reuses. Resizes are
+    debounced so the cache is rebuilt once per window resize, not once per page.
+    """
+    RESIZE_DELAY = 150  # ms of quiet before backgrounds are rebuilt after a resize
+    
+    def __init__(self, root):
+        self.root = root
+        self.source = None       # Decoded background.png
+        self.source_path = None
+        self.photos = {}         # (half, width, height) -> PhotoImage
+        self.resize_job = None
+    
+    def find_source_path(self, notebook_file=None):
+        """Find background.png next to the notebook, in the current dir or the app dir"""
+        bg_paths = [
+            "background.png",  # Current dir
+            os.path.join(os.path.dirname(__file__), "background.png"),  # App dir
+        ]
+        
+        # Also check notebook directory if we have a current file
+        if notebook_file:
+            bg_paths.insert(0, os.path.join(os.path.dirname(notebook_file), "background.png"))
+        
+        for bg_path in bg_paths:
+            if os.path.exists(bg_path):
+                return bg_path
+        return None
+    
+    def load_source(self, notebook_file=None):
+        """Make sure the right background.png is decoded - returns True if one exists"""
+        bg_path = self.find_source_path(notebook_file)
+        if bg_path == self.source_path:
+            return self.source is not None
+        
+        from PIL import Image
+        
+        self.clear()
+        self.source_path = bg_path
+        if bg_path:
+            try:
+                with Image.open(bg_path) as img:
+                    self.source = img.convert("RGB")
+            except Exception as e:
+                LOG.warning("Failed to load background {path}: {error}", path=bg_path, error=e)
+        return self.source is not None
+    
+    def get(self, half, width, height):
+        """Get the PhotoImage for one half of a spread at the given page size"""
+        if self.source is None:
+            return None
+        
+        bg_width, bg_height = self.source.size
+        # Only full-window images are split into halves; others are shared by both sides
+        if not (bg_width >= 1920 and bg_height >= 1080):
+            half = "full"
+        
+        key = (half, width, height)
+        if key not in self.photos:
+            from PIL import Image, ImageTk
+            
+            try:
+                if half == "left":
+                    # Left page: show left half of image
+                    source = self.source.crop((0, 0, bg_width // 2, bg_height))
+                elif half == "right":
+                    # Right page: show right half of image
+                    source = self.source.crop((bg_width // 2, 0, bg_width, bg_height))
+                else:
+                    source = self.source
+                self.photos[key] = RESOURCES.track(
+                    ImageTk.PhotoImage(source.resize((width, height), Image.Resampling.LANCZOS)), "PhotoImage")
+            except Exception as e:
+                LOG.warning("Failed to apply background: {error}", error=e)
+                return None
+        return self.photos[key]
+    
+    def schedule_refresh(self, callback):
+        """Run callback once the window has stopped resizing"""
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(self.RESIZE_DELAY, lambda: self._refresh(callback))
+    
+    def _refresh(self, callback):
+        """Drop PhotoImages for old sizes and let the caller re-apply visible pages"""
+        self.resize_job = None
+        self.photos.clear()
+        callback()
+    
+    def clear(self):
+        """Release the decoded source and all scaled copies"""
+        self.photos.clear()
+        if self.source is not None:
+            self.source.close()
+        self.source = None
+        self.source_path = None
+
+
+class ThumbnailCache:
+    """Small page previews for the sidebar
+    
+    Thumbnails are rendered from page data with PIL on a worker thread and
+    stored as PNG files in .thumbnails/<notebook file name> next to the notebook
+    (a temporary folder for unsaved notebooks), named by a hash of the page
+    content - so a page is only rendered again after it has changed. Saving
+    deletes the files no page uses any more. PhotoImages are made on demand for
+    the sidebar rows that are on screen.
+    """
+    SIZE = (60, 68)               # Thumbnail size (about the shape of a page)
+    REFERENCE_PAGE = (960, 1080)  # Page size the stored coordinates are scaled from
+    MAX_PHOTOS = 256              # PhotoImages kept for rows scrolled back into view
+    VERSION = 1                   # Part of the hash - bump when rendering changes
+    
+    def __init__(self, root):
+        self.root = root
+        self.photos = {}        # (directory, key) -> PhotoImage, oldest first
+        self.jobs = queue.Queue()
+        self.queued = set()     # Paths waiting to be rendered
+        self.task = None
+        self.on_ready = None    # Called on the Tk thread when thumbnails were written
+        self.temp_dir = None
+        self.placeholder = None
+    
+    def directory_for(self, notebook_file):
+        """Folder thumbnails are cached in"""
+        if notebook_file:
+            # One folder per notebook, so pruning one never touches its neighbours'
+            notebook_file = os.path.abspath(notebook_file)
+            return os.path.join(os.path.dirname(notebook_file), ".thumbnails", os.path.basename(notebook_file))
+        if self.temp_dir is None:
+            import tempfile
+            self.temp_dir = tempfile.mkdtemp(prefix="notebook-thumbnails-")
+        return self.temp_dir
+    
+    def key_for(self, page):
+        """Content hash of a page (reused until its data changes or, while bound, it is edited)"""
+        generation = page.get_app().edit_generation if page.surface is not None else None
+        if (page.thumbnail_key is not None and page.thumbnail_source is page.stored_data
+                and page.thumbnail_generation == generation):
+            return page.thumbnail_key, page.thumbnail_content
+        content = page.serialize_content()
+        key = self.content_key(content)
+        page.thumbnail_source = page.stored_data
+        page.thumbnail_generation = generation
+        page.thumbnail_key = key
+        page.thumbnail_content = content
+        return key, content
+    
+    def page_data_key(self, page_data):
+        """Hash of a serialized page's thumbnail"""
+        return self.content_key({"textboxes": page_data.get("textboxes", []), "images": page_data.get("images", [])})
+    
+    def content_key(self, content):
+        """Hash a thumbnail of this page content is stored under"""
+        import hashlib
+        
+        digest = hashlib.sha1(f"v{self.VERSION}".encode())
+        digest.update(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def get_placeholder(self):
+        """Blank page-coloured image shown until a thumbnail is ready"""
+        if self.placeholder is None:
+            self.placeholder = tk.PhotoImage(width=self.SIZE[0], height=self.SIZE[1])
+            self.placeholder.put("#c1a273", to=(0, 0, self.SIZE[0], self.SIZE[1]))
+        return self.placeholder
+    
+    def get(self, page, notebook_file):
+        """PhotoImage for a page, or None while it is being rendered"""
+        key, content = self.key_for(page)
+        directory = self.directory_for(notebook_file)
+        photo = self.photos.pop((directory, key), None)
+        if photo is None:
+            path = os.path.join(directory, f"{key}.png")
+            if not os.path.exists(path):
+                self.request(content, path)
+                return None
+            try:
+                photo = RESOURCES.track(tk.PhotoImage(file=path), "PhotoImage")
+            except tk.TclError:
+                # Unreadable cache file - render it again
+                self.request(content, path)
+                return None
+        # Most recently used last
+        self.photos[(directory, key)] = photo
+        while len(self.photos) > self.MAX_PHOTOS:
+            del self.photos[next(iter(self.photos))]
+        return photo
+    
+    def request(self, content, path):
+        """Queue a page for rendering on the worker"""
+        if path in self.queued:
+            return
+        self.queued.add(path)
+        self.jobs.put((content, path))
+        if self.task is None:
+            self.start_worker()
+    
+    def start_worker(self):
+        def work(task):
+            while True:
+                task.check_cancelled()
+                try:
+                    content, path = self.jobs.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self.render(content, path)
+                except Exception as e:
+                    LOG.warning("Could not render thumbnail {path}: {error}", path=path, error=e)
+                task.emit("rendered", path)
+        
+        def on_done(result=None):
+            self.task = None
+            # Jobs queued after the worker found the queue empty
+            if not self.jobs.empty():
+                self.start_worker()
+        
+        self.task = BackgroundTask(self.root, work, {
+            "rendered": self.on_rendered,
+            "done": on_done,
+            "error": on_done,
+            "cancelled": on_done
+        })
+        self.task.start()
+    
+    def on_rendered(self, path):
+        self.queued.discard(path)
+        if self.on_ready is not None:
+            self.on_ready()
+    
+    def render(self, content, path):
+        """Draw a page's images and text lines into a PNG (worker thread)"""
+        from PIL import Image, ImageDraw
+        
+        width, height = self.SIZE
+        scale = width / self.REFERENCE_PAGE[0]
+        thumb = Image.new("RGB", (width, height), "#c1a273")
+        
+        for image_data in content.get("images", []):
+            box = (max(1, int(image_data["width"] * scale)), max(1, int(image_data["height"] * scale)))
+            try:
+                with Image.open(image_data["image_path"]) as source:
+                    source.draft("RGB", box)  # Let JPEGs decode at a reduced size
+                    piece = source.convert("RGB").resize(box)
+            except (OSError, ValueError):
+                continue  # Missing or unreadable - leave the space empty
+            thumb.paste(piece, (int(image_data["x"] * scale), int(image_data["y"] * scale)))
+        
+        # Text is far too small to read here - draw each wrapped line as a bar
+        draw = ImageDraw.Draw(thumb)
+        for textbox_data in content.get("textboxes", []):
+            text = textbox_data.get("text", "")
+            size = FormattingToolbar.DEFAULT_SIZE
+            if isinstance(text, dict):
+                for segment in text.get("segments", []):
+                    sizes = [tag for tag in segment.get("tags", []) if tag.startswith("size")]
+                    if sizes:
+                        try:
+                            size = int(sizes[0].split("_")[0][4:])
+                        except ValueError:
+                            pass
+                        break
+                text = text.get("content", "")
+            
+            char_width = size * 0.5
+            line_height = size * 1.3
+            lines = []  # Length of each wrapped line, in page pixels
+            for paragraph in text.split("\n"):
+                line = 0
+                for word in paragraph.split():
+                    word_width = (len(word) + 1) * char_width
+                    if line and line + word_width > textbox_data["width"]:
+                        lines.append(line)
+                        line = 0
+                    line += word_width
+                lines.append(line)
+            
+            x = textbox_data["x"] * scale
+            y = textbox_data["y"]
+            for length in lines:
+                if y + line_height > textbox_data["y"] + textbox_data["height"]:
+                    break
+                if length:
+                    top = (y + size * 0.35) * scale
+                    draw.rectangle(
+                        (x, top, x + max(1, length * scale), top + max(1, size * 0.5 * scale)),
+                        fill="#6b5a45"
+                    )
+                y += line_height
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        thumb.save(temp_path, "PNG")
+        os.replace(temp_path, path)
+    
+    def prune(self, notebook_file, keys):
+        """Delete a notebook's thumbnails that none of keys names (worker thread)"""
+        directory = self.directory_for(notebook_file)
+        keep = {f"{key}.png" for key in keys}
+        stale = []
+        try:
+            stale = [os.path.join(directory, name) for name in os.listdir(directory)
+                     if name.endswith(".png") and name not in keep]
+        except OSError:
+            pass  # Nothing rendered for this notebook yet
+        # Thumbnails from before the per-notebook folders are never read again
+        parent = os.path.dirname(directory)
+        try:
+            stale += [os.path.join(parent, name) for name in os.listdir(parent) if name.endswith(".png")]
+        except OSError:
+            pass
+        for path in stale:
+            try:
+                os.remove(path)
+            except OSError as e:
+                LOG.debug("Could not remove thumbnail {path}: {error}", path=path, error=e)
+        return len(stale)
+    
+    def shutdown(self):
+        if self.task is not None:
+            self.task.cancel(wait=1)
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+
+class SpreadOverview:
+    """Scrollable grid of every spread in the notebook
+    
+    One canvas over the page container. Only the rows inside the viewport are
+    drawn: tiles are recycled as spreads scroll in and out, scrolling is
+    redrawn at most once per frame, and tile images come from the
+    ThumbnailCache - whose PhotoImage LRU keeps the decoded thumbnails bounded
+    no matter how many pages the notebook has.
+    """
+    FRAME_MS = 16        # Scroll/resize redraws are coalesced to one per frame
+    PADDING = 8          # Around the two pages inside a tile
+    SEAM = 2             # Between the left and right page of a tile
+    LABEL_HEIGHT = 18    # Page numbers under the pages
+    GAP = 16             # Between tiles
+    WHEEL_STEP = 60      # Pixels scrolled per mouse wheel notch
+    
+    def __init__(self, app):
+        self.app = app
+        self.frame = None
+        self.canvas = None
+        self.scrollbar = None
+        self.visible = False
+        self.top = 0             # Scroll offset into the grid, in pixels
+        self.content_height = 1
+        self.columns = 1
+        self.x0 = 0
+        self.tiles = {}          # spread index -> tile on screen
+        self.spare = []          # Hidden tiles ready for reuse
+        self.highlight = None
+        self.redraw_job = None
+        
+        page_width, page_height = ThumbnailCache.SIZE
+        self.tile_width = 2 * page_width + self.SEAM + 2 * self.PADDING
+        self.tile_height = page_height + 2 * self.PADDING + self.LABEL_HEIGHT
+        self.cell_width = self.tile_width + self.GAP
+        self.cell_height = self.tile_height + self.GAP
+    
+    def build(self):
+        self.frame = tk.Frame(self.app.page_container, bg="#3d2c1e", bd=0, highlightthickness=0)
+        self.canvas = tk.Canvas(self.frame, bg="#3d2c1e", highlightthickness=0, bd=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.highlight = self.canvas.create_rectangle(0, 0, 0, 0, outline="#f5e8c8", width=3, state="hidden")
+        
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", self.on_wheel)
+        self.canvas.bind("<Button-5>", self.on_wheel)
+        self.canvas.bind("<Up>", lambda e: self.scroll_by(-self.cell_height) or "break")
+        self.canvas.bind("<Down>", lambda e: self.scroll_by(self.cell_height) or "break")
+        self.canvas.bind("<Prior>", lambda e: self.yview("scroll", -1, "pages") or "break")
+        self.canvas.bind("<Next>", lambda e: self.yview("scroll", 1, "pages") or "break")
+        self.canvas.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        self.canvas.bind("<End>", lambda e: self.scroll_to(self.content_height) or "break")
+    
+    def current_spread(self):
+        app = self.app
+        if app.focus_mode and app.focused_page_index is not None:
+            return app.focused_page_index // 2
+        return app.current_left_page_index // 2
+    
+    def open(self):
+        if self.visible:
+            return
+        if self.frame is None:
+            self.build()
+        self.visible = True
+        self.frame.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.frame.lift()
+        self.canvas.focus_set()
+        
+        # Start with the current spread's row near the top
+        self.canvas.update_idletasks()
+        self.layout()
+        row = self.current_spread() // self.columns
+        self.top = max(0, row * self.cell_height - self.cell_height // 2)
+        self.redraw()
+    
+    def close(self):
+        if not self.visible:
+            return
+        self.visible = False
+        if self.redraw_job is not None:
+            self.app.root.after_cancel(self.redraw_job)
+            self.redraw_job = None
+        # Drop the tiles' images so the thumbnail LRU alone decides what stays decoded
+        for tile in self.tiles.values():
+            self.release_tile(tile)
+        self.tiles.clear()
+        self.frame.place_forget()
+    
+    def toggle(self):
+        if self.visible:
+            self.close()
+        else:
+            self.open()
+    
+    def schedule_redraw(self):
+        if self.visible and self.redraw_job is None:
+            self.redraw_job = self.app.root.after(self.FRAME_MS, self.redraw)
+    
+    def on_thumbnails_ready(self):
+        """Called when rendered thumbnails arrive - fill in tiles still showing placeholders"""
+        if self.visible and any(tile["pending"] for tile in self.tiles.values()):
+            self.schedule_redraw()
+    
+    def layout(self):
+        """Work out columns and the grid height for the current canvas size"""
+        width = max(1, self.canvas.winfo_width())
+        spreads = (len(self.app.pages) + 1) // 2
+        self.columns = max(1, (width - self.GAP) // self.cell_width)
+        rows = -(-spreads // self.columns)
+        self.content_height = max(1, rows * self.cell_height + self.GAP)
+        used = self.columns * self.cell_width - self.GAP
+        self.x0 = max(self.GAP, (width - used) // 2)
+        return spreads
+    
+    def redraw(self):
+        """Draw the spreads that are inside the viewport"""
+        self.redraw_job = None
+        if not self.visible:
+            return
+        spreads = self.layout()
+        height = max(1, self.canvas.winfo_height())
+        self.top = max(0, min(self.top, self.content_height - height))
+        
+        first_row = self.top // self.cell_height
+        last_row = (self.top + height) // self.cell_height
+        first = first_row * self.columns
+        last = min(spreads, (last_row + 1) * self.columns)
+        
+        # Recycle tiles whose spread scrolled out of view
+        for spread in [s for s in self.tiles if not first <= s < last]:
+            self.release_tile(self.tiles.pop(spread))
+        
+        pages = self.app.pages
+        for spread in range(first, last):
+            left = pages[2 * spread]
+            right = pages[2 * spread + 1] if 2 * spread + 1 < len(pages) else None
+            tile = self.tiles.get(spread)
+            if tile is None:
+                if self.spare:
+                    tile = self.spare.pop()
+                    self.unhide_tile(tile)
+                else:
+                    tile = self.create_tile()
+                self.tiles[spread] = tile
+            if tile["pages"] != (left, right):
+                tile["pages"] = (left, right)
+                label = f"{2 * spread + 1}" if right is None else f"{2 * spread + 1} - {2 * spread + 2}"
+                self.canvas.itemconfigure(tile["label"], text=label)
+                self.fill_images(tile)
+            elif tile["pending"]:
+                self.fill_images(tile)
+            
+            row, column = divmod(spread, self.columns)
+            self.place_tile(tile, self.x0 + column * self.cell_width, self.GAP + row * self.cell_height - self.top)
+        
+        # Outline the spread that is open
+        current = self.tiles.get(self.current_spread())
+        if current is not None:
+            x1, y1, x2, y2 = self.canvas.coords(current["box"])
+            self.canvas.coords(self.highlight, x1 - 3, y1 - 3, x2 + 3, y2 + 3)
+            self.canvas.itemconfigure(self.highlight, state="normal")
+            self.canvas.tag_raise(self.highlight)
+        else:
+            self.canvas.itemconfigure(self.highlight, state="hidden")
+        
+        self.scrollbar.set(self.top / self.content_height, min(1.0, (self.top + height) / self.content_height))
+    
+    def create_tile(self):
+        canvas = self.canvas
+        return {
+            "box": canvas.create_rectangle(0, 0, 0, 0, fill="#e0d0b0", outline="#d4b98c"),
+            "left": canvas.create_image(0, 0, anchor="nw"),
+            "right": canvas.create_image(0, 0, anchor="nw"),
+            "label": canvas.create_text(0, 0, fill="#3d2c1e", font=("Segoe UI", 9)),
+            "pages": None,
+            "photos": [None, None],  # Keep the shown PhotoImages alive
+            "pending": False         # Showing a placeholder until a thumbnail is rendered
+        }
+    
+    def fill_images(self, tile):
+        thumbnails = self.app.thumbnails
+        tile["pending"] = False
+        for side, (item, page) in enumerate(zip((tile["left"], tile["right"]), tile["pages"])):
+            if page is None:
+                tile["photos"][side] = None
+                self.canvas.itemconfigure(item, image="", state="hidden")
+                continue
+            photo = thumbnails.get(page, self.app.current_file)
+            if photo is None:
+                photo = thumbnails.get_placeholder()
+                tile["pending"] = True
+            tile["photos"][side] = photo
+            self.canvas.itemconfigure(item, image=photo, state="normal")
+    
+    def place_tile(self, tile, x, y):
+        canvas = self.canvas
+        page_width, page_height = ThumbnailCache.SIZE
+        canvas.coords(tile["box"], x, y, x + self.tile_width, y + self.tile_height)
+        canvas.coords(tile["left"], x + self.PADDING, y + self.PADDING)
+        canvas.coords(tile["right"], x + self.PADDING + page_width + self.SEAM, y + self.PADDING)
+        canvas.coords(tile["label"], x + self.tile_width / 2, y + self.PADDING + page_height + self.LABEL_HEIGHT / 2)
+    
+    def release_tile(self, tile):
+        """Hide a tile and keep its items for reuse"""
+        for name in ("box", "left", "right", "label"):
+            self.canvas.itemconfigure(tile[name], state="hidden")
+        self.canvas.itemconfigure(tile["left"], image="")
+        self.canvas.itemconfigure(tile["right"], image="")
+        tile["pages"] = None
+        tile["photos"] = [None, None]
+        tile["pending"] = False
+        self.spare.append(tile)
+    
+    def unhide_tile(self, tile):
+        for name in ("box", "label"):
+            self.canvas.itemconfigure(tile[name], state="normal")
+    
+    def scroll_to(self, top):
+        self.top = max(0, int(top))
+        self.schedule_redraw()
+    
+    def scroll_by(self, pixels):
+        self.scroll_to(self.top + pixels)
+    
+    def yview(self, *args):
+        """Scrollbar command"""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.content_height)
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                self.scroll_by(amount * max(self.cell_height, self.canvas.winfo_height() - self.cell_height))
+            else:
+                self.scroll_by(amount * self.WHEEL_STEP)
+    
+    def on_wheel(self, event):
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -event.delta / 120
+        self.scroll_by(steps * self.WHEEL_STEP)
+        return "break"
+    
+    def on_click(self, event):
+        """Jump to the page under the pointer"""
+        column = (event.x - self.x0) // self.cell_width
+        row = (event.y + self.top - self.GAP) // self.cell_height
+        if column < 0 or column >= self.columns or row < 0:
+            return
+        x = event.x - self.x0 - column * self.cell_width
+        y = event.y + self.top - self.GAP - row * self.cell_height
+        if x > self.tile_width or y > self.tile_height:
+            return  # In the gap between tiles
+        
+        spread = row * self.columns + column
+        page_index = 2 * spread
+        if page_index >= len(self.app.pages):
+            return
+        if x >= self.tile_width / 2 and page_index + 1 < len(self.app.pages):
+            page_index += 1
+        self.close()
+        self.app.go_to_page(page_index)
+
+
+class NotebookHistory:
+    """Saved versions of a notebook, kept in .history next to it
+    
+    Every page a save writes is stored once, as a blob named by the hash of its
+    JSON, so unchanged pages are shared by all versions. A version is a small
+    manifest: the notebook header plus the list of its page hashes. Images are
+    hard-linked (copied where links aren't possible) into .history/images, so
+    cleaning up images/ doesn't break older versions.
+    """
+    FORMAT = 1
+    
+    def __init__(self, notebook_file):
+        self.notebook_file = os.path.abspath(notebook_file)
+        self.notebook_dir = os.path.dirname(self.notebook_file)
+        self.directory = os.path.join(self.notebook_dir, ".history")
+        self.blob_dir = os.path.join(self.directory, "pages")
+        self.image_dir = os.path.join(self.directory, "images")
+        self.version_dir = os.path.join(self.directory, "versions", os.path.basename(self.notebook_file))
+        self.known_blobs = None   # Hashes already stored (read on first use)
+        self.known_images = None
+        self.latest_pages = None  # Page hashes of the newest version
+    
+    def blob_path(self, key):
+        return os.path.join(self.blob_dir, key[:2], f"{key}.json")
+    
+    def load_known(self):
+        """Read which blobs and images are stored already (once per notebook)"""
+        self.known_blobs = set()
+        if os.path.isdir(self.blob_dir):
+            for folder in os.scandir(self.blob_dir):
+                if folder.is_dir():
+                    self.known_blobs.update(
+                        entry.name[:-5] for entry in os.scandir(folder.path) if entry.name.endswith(".json"))
+        self.known_images = set(os.listdir(self.image_dir)) if os.path.isdir(self.image_dir) else set()
+        versions = self.versions()
+        self.latest_pages = versions[0]["pages"] if versions else None
+    
+    def add_page(self, key, text, page_data):
+        """Store a page's JSON under its hash unless it is stored already (save worker)"""
+        if self.known_blobs is None:
+            self.load_known()
+        if key in self.known_blobs:
+            return
+        
+        self.keep_images(page_data)
+        path = self.blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_file_atomic(path, text)
+        self.known_blobs.add(key)
+    
+    def keep_images(self, page_data):
+        """Link the images a new page blob uses into the history"""
+        images_dir = os.path.join(self.notebook_dir, "images")
+        for image_data in page_data.get("images", []):
+            source = image_data.get("image_path", "")
+            name = os.path.basename(source)
+            # Only the notebook's own copies - anything else isn't managed by saving
+            if name in self.known_images or os.path.dirname(os.path.abspath(source)) != images_dir:
+                continue
+            if not os.path.exists(source):
+                continue
+            os.makedirs(self.image_dir, exist_ok=True)
+            target = os.path.join(self.image_dir, name)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+            self.known_images.add(name)
+    
+    def commit(self, header, pages):
+        """Record a version (skipped when nothing changed since the last one)"""
+        if self.known_blobs is None:
+            self.load_known()
+        if pages == self.latest_pages:
+            return None
+        
+        saved = datetime.now()
+        manifest = {"format": self.FORMAT, "saved": saved.isoformat(), "header": header, "pages": pages}
+        os.makedirs(self.version_dir, exist_ok=True)
+        path = os.path.join(self.version_dir, saved.strftime("%Y%m%d-%H%M%S-%f") + ".json")
+        write_file_atomic(path, json.dumps(manifest, ensure_ascii=False))
+        self.latest_pages = pages
+        return path
+    
+    def versions(self):
+        """Saved versions, newest first"""
+        if not os.path.isdir(self.version_dir):
+            return []
+        versions = []
+        for name in sorted(os.listdir(self.version_dir), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.version_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                LOG.warning("Skipping unreadable version {path}: {error}", path=path, error=e)
+                continue
+            manifest["path"] = path
+            versions.append(manifest)
+        return versions
+    
+    def read_version(self, version):
+        """Notebook data of a version, with its images put back into images/"""
+        images_dir = os.path.join(self.notebook_dir, "images")
+        pages = []
+        for key in version["pages"]:
+            with open(self.blob_path(key), "r", encoding="utf-8") as f:
+                page_data = json.load(f)
+            for image_data in page_data.get("images", []):
+                name = os.path.basename(image_data.get("image_path", ""))
+                target = os.path.join(images_dir, name)
+                kept = os.path.join(self.image_dir, name)
+                if name and not os.path.exists(target) and os.path.exists(kept):
+                    os.makedirs(images_dir, exist_ok=True)
+                    try:
+                        os.link(kept, target)
+                    except OSError:
+                        shutil.copy2(kept, target)
+                if os.path.exists(target):
+                    image_data["image_path"] = target
+            # Blobs are shared by position - the JSON may be from where the page was first saved
+            page_data["page_number"] = len(pages)
+            page_data["is_left_page"] = len(pages) % 2 == 0
+            pages.append(page_data)
+        
+        data = dict(version["header"])
+        data["pages"] = pages
+        return data
+
+
+def write_file_atomic(path, text):
+    """Write text to path through a temporary file, so readers never see half of it"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class NotebookStore:
+    """Notebook kept in a SQLite file instead of one JSON document
+    
+    Pages, widgets and the style runs of textbox text are rows of their own,
+    so a save only rewrites the pages whose JSON hash (position left out) changed (in one
+    transaction - a cancelled save leaves the file as it was) and loading
+    reads pages in order through indexed queries. Rows keep the widget dicts
+    as saved, so a page read back serializes, and hashes, the same again.
+    Has the records() interface of NotebookStreamReader.
+    """
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS pages ("
+        " id INTEGER PRIMARY KEY, page_id TEXT UNIQUE NOT NULL, position INTEGER NOT NULL,"
+        " name TEXT, is_left_page INTEGER, hash TEXT, data TEXT)",
+        "CREATE INDEX IF NOT EXISTS pages_position ON pages (position)",
+        "CREATE TABLE IF NOT EXISTS widgets ("
+        " id INTEGER PRIMARY KEY, page INTEGER NOT NULL, kind TEXT NOT NULL, position INTEGER NOT NULL,"
+        " widget_id TEXT, image_path TEXT, data TEXT)",
+        "CREATE INDEX IF NOT EXISTS widgets_page ON widgets (page, kind, position)",
+        "CREATE TABLE IF NOT EXISTS runs ("
+        " widget INTEGER NOT NULL, position INTEGER NOT NULL, text TEXT, tags TEXT)",
+        "CREATE INDEX IF NOT EXISTS runs_widget ON runs (widget, position)",
+    )
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.bytes_read = 0
+    
+    @property
+    def total_bytes(self):
+        return os.path.getsize(self.filepath) if os.path.exists(self.filepath) else 0
+    
+    def connect(self, read_only=False):
+        """Open the file - read-only connections leave it untouched (no schema is created)"""
+        if read_only:
+            from urllib.request import pathname2url
+            return sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.filepath))}?mode=ro", uri=True, timeout=10)
+        db = sqlite3.connect(self.filepath, timeout=10)
+        for statement in self.SCHEMA:
+            db.execute(statement)
+        db.commit()
+        return db
+    
+    def records(self):
+        """Generate ("header", dict) and then ("page", dict) records, in page order"""
+        db = self.connect(read_only=True)
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'header'").fetchone()
+            yield "header", json.loads(row[0]) if row else {}
+            
+            total = self.total_bytes
+            count = db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            rows = db.execute("SELECT id, data, is_left_page FROM pages ORDER BY position").fetchall()
+            for i, (rowid, data, is_left_page) in enumerate(rows):
+                page = self.read_page(db, rowid, data)
+                # Pages that only moved keep the JSON of where they were
+                page["page_number"] = i
+                page["is_left_page"] = bool(is_left_page)
+                yield "page", page
+                self.bytes_read = total * (i + 1) // max(1, count)
+        finally:
+            db.close()
+    
+    def read_page(self, db, rowid, data):
+        """Page dict from its rows"""
+        page = json.loads(data)
+        page["textboxes"] = []
+        page["images"] = []
+        
+        runs = {}
+        for widget, text, tags in db.execute(
+                "SELECT r.widget, r.text, r.tags FROM runs r JOIN widgets w ON w.id = r.widget"
+                " WHERE w.page = ? ORDER BY r.widget, r.position", (rowid,)):
+            runs.setdefault(widget, []).append({"text": text, "tags": json.loads(tags)})
+        
+        for widget, kind, widget_data in db.execute(
+                "SELECT id, kind, data FROM widgets WHERE page = ? ORDER BY kind, position", (rowid,)):
+            widget_dict = json.loads(widget_data)
+            text = widget_dict.get("text")
+            if isinstance(text, dict) and text.get("segments") is None:
+                text["segments"] = runs.get(widget, [])
+            page[kind].append(widget_dict)
+        return page
+    
+    def save(self, header, pages, keys, task=None, progress=None):
+        """Write pages, rewriting only those whose hash (keys[i]) changed"""
+        db = self.connect()
+        try:
+            with db:  # One transaction - rolled back if anything (or a cancel) fails
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('header', ?)",
+                           (json.dumps(header, ensure_ascii=False),))
+                stored = {
+                    page_id: (rowid, page_hash, position) for rowid, page_id, page_hash, position
+                    in db.execute("SELECT id, page_id, hash, position FROM pages")
+                }
+                
+                for position, (page_data, key) in enumerate(zip(pages, keys)):
+                    if task is not None:
+                        task.check_cancelled()
+                    page_id = page_data.get("id") or f"#{position}"
+                    rowid, page_hash, old_position = stored.pop(page_id, (None, None, None))
+                    if page_hash == key:
+                        if old_position != position:
+                            # Only moved - the stored page_number/is_left_page are corrected on reading
+                            db.execute("UPDATE pages SET position = ?, is_left_page = ? WHERE id = ?",
+                                       (position, int(position % 2 == 0), rowid))
+                    else:
+                        self.write_page(db, rowid, page_id, position, page_data, key)
+                    if progress is not None and task is not None:
+                        progress["pages"] = position + 1
+                        task.report(progress)
+                
+                # Pages that are gone
+                for rowid, page_hash, position in stored.values():
+                    self.delete_widgets(db, rowid)
+                    db.execute("DELETE FROM pages WHERE id = ?", (rowid,))
+        finally:
+            db.close()
+    
+    def write_page(self, db, rowid, page_id, position, page_data, key):
+        """Replace one page's rows"""
+        # Widgets go in their own rows - keep the key order of the dict with placeholders
+        data = dict(page_data)
+        data["textboxes"] = None
+        data["images"] = None
+        row = (page_id, position, page_data.get("name", ""), int(bool(page_data.get("is_left_page", True))),
+               key, json.dumps(data, ensure_ascii=False))
+        if rowid is None:
+            rowid = db.execute(
+                "INSERT INTO pages (page_id, position, name, is_left_page, hash, data) VALUES (?, ?, ?, ?, ?, ?)",
+                row).lastrowid
+        else:
+            self.delete_widgets(db, rowid)
+            db.execute("UPDATE pages SET page_id = ?, position = ?, name = ?, is_left_page = ?, hash = ?, data = ?"
+                       " WHERE id = ?", row + (rowid,))
+        
+        for kind in ("textboxes", "images"):
+            for widget_position, widget_dict in enumerate(page_data.get(kind, [])):
+                widget_data = dict(widget_dict)
+                segments = None
+                text = widget_data.get("text")
+                if isinstance(text, dict):
+                    segments = text.get("segments") or []
+                    widget_data["text"] = dict(text, segments=None)
+                widget = db.execute(
+                    "INSERT INTO widgets (page, kind, position, widget_id, image_path, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    (rowid, kind, widget_position, widget_dict.get("id"), widget_dict.get("image_path"),
+                     json.dumps(widget_data, ensure_ascii=False))).lastrowid
+                if segments:
+                    db.executemany(
+                        "INSERT INTO runs (widget, position, text, tags) VALUES (?, ?, ?, ?)",
+                        [(widget, i, segment.get("text", ""), json.dumps(segment.get("tags", [])))
+                         for i, segment in enumerate(segments)])
+    
+    def delete_widgets(self, db, rowid):
+        db.execute("DELETE FROM runs WHERE widget IN (SELECT id FROM widgets WHERE page = ?)", (rowid,))
+        db.execute("DELETE FROM widgets WHERE page = ?", (rowid,))
+
+
+def is_store_file(filepath):
+    """Whether a notebook path uses the SQLite backend"""
+    return filepath.lower().endswith(STORE_EXTENSION)
+
+
+def open_notebook_reader(filepath):
+    """Record reader for a notebook file of either format"""
+    if is_store_file(filepath):
+        os.stat(filepath)  # Missing file - raise here like NotebookStreamReader does
+        return NotebookStore(filepath)
+    return NotebookStreamReader(filepath)
+
+
+def page_key(text):
+    """Hash identifying a page's JSON (history blob name, change detection)"""
+    import hashlib
+    
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# Page fields that only follow from where the page is - a page that moved keeps its hash
+PAGE_POSITION = ("page_number", "is_left_page")
+
+
+def encode_page(page_data, indent=None):
+    """(JSON of a page, page_key of that JSON without the PAGE_POSITION fields)
+    
+    The position fields are written first, so the rest of the text is the
+    position-free JSON itself and the page is only dumped once.
+    """
+    content = {key: value for key, value in page_data.items() if key not in PAGE_POSITION}
+    body = json.dumps(content, indent=indent, ensure_ascii=False)
+    key = page_key(body)
+    fields = [field for field in PAGE_POSITION if field in page_data]
+    if not content or not fields:
+        return json.dumps(page_data, indent=indent, ensure_ascii=False), key
+    
+    lead = "\n" + " " * indent if indent else ""
+    head = "".join(f"{json.dumps(field)}: {json.dumps(page_data[field])},{lead or ' '}" for field in fields)
+    return "{" + lead + head + body[1 + len(lead):], key
+
+
+class NotebookLibrary:
+    """SQLite catalog of the notebooks this app has saved or scanned
+    
+    Keeps each notebook's page names and count, file time, a cover thumbnail
+    and a full-text index of page names and text, so the Library window can
+    search every notebook without opening any. Pages are matched by their id
+    and re-indexed only when the hash of their JSON (position left out)
+    changes. Every thread uses its own connection.
+    """
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS notebooks ("
+        " id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, name TEXT,"
+        " page_count INTEGER, modified REAL, cover TEXT)",
+        "CREATE TABLE IF NOT EXISTS pages ("
+        " id INTEGER PRIMARY KEY, notebook_id INTEGER NOT NULL, page_id TEXT NOT NULL, page_index INTEGER NOT NULL,"
+        " name TEXT, hash TEXT, thumbnail TEXT, UNIQUE (notebook_id, page_id))",
+    )
+    
+    def __init__(self, path, thumbnails=None):
+        self.path = path
+        self.thumbnails = thumbnails  # ThumbnailCache used to render covers
+        self.fts = None               # Full-text search available (checked on first connect)
+        self.db = None                # Connection of the Tk thread
+    
+    def connect(self):
+        """New connection with the schema in place"""
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")  # Searches don't wait for a save's update
+        columns = [row[1] for row in db.execute("PRAGMA table_info(pages)")]
+        if columns and "page_id" not in columns:
+            # Catalog from before pages were matched by id - it is only a cache, so start over
+            db.execute("DROP TABLE pages")
+            db.execute("DROP TABLE IF EXISTS page_text")
+            db.execute("UPDATE notebooks SET modified = NULL")
+        for statement in self.SCHEMA:
+            db.execute(statement)
+        try:
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(name, body)")
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 - plain table searched with LIKE
+            db.execute("CREATE TABLE IF NOT EXISTS page_text (name TEXT, body TEXT)")
+            self.fts = False
+        db.commit()
+        return db
+    
+    def ui_connection(self):
+        if self.db is None:
+            self.db = self.connect()
+        return self.db
+    
+    def update(self, filepath, pages, keys, mtime):
+        """Catalog a notebook's pages, given the hash of each page's JSON (any thread)"""
+        filepath = os.path.abspath(filepath)
+        db = self.connect()
+        try:
+            with db:
+                row = db.execute("SELECT id FROM notebooks WHERE path = ?", (filepath,)).fetchone()
+                if row is None:
+                    notebook_id = db.execute("INSERT INTO notebooks (path) VALUES (?)", (filepath,)).lastrowid
+                else:
+                    notebook_id = row[0]
+                known = {
+                    page_id: (rowid, index, page_hash) for rowid, page_id, index, page_hash in db.execute(
+                        "SELECT id, page_id, page_index, hash FROM pages WHERE notebook_id = ?", (notebook_id,))
+                }
+                
+                seen = set()
+                for index, (page_data, key) in enumerate(zip(pages, keys)):
+                    page_id = page_data.get("id")
+                    if not page_id or page_id in seen:
+                        page_id = f"#{index}"  # Old files without ids (or a duplicated id)
+                    seen.add(page_id)
+                    rowid, old_index, page_hash = known.pop(page_id, (None, None, None))
+                    if page_hash == key:
+                        if old_index != index:
+                            db.execute("UPDATE pages SET page_index = ? WHERE id = ?", (index, rowid))
+                        continue
+                    name = page_data.get("name", "")
+                    thumbnail = None
+                    if self.thumbnails is not None:
+                        thumbnail = self.thumbnails.content_key(
+                            {"textboxes": page_data.get("textboxes", []), "images": page_data.get("images", [])})
+                    if rowid is None:
+                        rowid = db.execute(
+                            "INSERT INTO pages (notebook_id, page_id, page_index, name, hash, thumbnail)"
+                            " VALUES (?, ?, ?, ?, ?, ?)",
+                            (notebook_id, page_id, index, name, key, thumbnail)).lastrowid
+                    else:
+                        db.execute("UPDATE pages SET page_index = ?, name = ?, hash = ?, thumbnail = ? WHERE id = ?",
+                                   (index, name, key, thumbnail, rowid))
+                        db.execute("DELETE FROM page_text WHERE rowid = ?", (rowid,))
+                    db.execute("INSERT INTO page_text (rowid, name, body) VALUES (?, ?, ?)",
+                               (rowid, name, self.page_text(page_data)))
+                
+                # Pages that are gone
+                for rowid, index, page_hash in known.values():
+                    db.execute("DELETE FROM pages WHERE id = ?", (rowid,))
+                    db.execute("DELETE FROM page_text WHERE rowid = ?", (rowid,))
+                
+                db.execute(
+                    "UPDATE notebooks SET name = ?, page_count = ?, modified = ?, cover = ? WHERE id = ?",
+                    (os.path.splitext(os.path.basename(filepath))[0], len(pages), mtime,
+                     self.render_cover(filepath, pages), notebook_id))
+        finally:
+            db.close()
+    
+    def page_text(self, page_data):
+        """Plain text of a page's textboxes"""
+        texts = []
+        for textbox_data in page_data.get("textboxes", []):
+            text = textbox_data.get("text", "")
+            texts.append(text.get("content", "") if isinstance(text, dict) else text)
+        return "\n".join(texts)
+    
+    def render_cover(self, filepath, pages):
+        """Thumbnail file of the first page, rendered if it isn't cached yet"""
+        if self.thumbnails is None or not pages:
+            return None
+        content = {"textboxes": pages[0].get("textboxes", []), "images": pages[0].get("images", [])}
+        path = os.path.join(self.thumbnails.directory_for(filepath), f"{self.thumbnails.page_data_key(pages[0])}.png")
+        if not os.path.exists(path):
+            try:
+                self.thumbnails.render(content, path)
+            except OSError as e:
+                LOG.warning("Could not render cover of {path}: {error}", path=filepath, error=e)
+                return None
+        return path
+    
+    def is_current(self, filepath, db):
+        """Whether the catalog already has this file as it is on disk"""
+        row = db.execute("SELECT modified FROM notebooks WHERE path = ?", (os.path.abspath(filepath),)).fetchone()
+        return row is not None and row[0] == os.path.getmtime(filepath)
+    
+    def index_folder(self, folder, task):
+        """Catalog every .notebook under folder that changed since it was indexed (worker)"""
+        paths = []
+        for directory, folders, files in os.walk(folder):
+            folders[:] = [name for name in folders if not name.startswith(".")]
+            paths.extend(os.path.join(directory, name) for name in files
+                         if name.endswith(".notebook") or is_store_file(name))
+        return self.index_files(paths, task)
+    
+    def index_files(self, paths, task):
+        """Catalog the given notebook files, skipping ones that are up to date (worker)"""
+        db = self.connect()
+        try:
+            paths = [path for path in paths if not self.is_current(path, db)]
+        finally:
+            db.close()
+        
+        progress = {"pages": 0, "total_pages": len(paths), "bytes": 0}
+        for path in paths:
+            task.check_cancelled()
+            try:
+                mtime = os.path.getmtime(path)
+                pages = read_notebook_data(path)["pages"]
+                # Hashed like saving does
+                indent = None if is_store_file(path) else 2
+                keys = [encode_page(page_data, indent)[1] for page_data in pages]
+                self.update(path, pages, keys, mtime)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                LOG.warning("Could not index {path}: {error}", path=path, error=e)
+            progress["pages"] += 1
+            progress["bytes"] += os.path.getsize(path) if os.path.exists(path) else 0
+            task.report(progress)
+        return len(paths)
+    
+    def search(self, query, limit=100):
+        """(path, notebook name, page index, page name, snippet, cover) of matching pages
+        
+        An empty query lists the notebooks, most recently saved first.
+        """
+        db = self.ui_connection()
+        words = query.split()
+        if not words:
+            return db.execute(
+                "SELECT path, name, 0, '', page_count || ' pages', cover FROM notebooks"
+                " ORDER BY modified DESC LIMIT ?", (limit,)).fetchall()
+        
+        if self.fts:
+            # Every word as a quoted prefix, so user input is never FTS syntax
+            match = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+            return db.execute(
+                "SELECT n.path, n.name, p.page_index, p.name,"
+                " snippet(page_text, 1, '[', ']', '...', 8), n.cover"
+                " FROM page_text JOIN pages p ON p.id = page_text.rowid"
+                " JOIN notebooks n ON n.id = p.notebook_id"
+                " WHERE page_text MATCH ? ORDER BY rank LIMIT ?", (match, limit)).fetchall()
+        
+        where = " AND ".join("(t.name LIKE ? OR t.body LIKE ?)" for word in words)
+        params = [f"%{word}%" for word in words for column in (0, 1)]
+        return db.execute(
+            "SELECT n.path, n.name, p.page_index, p.name, substr(t.body, 1, 80), n.cover"
+            " FROM page_text t JOIN pages p ON p.id = t.rowid"
+            " JOIN notebooks n ON n.id = p.notebook_id"
+            f" WHERE {where} LIMIT ?", params + [limit]).fetchall()
+    
+    def forget(self, filepath):
+        """Drop a notebook that no longer exists from the catalog"""
+        db = self.ui_connection()
+        with db:
+            row = db.execute("SELECT id FROM notebooks WHERE path = ?", (filepath,)).fetchone()
+            if row is None:
+                return
+            db.execute("DELETE FROM page_text WHERE rowid IN (SELECT id FROM pages WHERE notebook_id = ?)", row)
+            db.execute("DELETE FROM pages WHERE notebook_id = ?", row)
+            db.execute("DELETE FROM notebooks WHERE id = ?", row)
+    
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+class LibraryWindow(ctk.CTkToplevel):
+    """Search box over the library catalog; clicking a result opens that page"""
+    SEARCH_DELAY_MS = 150  # Typing pause before searching
+    
+    def __init__(self, app):
+        super().__init__(app.root)
+        self.app = app
+        self.search_job = None
+        self.covers = {}  # Cover path -> PhotoImage for the rows shown
+        
+        self.title("Library")
+        self.geometry("640x560")
+        self.transient(app.root)
+        
+        if HAS_CUSTOM_FONT:
+            self.row_font = ("Adeliz", 16)
+        else:
+            self.row_font = ("Segoe UI", 16)
+        
+        top = ctk.CTkFrame(self, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(10, 0))
+        self.query = ctk.CTkEntry(top, placeholder_text="Search all notebooks...", font=self.row_font)
+        self.query.pack(side="left", fill="x", expand=True)
+        self.query.bind("<KeyRelease>", lambda e: self.schedule_search())
+        ctk.CTkButton(
+            top,
+            text="Add Folder...",
+            width=110,
+            fg_color="#a08c6e",
+            hover_color="#8c704c",
+            text_color="#3d2c1e",
+            command=self.add_folder
+        ).pack(side="left", padx=(10, 0))
+        
+        self.results = ctk.CTkScrollableFrame(self, fg_color="#b5a184", corner_radius=0)
+        self.results.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.refresh()
+        self.query.focus_set()
+    
+    def schedule_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self.refresh)
+    
+    def add_folder(self):
+        folder = filedialog.askdirectory(title="Add notebooks from folder", parent=self)
+        if folder and not self.app.index_in_library(folder=folder):
+            messagebox.showinfo("Library", "The library is being indexed already - try again in a moment.", parent=self)
+    
+    def refresh(self):
+        """Search again with the current query"""
+        self.search_job = None
+        try:
+            rows = self.app.library.search(self.query.get())
+        except sqlite3.Error as e:
+            rows = []
+            LOG.error("Library search failed: {error}", error=e)
+        
+        for widget in self.results.winfo_children():
+            widget.destroy()
+        covers = {}
+        
+        if not rows:
+            LightLabel(
+                self.results,
+                text="Nothing found" if self.query.get().strip() else "No notebooks yet - save one or add a folder",
+                text_color="#3d2c1e",
+                font=self.row_font
+            ).pack(pady=20)
+        
+        for path, name, page_index, page_name, snippet, cover in rows:
+            photo = self.covers.get(cover) or covers.get(cover)
+            if photo is None and cover and os.path.exists(cover):
+                try:
+                    photo = tk.PhotoImage(file=cover)
+                except tk.TclError:
+                    photo = None
+            if photo is not None:
+                covers[cover] = photo
+            
+            title = f"{name} - {page_name}" if page_name else name
+            snippet = " ".join((snippet or "").split())
+            LightButton(
+                self.results,
+                text=f"{title}\n{snippet}" if snippet else title,
+                fg_color="#e0d0b0",
+                hover_color="#d0c0a0",
+                text_color="#3d2c1e",
+                font=self.row_font,
+                image=photo or self.app.thumbnails.get_placeholder(),
+                compound="left",
+                anchor="w",
+                justify="left",
+                padx=6,
+                command=lambda p=path, i=page_index: self.app.open_from_library(p, i)
+            ).pack(fill="x", pady=4, padx=5)
+        
+        # Only the covers of the rows shown stay decoded
+        self.covers = covers
+
+
+def read_notebook_data(filepath):
+    """Whole notebook file as one dict (header keys plus "pages")
+    
+    Image paths that don't exist here are looked up next to the file, like loading does.
+    """
+    folder = os.path.dirname(os.path.abspath(filepath))
+    data = {}
+    pages = []
+    for kind, record in open_notebook_reader(filepath).records():
+        if kind == "header":
+            data.update(record)
+            continue
+        for image_data in record.get("images", []):
+            path = image_data.get("image_path", "")
+            local = os.path.join(folder, image_data.get("relative_path") or path)
+            if not os.path.exists(path) and os.path.exists(local):
+                image_data["image_path"] = local
+        pages.append(record)
+    data["pages"] = pages
+    return data
+
+
+def text_atoms(text):
+    """A textbox's text as a list of (character, tags) - the unit text is diffed in"""
+    if isinstance(text, str):
+        return [(char, ()) for char in text]
+    atoms = []
+    for segment in text.get("segments", []):
+        tags = tuple(segment.get("tags", []))
+        atoms.extend((char, tags) for char in segment.get("text", ""))
+    if not atoms and text.get("content"):
+        atoms = [(char, ()) for char in text["content"]]
+    return atoms
+
+
+def atoms_to_text(atoms):
+    """Textbox text (content plus runs of equally formatted segments) from atoms"""
+    segments = []
+    for char, tags in atoms:
+        if segments and segments[-1]["tags"] == list(tags):
+            segments[-1]["text"] += char
+        else:
+            segments.append({"text": char, "tags": list(tags)})
+    return {"content": "".join(char for char, tags in atoms), "segments": segments}
+
+
+def changed_region(base, other):
+    """Where other differs from base, in linear time
+    
+    Skips the common prefix and suffix and returns (start, base_end, other_end):
+    base[start:base_end] was replaced by other[start:other_end]. Edits in
+    several places of one text come back as a single region spanning them.
+    """
+    limit = min(len(base), len(other))
+    start = 0
+    while start < limit and base[start] == other[start]:
+        start += 1
+    base_end, other_end = len(base), len(other)
+    while base_end > start and other_end > start and base[base_end - 1] == other[other_end - 1]:
+        base_end -= 1
+        other_end -= 1
+    return start, base_end, other_end
+
+
+def merge_text(base, ours, theirs):
+    """Three-way merge of textbox text; None when both sides edited the same region"""
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    base_atoms, our_atoms, their_atoms = text_atoms(base), text_atoms(ours), text_atoms(theirs)
+    s1, b1, o1 = changed_region(base_atoms, our_atoms)
+    s2, b2, o2 = changed_region(base_atoms, their_atoms)
+    
+    # Overlapping edits, or both inserting at the same place, can't be ordered
+    if not (b1 <= s2 or b2 <= s1) or (s1 == s2 and (b1 == s1 or b2 == s2)):
+        return None
+    if s1 > s2:
+        (s1, b1, o1, our_atoms), (s2, b2, o2, their_atoms) = (s2, b2, o2, their_atoms), (s1, b1, o1, our_atoms)
+    merged = base_atoms[:s1] + our_atoms[s1:o1] + base_atoms[b1:s2] + their_atoms[s2:o2] + base_atoms[b2:]
+    return atoms_to_text(merged)
+
+
+def keyed(items, prefix):
+    """Items by their stable id (position for old files that have none), in order"""
+    result = {}
+    for i, item in enumerate(items):
+        result[item.get("id") or f"{prefix}{i}"] = item
+    return result
+
+
+def merged_order(ours, theirs, keep):
+    """Our order, with items only theirs has placed after their predecessor there"""
+    order = [key for key in ours if key in keep]
+    placed = set(order)
+    for i, key in enumerate(theirs):
+        if key in placed or key not in keep:
+            continue
+        # Put it after the nearest earlier item of theirs that is already placed
+        position = 0
+        for previous in reversed(theirs[:i]):
+            if previous in placed:
+                position = order.index(previous) + 1
+                break
+        order.insert(position, key)
+        placed.add(key)
+    return order
+
+
+class NotebookMerge:
+    """Three-way merge of two copies of a notebook that share a common base
+    
+    Pages and widgets are matched by their ids. Pages that are the same in both
+    copies, or only changed in one of them, are taken whole after one dict
+    comparison, so the cost follows the pages both sides edited. Conflicting
+    fields keep our value and are listed in conflicts.
+    """
+    GEOMETRY = ("x", "y", "width", "height")  # Merged as one box, never mixed from both sides
+    POSITION = PAGE_POSITION  # Follow from page order - renumbered after merging
+    
+    def __init__(self, base, ours, theirs):
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+        self.conflicts = []  # {"page", "widget", "field", "reason"}
+    
+    def conflict(self, page, widget, field, reason):
+        self.conflicts.append({
+            "page": page.get("name", ""),
+            "widget": widget,
+            "field": field,
+            "reason": reason
+        })
+    
+    def run(self):
+        """The merged notebook data"""
+        base = self.pages_by_key(self.base)
+        ours = self.pages_by_key(self.ours)
+        theirs = self.pages_by_key(self.theirs)
+        
+        pages = {}
+        for key in set(ours) | set(theirs):
+            page = self.merge_item(base.get(key), ours.get(key), theirs.get(key), self.merge_page, {}, key)
+            if page is not None:
+                pages[key] = page
+        
+        merged = {key: value for key, value in self.ours.items() if key != "pages"}
+        merged["pages"] = []
+        for i, key in enumerate(merged_order(list(ours), list(theirs), pages)):
+            page = dict(pages[key])
+            page["page_number"] = i
+            page["is_left_page"] = i % 2 == 0
+            merged["pages"].append(page)
+        return merged
+    
+    def pages_by_key(self, data):
+        """Pages by id, without the positional fields (an insert elsewhere must not count as a change)"""
+        return {
+            key: {field: value for field, value in page.items() if field not in self.POSITION}
+            for key, page in keyed(data.get("pages", []), "#page").items()
+        }
+    
+    def merge_item(self, base, ours, theirs, merge, page, key):
+        """Three-way merge of one page or widget (None = deleted)"""
+        if ours == theirs:
+            return ours
+        if base is None:
+            if ours is None or theirs is None:
+                return ours or theirs  # Added on one side
+            self.item_conflict(ours, merge, page, key, "added differently on both sides")
+            return ours
+        if ours is None or theirs is None:
+            kept = ours or theirs
+            if kept == base:
+                return None  # Deleted on one side, untouched on the other
+            self.item_conflict(kept, merge, page, key, "deleted on one side, changed on the other")
+            return kept
+        if theirs == base:
+            return ours
+        if ours == base:
+            return theirs
+        return merge(base, ours, theirs, page)
+    
+    def item_conflict(self, item, merge, page, key, reason):
+        # Bound methods are new objects on every access - compare, don't use "is"
+        if merge == self.merge_page:
+            self.conflict(item, None, None, reason)
+        else:
+            self.conflict(page, key, None, reason)
+    
+    def merge_page(self, base, ours, theirs, page=None):
+        """Both sides changed this page - merge its name and widgets"""
+        merged = dict(ours)
+        merged["name"] = self.merge_value(base, ours, theirs, "name", ours, None)
+        for kind in ("textboxes", "images"):
+            base_widgets = keyed(base.get(kind, []), f"#{kind}")
+            our_widgets = keyed(ours.get(kind, []), f"#{kind}")
+            their_widgets = keyed(theirs.get(kind, []), f"#{kind}")
+            widgets = {}
+            for key in set(our_widgets) | set(their_widgets):
+                widget = self.merge_item(
+                    base_widgets.get(key), our_widgets.get(key), their_widgets.get(key),
+                    self.merge_widget, ours, key
+                )
+                if widget is not None:
+                    widgets[key] = widget
+            merged[kind] = [widgets[key] for key in merged_order(list(our_widgets), list(their_widgets), widgets)]
+        return merged
+    
+    def merge_widget(self, base, ours, theirs, page):
+        """Both sides changed this widget - merge field by field"""
+        merged = dict(ours)
+        widget = ours.get("id")
+        geometry = self.merge_geometry(base, ours, theirs, page, widget)
+        for field in set(base) | set(ours) | set(theirs):
+            if field in self.GEOMETRY:
+                merged[field] = geometry[field]
+            elif field == "text":
+                text = merge_text(base.get("text", ""), ours.get("text", ""), theirs.get("text", ""))
+                if text is None:
+                    self.conflict(page, widget, "text", "both sides edited the same text")
+                    text = ours.get("text", "")
+                merged["text"] = text
+            else:
+                merged[field] = self.merge_value(base, ours, theirs, field, page, widget)
+        return merged
+    
+    def merge_geometry(self, base, ours, theirs, page, widget):
+        """Position and size of a widget - one side's box is taken whole"""
+        old, mine, other = ([side.get(field) for field in self.GEOMETRY] for side in (base, ours, theirs))
+        if mine != other and mine != old and other != old:
+            self.conflict(page, widget, "geometry", "moved or resized differently on both sides")
+        return dict(zip(self.GEOMETRY, other if mine == old else mine))
+    
+    def merge_value(self, base, ours, theirs, field, page, widget):
+        """Three-way merge of a single field"""
+        old, mine, other = base.get(field), ours.get(field), theirs.get(field)
+        if mine == other or other == old:
+            return mine
+        if mine == old:
+            return other
+        self.conflict(page, widget, field, f"changed to {mine!r} here and {other!r} there")
+        return mine
+
+
+def diff_notebooks(old, new):
+    """Readable list of what changed from old to new, matched by page/widget ids"""
+    changes = []
+    old_pages = keyed(old.get("pages", []), "#page")
+    new_pages = keyed(new.get("pages", []), "#page")
+    for key, page in new_pages.items():
+        before = old_pages.get(key)
+        name = page.get("name", "")
+        if before is None:
+            changes.append(f"+ page {name}")
+            continue
+        if before == page:
+            continue
+        if before.get("name") != name:
+            changes.append(f"~ page {before.get('name', '')} renamed to {name}")
+        for kind in ("textboxes", "images"):
+            old_widgets = keyed(before.get(kind, []), f"#{kind}")
+            new_widgets = keyed(page.get(kind, []), f"#{kind}")
+            label = "textbox" if kind == "textboxes" else "image"
+            for widget_key, widget in new_widgets.items():
+                previous = old_widgets.get(widget_key)
+                if previous is None:
+                    changes.append(f"+ {name}: {label} {widget_key}")
+                elif previous != widget:
+                    fields = sorted(field for field in set(previous) | set(widget)
+                                    if previous.get(field) != widget.get(field))
+                    detail = ", ".join(fields)
+                    if "text" in fields:
+                        old_atoms = text_atoms(previous.get("text", ""))
+                        new_atoms = text_atoms(widget.get("text", ""))
+                        start, old_end, new_end = changed_region(old_atoms, new_atoms)
+                        removed = "".join(char for char, tags in old_atoms[start:old_end])
+                        added = "".join(char for char, tags in new_atoms[start:new_end])
+                        detail += f" ({removed!r} -> {added!r} at {start})"
+                    changes.append(f"~ {name}: {label} {widget_key} {detail}")
+            for widget_key in old_widgets:
+                if widget_key not in new_widgets:
+                    changes.append(f"- {name}: {label} {widget_key}")
+    for key, page in old_pages.items():
+        if key not in new_pages:
+            changes.append(f"- page {page.get('name', '')}")
+    return changes
+
+
+def write_notebook_data(data, filepath):
+    """Write a whole notebook dict as JSON or, for .notebookdb paths, into SQLite"""
+    if is_store_file(filepath):
+        header = {key: value for key, value in data.items() if key != "pages"}
+        keys = [encode_page(page_data)[1] for page_data in data["pages"]]
+        NotebookStore(filepath).save(header, data["pages"], keys)
+    else:
+        write_file_atomic(filepath, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+
+def run_leak_test(notebook_file, cycles):
+    """Load, page through and close a notebook repeatedly; fail if anything keeps growing
+    
+    The first cycle warms caches up. After that every cycle ends in the same
+    state (a new notebook), so live object counts must not rise above the
+    second cycle's, and RSS must not climb steadily past LEAK_RSS_SLACK.
+    """
+    import gc
+    
+    app = NotebookApp()
+    app.root.update()
+    samples = []
+    try:
+        for cycle in range(cycles):
+            app.load_notebook(notebook_file)
+            while app.stream_load is not None:
+                app.root.update()
+                time.sleep(0.001)
+            app.root.update()
+            for index in range(0, len(app.pages), 2):
+                app.go_to_page(index)
+                app.root.update()
+            app.modified = False  # Paging past the end adds pages - don't ask to save them
+            app.new_notebook()
+            app.root.update()
+            gc.collect()
+            
+            counts, rss = RESOURCES.counts(), current_rss()
+            samples.append((counts, rss))
+            line = ", ".join(f"{kind} {count}" for kind, count in sorted(counts.items()))
+            print(f"Cycle {cycle + 1}: {line}" + (f", RSS {format_bytes(rss)}" if rss else ""))
+    finally:
+        app.cleanup_resources()
+        app.root.destroy()
+    
+    if len(samples) < 3:
+        print("Leak test needs at least 3 cycles")
+        return 2
+    
+    failures = []
+    baseline = samples[1][0]
+    for kind, count in samples[-1][0].items():
+        if count > baseline.get(kind, 0):
+            failures.append(f"{kind}: {baseline.get(kind, 0)} -> {count} live")
+    
+    rss = [sample[1] for sample in samples[1:]]
+    if None not in rss:
+        growth = rss[-1] - rss[0]
+        steady = all(later >= earlier for earlier, later in zip(rss, rss[1:]))
+        if steady and growth > max(LEAK_RSS_SLACK, rss[0] * 0.05):
+            failures.append(f"RSS grew every cycle: {format_bytes(rss[0])} -> {format_bytes(rss[-1])}")
+    
+    for failure in failures:
+        print(f"LEAK {failure}")
+    print("Leak test " + ("FAILED" if failures else "passed"))
+    return 1 if failures else 0
+
+
+def run_command_line(args):
+    """Tools: --diff OLD NEW, --merge BASE OURS THEIRS [-o OUT], --convert IN OUT, --leak-test FILE"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="Notebook.py")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="list changes between two notebooks")
+    group.add_argument("--merge", nargs=3, metavar=("BASE", "OURS", "THEIRS"), help="three-way merge")
+    group.add_argument("--convert", nargs=2, metavar=("IN", "OUT"),
+                       help=f"copy a notebook between JSON and SQLite ({STORE_EXTENSION}) files")
+    group.add_argument("--leak-test", metavar="NOTEBOOK",
+                       help="load, page through and close NOTEBOOK repeatedly, checking for leaks (opens the GUI)")
+    parser.add_argument("--cycles", type=int, default=5, help="leak test repetitions (default 5)")
+    parser.add_argument("-o", "--output", help="merged notebook file (default: print to stdout)")
+    options = parser.parse_args(args)
+    
+    if options.leak_test:
+        return run_leak_test(options.leak_test, options.cycles)
+    
+    if options.convert:
+        source, target = options.convert
+        write_notebook_data(read_notebook_data(source), target)
+        return 0
+    
+    if options.diff:
+        for change in diff_notebooks(*(read_notebook_data(path) for path in options.diff)):
+            print(change)
+        return 0
+    
+    merge = NotebookMerge(*(read_notebook_data(path) for path in options.merge))
+    merged = merge.run()
+    if options.output:
+        write_notebook_data(merged, options.output)
+    else:
+        print(json.dumps(merged, indent=2, ensure_ascii=False))
+    for conflict in merge.conflicts:
+        where = conflict["page"] + (f" / {conflict['widget']}" if conflict["widget"] else "")
+        field = f" {conflict['field']}" if conflict["field"] else ""
+        print(f"CONFLICT {where}{field}: {conflict['reason']}", file=sys.stderr)
+    return 1 if merge.conflicts else 0
+
+
+def count_widgets(widget):
+    """Count a widget and all its descendants"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class MemoryBudget:
+    """Memory accountant for bound pages
+    
+    Keeps an estimate of each bound page's decoded image pixels, PhotoImages
+    and widgets. When the total goes over budget, the least recently viewed
+    hidden pages are evicted: first their images are unloaded, then their
+    surface is handed back to the pool. Both come back when the page is shown.
+    """
+    WIDGET_COST = 4 * 1024  # Rough bytes per Tk widget (Tcl object, X window, Python wrapper)
+    
+    def __init__(self, app, budget_bytes):
+        self.app = app
+        self.budget_bytes = budget_bytes
+        self.view_clock = 0
+        # Page -> view_clock value when last shown or prefetched (pages of closed notebooks drop out)
+        self.last_viewed = weakref.WeakKeyDictionary()
+    
+    def touch(self, page):
+        """Record that a page was just viewed"""
+        self.view_clock += 1
+        self.last_viewed[page] = self.view_clock
+    
+    def usage(self):
+        """Estimated usage per bound page"""
+        return {page: page.memory_usage() for page in self.app.page_pool.bound_pages()}
+    
+    def total(self, usage=None):
+        """Estimated total bytes across bound pages"""
+        usage = self.usage() if usage is None else usage
+        return sum(sum(page_usage.values()) for page_usage in usage.values())
+    
+    def enforce(self):
+        """Evict least recently viewed hidden pages until under budget"""
+        usage = self.usage()
+        total = self.total(usage)
+        if total <= self.budget_bytes:
+            return 0
+        
+        candidates = sorted(
+            (page for page in usage if not page.visible),
+            key=lambda page: self.last_viewed.get(page, 0)
+        )
+        
+        freed = 0
+        # First pass drops decoded images, second pass unbinds whole pages
+        for evict_widgets in (False, True):
+            for page in candidates:
+                if total - freed <= self.budget_bytes:
+                    return freed
+                if evict_widgets:
+                    if page.surface is not None:
+                        freed += usage[page]["widgets"]
+                        self.app.page_pool.release(page)
+                else:
+                    page_usage = usage[page]
+                    if page_usage["pixels"] or page_usage["photos"]:
+                        page.unload_images()
+                        freed += page_usage["pixels"] + page_usage["photos"]
+                        page_usage["pixels"] = page_usage["photos"] = 0
+        return freed
+
+
+class PageSurface:
+    """Reusable page frame + canvas that shows one Page at a time"""
+    def __init__(self, parent):
+        self.page = None  # Page currently bound to this surface
+        
+        # Create page frame
+        self.frame = LightFrame(
+            parent,
+            fg_color="#c1a273",
+            border_width=0,
+            corner_radius=0
+        )
+        
+        # Canvas for drawing selection boxes and images
+        self.canvas = tk.Canvas(
+            self.frame,
+            highlightthickness=0
+        )
+        self.canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.canvas.configure(bg="#c1a273")
+    
+    def reset(self):
+        """Clear everything a page drew so the surface can be rebound"""
+        self.frame.place_forget()
+        self.canvas.delete("all")
+        self.canvas.focused_image = None
+        self.canvas.configure(bg="#c1a273", cursor="")
+
+
+class PageView:
+    """The pages placed on screen and how (in the spread or focused)
+    
+    Navigation passes the pages the new view needs. Only pages whose placement
+    differs are hidden or shown, so a view change touches the two or three
+    pages involved however many pages the notebook has.
+    """
+    SPREAD = "spread"
+    FOCUSED = "focused"
+    
+    def __init__(self):
+        self.placed = {}  # Page -> SPREAD or FOCUSED
+    
+    def show(self, spread=(), focused=None):
+        """Make these the only placed pages (None entries are skipped)"""
+        wanted = {page: self.SPREAD for page in spread if page is not None}
+        if focused is not None:
+            wanted[focused] = self.FOCUSED
+        
+        # Hide first, so the surfaces of pages going away can be reused
+        for page, how in list(self.placed.items()):
+            if wanted.get(page) != how:
+                page.hide()
+                del self.placed[page]
+        
+        for page, how in wanted.items():
+            # A page hidden or unbound behind our back is placed again
+            if self.placed.get(page) == how and page.visible:
+                continue
+            if how == self.FOCUSED:
+                page.show_focused()
+            else:
+                page.show()
+            self.placed[page] = how
+    
+    def forget(self):
+        """Drop the placed pages without touching them (their surfaces were reset)"""
+        self.placed.clear()
+
+
+class PageSurfacePool:
+    """Fixed-size pool of page surfaces shared by all pages
+    
+    Only the visible spread and its prefetched neighbours are bound to a surface.
+    When the pool is full the least recently used hidden page gives its surface
+    up, so the number of page widgets stays constant however many pages exist.
+    """
+    def __init__(self, parent, size, on_create=None):
+        self.parent = parent
+        self.size = size
+        self.on_create = on_create  # Called once for each new surface (event bindings)
+        self.surfaces = []          # All surfaces ever created
+        self.lru = []               # Bound surfaces, least recently used first
+    
+    def acquire(self, page):
+        """Bind a page to a surface (no-op if it already has one)"""
+        if page.surface is not None:
+            self.touch(page.surface)
+            return page.surface
+        
+        surface = self._take_surface()
+        page.bind(surface)
+        self.lru.append(surface)
+        return surface
+    
+    def touch(self, surface):
+        """Mark a surface as most recently used"""
+        if surface in self.lru:
+            self.lru.remove(surface)
+            self.lru.append(surface)
+    
+    def release(self, page, keep_content=True):
+        """Unbind a page and return its surface to the pool"""
+        surface = page.surface
+        if surface is None:
+            return
+        page.unbind(keep_content)
+        if surface in self.lru:
+            self.lru.remove(surface)
+    
+    def release_all(self, keep_content=False):
+        """Unbind every page (used when the whole notebook is replaced)"""
+        for surface in list(self.lru):
+            if surface.page is not None:
+                self.release(surface.page, keep_content)
+        self.lru.clear()
+    
+    def bound_pages(self):
+        """Pages currently bound to a surface"""
+        return [surface.page for surface in self.lru if surface.page is not None]
+    
+    def _take_surface(self):
+        """Get a free surface, creating one or evicting the LRU hidden page"""
+        for surface in self.surfaces:
+            if surface.page is None:
+                return surface
+        
+        if len(self.surfaces) < self.size:
+            return self._create_surface()
+        
+        for surface in self.lru:
+            if not surface.page.visible:
+                self.release(surface.page)
+                return surface
+        
+        # Everything is on screen - grow rather than hide a visible page
+        return self._create_surface()
+    
+    def _create_surface(self):
+        surface = PageSurface(self.parent)
+        self.surfaces.append(surface)
+        if self.on_create:
+            self.on_create(surface)
+        return surface
+
+
+# Page class
+class Page:
+    """Represents a single page in the notebook
+    
+    A page only owns widgets while it is bound to a PageSurface. Otherwise its
+    content is kept in serialized form and rebuilt when the page is bound again.
+    """
+    def __init__(self, parent, is_left_page, page_number, name=None, app=None):
+        self.parent = parent
+        self.app = app
+        self.is_left_page = is_left_page
+        self.page_number = page_number
+        self.name = name or f"Page {page_number + 1}"  # Default name
+        self.page_id = str(uuid.uuid4())  # Stable across saves - lets copies be merged
+        RESOURCES.track(self)
+        
+        self.surface = None  # PageSurface while bound
+        self.visible = False
+        
+        # Serialized textboxes/images while unbound
+        self.stored_data = {"textboxes": [], "images": []}
+        
+        # Store widgets on this page (only while bound)
+        self.textboxes = []  # FormattedTextWidget objects (StaticTextbox when not being edited)
+        self.images = []     # ImageWidget objects
+        self.missing_images = []  # Image entries whose file couldn't be found - kept for saving
+        
+        # Sidebar thumbnail hash, reused while stored_data is this same object
+        # (and, while bound, until the next edit)
+        self.thumbnail_source = None
+        self.thumbnail_generation = None
+        self.thumbnail_key = None
+        self.thumbnail_content = None
+    
+    @property
+    def frame(self):
+        """Frame of the bound surface (None while unbound)"""
+        return self.surface.frame if self.surface else None
+    
+    @property
+    def canvas(self):
+        """Canvas of the bound surface (None while unbound)"""
+        return self.surface.canvas if self.surface else None
+    
+    def set_name(self, name):
+        """Set the page name"""
+        self.name = name
+        
+    def get_display_text(self):
+        """Get display text for buttons/labels"""
+        return f"{self.page_number + 1}. {self.name}"
+    
+    def ensure_bound(self):
+        """Make sure this page has a surface and live widgets"""
+        if self.surface is None:
+            self.get_app().page_pool.acquire(self)
+        else:
+            self.get_app().page_pool.touch(self.surface)
+    
+    def bind(self, surface):
+        """Attach to a surface and rebuild widgets from the stored data"""
+        self.surface = surface
+        surface.page = self
+        self.bg_id = None
+        if PAGE_BACKGROUNDS:
+            self.try_load_background()
+        
+        data = self.stored_data
+        self.stored_data = None
+        self.build_widgets(data)
+    
+    def unbind(self, keep_content=True):
+        """Detach from the surface, keeping content as serialized data"""
+        if keep_content:
+            self.stored_data = self.serialize_content()
+        else:
+            self.stored_data = {"textboxes": [], "images": []}
+        self.clear()
+        self.visible = False
+        
+        surface = self.surface
+        self.surface = None
+        self.bg_id = None
+        self.bg_photo = None
+        surface.page = None
+        surface.reset()
+    
+    def show(self):
+        """Show this page"""
+        self.ensure_bound()
+        if self.is_left_page:
+            self.frame.place(relx=0, rely=0, relwidth=0.5, relheight=1.0)
+        else:
+            self.frame.place(relx=0.5, rely=0, relwidth=0.5, relheight=1.0)
+        self.on_shown()
+    
+    def show_focused(self):
+        """Show this page centered on its own (focus mode)"""
+        self.ensure_bound()
+        self.frame.place(relx=0.25, rely=0, relwidth=0.5, relheight=1.0)
+        self.frame.lift()
+        self.on_shown()
+    
+    def on_shown(self):
+        """Bring back evicted resources and record the view"""
+        self.visible = True
+        for image in self.images:
+            image.ensure_loaded()
+        if PAGE_BACKGROUNDS:
+            self.apply_background()
+        self.get_app().memory_budget.touch(self)
+    
+    def unload_images(self):
+        """Free decoded pixels of all images (reloaded when the page is shown)"""
+        for image in self.images:
+            image.unload()
+    
+    def memory_usage(self):
+        """Estimated bytes held by this page's live resources"""
+        usage = {"pixels": 0, "photos": 0, "widgets": 0}
+        for image in self.images:
+            for key, value in image.memory_usage().items():
+                usage[key] += value
+        if self.surface is not None:
+            usage["widgets"] = count_widgets(self.frame) * MemoryBudget.WIDGET_COST
+        return usage
+    
+    def diagnostics(self):
+        """Counts and decoded image bytes for the memory diagnostics window"""
+        stats = {"original": 0, "display": 0, "photo": 0, "widgets": 0}
+        if self.surface is None:
+            # Unbound pages only hold their serialized content
+            textboxes = [text_data_stats(data) for data in self.stored_data["textboxes"]]
+            stats["images"] = len(self.stored_data["images"])
+        else:
+            textboxes = [textbox.text_stats() for textbox in self.textboxes]
+            stats["images"] = len(self.images)
+            for image in self.images:
+                for key, value in image.image_bytes().items():
+                    stats[key] += value
+            stats["widgets"] = count_widgets(self.frame)
+        stats["textboxes"] = len(textboxes)
+        stats["chars"] = sum(chars for chars, _ in textboxes)
+        stats["tags"] = sum(tags for _, tags in textboxes)
+        return stats
+    
+    def hide(self):
+        """Hide this page (it stays bound until the pool needs its surface)"""
+        self.get_app().selection.forget_page(self)
+        if self.surface is not None:
+            self.frame.place_forget()
+        self.visible = False
+    
+    def add_textbox(self, x, y, width, height, widget_id=None):
+        """Add a textbox to this page"""
+        self.ensure_bound()
+        textbox = FormattedTextWidget(self.frame, x, y, width, height, page_color="#c1a273", widget_id=widget_id)
+        textbox.toolbar = self.get_app().formatting_toolbar
+        textbox.page = self
+        textbox.register_events(self.get_app().events)
+        self.textboxes.append(textbox)
+        return textbox
+    
+    def add_image(self, x, y, image_path, widget_id=None, width=None, height=None):
+        """Add an image to this page"""
+        self.ensure_bound()
+        image_widget = ImageWidget(self.canvas, x, y, image_path, widget_id=widget_id, width=width, height=height)
+        # Set the parent page reference
+        image_widget.parent_page = self
+        self.images.append(image_widget)
+        return image_widget
+    
+    def clear(self):
+        """Clear all widgets from this page"""
+        self.get_app().selection.forget_page(self)
+        for textbox in self.textboxes:
+            if isinstance(textbox, StaticTextbox):
+                textbox.destroy()
+            else:
+                textbox.toolbar.detach(textbox)
+                textbox.frame.destroy()
+        self.textboxes.clear()
+        
+        for image in self.images:
+            image.canvas.delete(image.image_id)
+            image.canvas.delete(image.border_id)
+            image.canvas.delete(image.resize_handle_id)
+            # Clean up image resources
+            image.unload()
+        self.images.clear()
+        self.missing_images.clear()
         
-        # Also check notebook directory if we have a current file
+        if self.surface is None:
+            self.stored_data = {"textboxes": [], "images": []}
+    def try_load_background(self):
+        """Try to load background.png as page background (decoded once, shared by all pages)"""
         app = self.get_app()
-        if app and hasattr(app, 'current_file') and app.current_file:
-            notebook_dir = os.path.dirname(app.current_file)
-            bg_paths.insert(0, os.path.join(notebook_dir, "background.png"))
-        
-        for bg_path in bg_paths:
-            if os.path.exists(bg_path):
-                try:
-                    self.bg_image = Image.open(bg_path)
-                    # Schedule background application after canvas is sized
-                    self.canvas.after(100, self.apply_background)
-                    break
-                except:
-                    continue
-        
-        # If no image found, use default color
-        if not hasattr(self, 'bg_image') or self.bg_image is None:
+        if app is None or not app.background_cache.load_source(app.current_file):
+            # If no image found, use default color
             self.canvas.configure(bg="#c1a273")
+            return
+        self.apply_background()
 
     def get_app(self):
         """Get reference to main app instance"""
+        if self.app is not None:
+            return self.app
         parent = self.parent
         while parent and not hasattr(parent, 'current_file'):
             parent = parent.master
         return parent
 
     def apply_background(self):
-        """Apply the background image - handles 2-page spreads!"""
-        if not hasattr(self, 'bg_image'):
+        """Apply the shared background image for this page's half and size"""
+        app = self.get_app()
+        if app is None or self.surface is None:
             return
         
-        try:
-            # Get canvas size
-            width = self.canvas.winfo_width()
-            height = self.canvas.winfo_height()
-            
-            # If canvas isn't ready yet, try again
-            if width < 10 or height < 10:
-                self.canvas.after(100, self.apply_background)
-                return
-            
-            # Check if this is a 2-page spread background
-            bg_width, bg_height = self.bg_image.size
-            
-            if bg_width >= 1920 and bg_height >= 1080:
-                # This looks like a full-window background!
-                # Calculate which half to show based on page position
-                
-                if self.is_left_page:
-                    # Left page: show left half of image
-                    crop_box = (0, 0, bg_width // 2, bg_height)
-                else:
-                    # Right page: show right half of image
-                    crop_box = (bg_width // 2, 0, bg_width, bg_height)
-                
-                # Crop and resize
-                cropped = self.bg_image.crop(crop_box)
-                resized = cropped.resize((width, height), Image.Resampling.LANCZOS)
-            else:
-                # Normal single-page background - just resize
-                resized = self.bg_image.resize((width, height), Image.Resampling.LANCZOS)
-            
-            self.bg_photo = ImageTk.PhotoImage(resized)
-            
-            # Create or update background
-            if hasattr(self, 'bg_id'):
-                self.canvas.itemconfig(self.bg_id, image=self.bg_photo)
-            else:
-                self.bg_id = self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
-                self.canvas.tag_lower(self.bg_id)
-                
-        except Exception as e:
-            print(f"Failed to apply background: {e}")
+        # Pages always fill half of the page container
+        width, height = app.get_page_size()
+        if width < 10 or height < 10:
+            # Container isn't sized yet - its <Configure> handler applies it later
+            return
+        
+        half = "left" if self.is_left_page else "right"
+        photo = app.background_cache.get(half, width, height)
+        if photo is None:
             # Fallback to color
             self.canvas.configure(bg="#c1a273")
+            return
+        
+        self.bg_photo = photo
+        
+        # Create or update background
+        if self.bg_id:
+            self.canvas.itemconfig(self.bg_id, image=self.bg_photo)
+        else:
+            self.bg_id = self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
+            self.canvas.tag_lower(self.bg_id)
+    
+    def serialize_content(self):
+        """Serialize the textboxes and images on this page"""
+        if self.surface is None:
+            # Copy image entries - saving rewrites their paths in place
+            return {
+                "textboxes": list(self.stored_data["textboxes"]),
+                "images": [dict(image) for image in self.stored_data["images"]]
+            }
+        return {
+            "textboxes": [tb.serialize() for tb in self.textboxes],
+            "images": [img.serialize() for img in self.images] + [dict(image) for image in self.missing_images]
+        }
+    
     def serialize(self):
         """Serialize page data for saving"""
+        content = self.serialize_content()
         return {
+            "id": self.page_id,
             "page_number": self.page_number,
             "name": self.name,
             "is_left_page": self.is_left_page,
-            "textboxes": [tb.serialize() for tb in self.textboxes],
-            "images": [img.serialize() for img in self.images]
+            "textboxes": content["textboxes"],
+            "images": content["images"]
         }
     
     def deserialize(self, data, notebook_app):
-        """Restore page from serialized data"""
+        """Restore page from serialized data (widgets are built when the page is bound)"""
         # Clear existing widgets
         self.clear()
         
         # Set page name
         self.name = data.get("name", f"Page {self.page_number + 1}")
+        self.page_id = data.get("id") or self.page_id
+        
+        content = {
+            "textboxes": data.get("textboxes", []),
+            "images": data.get("images", [])
+        }
+        if self.surface is None:
+            self.stored_data = content
+        else:
+            self.build_widgets(content)
+    
+    def build_widgets(self, data):
+        """Create live widgets on the bound surface from serialized content"""
+        notebook_app = self.get_app()
         
-        # Restore textboxes
+        # Restore textboxes - drawn on the canvas until someone edits them
         for textbox_data in data.get("textboxes", []):
-            textbox = self.add_textbox(
-                x=textbox_data["x"],
-                y=textbox_data["y"],
-                width=textbox_data["width"],
-                height=textbox_data["height"],
-                widget_id=textbox_data.get("id")
-            )
-            
-            # Set formatted text
-            textbox.set_formatted_text(textbox_data["text"])
-            
-            # Create formatting toolbar
-            formatting_frame = notebook_app.create_formatting_toolbar(self.frame, textbox)
-            textbox.formatting_frame = formatting_frame
-            
-            # Setup focus behavior
-            def on_focus_in(e, tb=textbox):
-                tb.on_focus_in()
-                formatting_frame.place(x=tb.x, y=tb.y-40)
-                
-            def on_focus_out(e, tb=textbox):
-                tb.on_focus_out()
-                formatting_frame.place_forget()
-                
-            textbox.text_widget.bind("<FocusIn>", on_focus_in)
-            textbox.text_widget.bind("<FocusOut>", on_focus_out)
-            
-            # Clear placeholder on focus
-            def clear_placeholder(e, tb=textbox):
-                if tb.get_text() == "Click to edit...":
-                    tb.set_text("")
-                    
-            textbox.text_widget.bind("<FocusIn>", clear_placeholder, add="+")
-            
-            # Add delete on right-click
-            def delete_textbox(event, tb=textbox):
-                if event.num == 3:  # Right click
-                    tb.frame.destroy()
-                    formatting_frame.destroy()
-                    self.textboxes.remove(tb)
-                    
-            textbox.frame.bind("<Button-3>", delete_textbox)
-            textbox.text_widget.bind("<Button-3>", delete_textbox)
+            if STATIC_TEXTBOXES and static_text_supported(textbox_data):
+                self.textboxes.append(StaticTextbox(self.canvas, textbox_data))
+            else:
+                self.restore_textbox(textbox_data)
         
         # Restore images
         for image_data in data.get("images", []):
@@ -1136,15 +4318,16 @@ class Page:
             image_path = image_data["image_path"]
             if not os.path.exists(image_path):
                 # Try to find in same directory as notebook file
-                if hasattr(notebook_app, 'current_file'):
+                if getattr(notebook_app, 'current_file', None):
                     notebook_dir = os.path.dirname(notebook_app.current_file)
                     alt_path = os.path.join(notebook_dir, os.path.basename(image_path))
                     if os.path.exists(alt_path):
                         image_path = alt_path
-                    else:
-                        # Image not found, skip
-                        print(f"Warning: Image not found: {image_data['image_path']}")
-                        continue
+                if not os.path.exists(image_path):
+                    # Image not found, skip (but keep it in the page data)
+                    LOG.warning("Image not found: {path}", path=image_data["image_path"])
+                    self.missing_images.append(image_data)
+                    continue
             
             image_widget = self.add_image(
                 x=image_data["x"],
@@ -1157,6 +4340,397 @@ class Page:
             
             # IMPORTANT: Set the parent_page reference
             image_widget.parent_page = self
+        
+        # Textbox frames sit above images - keep their canvas stand-ins there too
+        self.canvas.tag_raise(StaticTextbox.TAG)
+    
+    def restore_textbox(self, textbox_data):
+        """Build a live FormattedTextWidget from serialized textbox data"""
+        textbox = self.add_textbox(
+            x=textbox_data["x"],
+            y=textbox_data["y"],
+            width=textbox_data["width"],
+            height=textbox_data["height"],
+            widget_id=textbox_data.get("id")
+        )
+        
+        # Set formatted text
+        textbox.set_formatted_text(textbox_data["text"])
+        return textbox
+    
+    def textbox_at(self, x, y):
+        """Topmost canvas-drawn textbox at a canvas point (None if there isn't one)"""
+        for textbox in reversed(self.textboxes):
+            if isinstance(textbox, StaticTextbox) and textbox.contains(x, y):
+                return textbox
+        return None
+    
+    def edit_textbox(self, static, x=None, y=None):
+        """Swap a canvas-drawn textbox for a live one and focus it (x, y: click point)"""
+        index = self.textboxes.index(static)
+        self.get_app().selection.discard(static)
+        static.destroy()
+        textbox = self.restore_textbox(static.serialize())
+        # Keep the box's place in the stacking/saving order
+        self.textboxes.remove(textbox)
+        self.textboxes.insert(index, textbox)
+        
+        textbox.text_widget.focus_set()
+        if x is not None:
+            def place_cursor():
+                try:
+                    textbox.text_widget.mark_set("insert", f"@{x - textbox.x},{y - textbox.y}")
+                except tk.TclError:
+                    pass  # Already gone again
+            textbox.text_widget.after_idle(place_cursor)
+        return textbox
+    
+    def schedule_freeze(self, textbox):
+        """Turn a textbox back into canvas items once focus has settled elsewhere"""
+        if STATIC_TEXTBOXES:
+            textbox.frame.after_idle(lambda: self.freeze_textbox(textbox))
+    
+    def freeze_textbox(self, textbox):
+        """Replace a live textbox that isn't being edited with a StaticTextbox"""
+        if (textbox not in self.textboxes or textbox.has_focus
+                or textbox.is_dragging or textbox.is_resizing):
+            return
+        data = textbox.serialize()
+        if not static_text_supported(data):
+            return
+        index = self.textboxes.index(textbox)
+        textbox.toolbar.detach(textbox)
+        textbox.frame.destroy()
+        static = StaticTextbox(self.canvas, data)
+        self.textboxes[index] = static
+        # A group selection keeps the box, now as canvas items
+        self.get_app().selection.replace(textbox, static)
+
+
+class NotebookStreamReader:
+    """Incremental reader for .notebook files
+    
+    Yields ("header", dict), then ("page", dict) for every page as soon as it
+    has been read, without holding the whole document in memory. Header keys
+    that follow the pages array come last as a second ("header", dict). Two
+    layouts are understood:
+    
+    * the standard layout - one object with "version", "metadata" and a "pages" array
+    * a chunked layout - a header object followed by one page object per chunk/line
+    """
+    CHUNK_SIZE = 1 << 20  # Characters read per step (grows for oversized values)
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.total_bytes = os.path.getsize(filepath)
+        self.bytes_read = 0
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.file = None
+    
+    def records(self):
+        """Generate ("header", dict) and then ("page", dict) records"""
+        with open(self.filepath, "rb") as self.file:
+            header = {}
+            trailer = {}  # Header keys after the pages array
+            header_sent = False
+            
+            self._expect("{")
+            if self._peek() == "}":
+                self.pos += 1
+            else:
+                while True:
+                    key = self._value()
+                    self._expect(":")
+                    if key == "pages":
+                        # Files saved here keep the header before the pages array
+                        yield "header", header
+                        header_sent = True
+                        self._expect("[")
+                        if self._peek() == "]":
+                            self.pos += 1
+                        else:
+                            while True:
+                                yield "page", self._value()
+                                if self._next_separator("]"):
+                                    break
+                    elif header_sent:
+                        trailer[key] = self._value()
+                    else:
+                        header[key] = self._value()
+                    if self._next_separator("}"):
+                        break
+            
+            if not header_sent:
+                yield "header", header
+            elif trailer:
+                yield "header", trailer
+            
+            # Chunked layout: every further top-level object is a page
+            while self._peek() is not None:
+                yield "page", self._value()
+    
+    def _fill(self, min_chars=0):
+        """Append the next chunk of the file to the buffer - False at end of file"""
+        if self.eof:
+            return False
+        data = self.file.read(max(self.CHUNK_SIZE, min_chars))
+        self.bytes_read += len(data)
+        text = self.text_decoder.decode(data, final=not data)
+        if not data:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return bool(data) or bool(text)
+    
+    def _peek(self):
+        """Next non-whitespace character (None at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return None
+    
+    def _expect(self, char):
+        """Consume a structural character"""
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Invalid notebook file: expected {char!r}, found {found!r}")
+        self.pos += 1
+    
+    def _next_separator(self, closing):
+        """Consume ',' (returns False) or the closing bracket (returns True)"""
+        found = self._peek()
+        self.pos += 1
+        if found == closing:
+            return True
+        if found != ",":
+            raise ValueError(f"Invalid notebook file: expected ',' or {closing!r}, found {found!r}")
+        return False
+    
+    def _value(self):
+        """Decode one complete JSON value, reading more of the file as needed"""
+        while True:
+            self._peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value - read at least as much again (keeps big values linear)
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof:
+                # A number could continue in the next chunk
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def format_bytes(size):
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class TaskCancelled(Exception):
+    """Raised inside a BackgroundTask worker once cancel() has been requested"""
+
+
+class BackgroundTask:
+    """Runs work(task) on a worker thread and hands its messages to the Tk thread
+
+    The worker talks to the UI only through emit(kind, payload); the queue is
+    polled with root.after and every message is passed to handlers[kind] on the
+    Tk thread. The work's return value arrives as "done", a failure as "error"
+    and a cancelled run (TaskCancelled) as "cancelled".
+    """
+    POLL_MS = 30
+    SLICE_SECONDS = 0.015  # Longest the Tk thread spends on messages per poll
+    REPORT_INTERVAL = 0.1  # Seconds between "progress" messages
+
+    def __init__(self, root, work, handlers):
+        self.root = root
+        self.work = work
+        self.handlers = handlers
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.poll_job = None
+        self.finished = False
+        self.last_report = 0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.poll_job = self.root.after(self.POLL_MS, self.poll)
+
+    def cancel(self, wait=0):
+        """Ask the worker to stop; optionally wait up to `wait` seconds for it"""
+        self.cancel_event.set()
+        if wait and self.thread is not None:
+            self.thread.join(wait)
+
+    def abandon(self):
+        """Cancel and drop whatever the worker still sends (Tk side)"""
+        self.cancel_event.set()
+        self.finished = True
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+
+    def check_cancelled(self):
+        """Called by the worker between steps"""
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def emit(self, kind, payload=None):
+        """Post a message to the Tk thread (worker side)"""
+        self.messages.put((kind, payload))
+
+    def report(self, progress, force=False):
+        """Post a copy of the progress dict, at most every REPORT_INTERVAL (worker side)"""
+        now = time.perf_counter()
+        if force or now - self.last_report >= self.REPORT_INTERVAL:
+            self.last_report = now
+            self.emit("progress", dict(progress))
+
+    def _run(self):
+        try:
+            result = self.work(self)
+        except TaskCancelled:
+            self.emit("cancelled")
+        except Exception as e:
+            self.emit("error", e)
+        else:
+            self.emit("done", result)
+
+    def poll(self):
+        """Handle queued messages for one time slice, then reschedule"""
+        self.poll_job = None
+        deadline = time.perf_counter() + self.SLICE_SECONDS
+        while not self.finished and time.perf_counter() < deadline:
+            if not self.handle_next(block=False):
+                break
+        if not self.finished:
+            delay = 1 if not self.messages.empty() else self.POLL_MS
+            self.poll_job = self.root.after(delay, self.poll)
+
+    def handle_next(self, block=True):
+        """Dispatch one message - False if there was none (or the task is over)"""
+        if self.finished:
+            return False
+        try:
+            kind, payload = self.messages.get(block=block)
+        except queue.Empty:
+            return False
+        if kind in ("done", "error", "cancelled"):
+            self.finished = True
+            if self.poll_job is not None:
+                self.root.after_cancel(self.poll_job)
+                self.poll_job = None
+        handler = self.handlers.get(kind)
+        if handler is not None:
+            if payload is None and kind == "cancelled":
+                handler()
+            else:
+                handler(payload)
+        return True
+
+
+class ProgressPanel:
+    """Small non-modal status strip at the bottom of the window
+
+    Shows what a background load/save is doing with a Cancel button, then a
+    short result message that hides itself (errors stay until closed).
+    """
+    def __init__(self, root):
+        self.root = root
+        self.frame = None
+        self.hide_job = None
+        self.on_cancel = None
+
+    def build(self):
+        self.frame = ctk.CTkFrame(
+            self.root,
+            fg_color="#f5e8c8",
+            border_width=1,
+            border_color="#a08c6e",
+            corner_radius=6
+        )
+        self.label = ctk.CTkLabel(self.frame, text="", text_color="#4a3c28")
+        self.label.pack(side="left", padx=(12, 8), pady=6)
+        self.button = ctk.CTkButton(
+            self.frame,
+            text="Cancel",
+            width=70,
+            height=24,
+            fg_color="#a08c6e",
+            hover_color="#8b7355",
+            command=self.on_button
+        )
+        self.button.pack(side="left", padx=(0, 8), pady=6)
+
+    def show(self, text, button_text=None):
+        if self.frame is None:
+            self.build()
+        if self.hide_job is not None:
+            self.root.after_cancel(self.hide_job)
+            self.hide_job = None
+        self.label.configure(text=text)
+        if button_text:
+            self.button.configure(text=button_text)
+            self.button.pack(side="left", padx=(0, 8), pady=6)
+        else:
+            self.button.pack_forget()
+        self.frame.place(relx=0.5, rely=1.0, y=-12, anchor="s")
+        self.frame.lift()
+
+    def start(self, text, on_cancel):
+        """Show a running operation that can be cancelled"""
+        self.on_cancel = on_cancel
+        self.show(text, "Cancel")
+
+    def update(self, text):
+        if self.frame is not None:
+            self.label.configure(text=text)
+
+    def finish(self, text, delay=2500):
+        """Show a result for a moment"""
+        self.on_cancel = None
+        self.show(text)
+        self.hide_job = self.root.after(delay, self.hide)
+
+    def fail(self, text):
+        """Show an error until the user closes it"""
+        self.on_cancel = None
+        self.show(text, "Close")
+
+    def on_button(self):
+        callback, self.on_cancel = self.on_cancel, None
+        if callback is not None:
+            self.button.pack_forget()
+            self.label.configure(text="Cancelling...")
+            callback()
+        else:
+            self.hide()
+
+    def hide(self):
+        self.hide_job = None
+        if self.frame is not None:
+            self.frame.place_forget()
 
 
 # PageCornerButton and SoundPlayer classes remain the same...
@@ -1278,62 +4852,182 @@ class PageCornerButton:
 
 
 class SoundPlayer:
-    """Handles playing sound effects"""
+    """Audio subsystem - decodes sounds once to PCM and plays them on a worker thread
+    
+    The Tk thread only ever posts requests to a queue, so mixer start-up, decoding
+    and playback can never stall the UI. Rapid flips are debounced and limited to a
+    small set of reserved channels instead of stacking overlapping voices.
+    """
+    FLIP_DEBOUNCE = 0.06  # Seconds - flips closer together than this are dropped
+    MAX_VOICES = 2        # Reserved channels for flip sounds
+    
     def __init__(self):
-        self.sound_loaded = False
-        self.flip_sound = None
+        self.sound_loaded = False  # True once the mixer is running
+        self.mixer = None          # pygame.mixer, imported by the worker
+        self.sound_paths = {}      # name -> file name to look for
+        self.pcm = {}              # name -> decoded raw PCM bytes
+        self.sounds = {}           # name -> mixer.Sound built from the PCM
+        self.channels = []         # Reserved (channel, start time) pairs
+        self.last_request = {}     # name -> time of last accepted play request
+        self.requests = queue.Queue()
+        self.worker = None
+        self.mixer_failed = False
+    
+    def register_sound(self, name, sound_path):
+        """Register a sound file under a name - decoded on first use"""
+        self.sound_paths[name] = sound_path
+    
+    def start_in_background(self, sound_path="flip.mp3"):
+        """Start the mixer and decode the flip sound on the worker thread"""
+        self.load_flip_sound(sound_path)
+    
+    def load_flip_sound(self, sound_path="flip.mp3"):
+        """Register the flip sound and ask the worker to preload it"""
+        self.register_sound("flip", sound_path)
+        return self._post(("preload", "flip"))
+    
+    def play_flip_sound(self):
+        """Play the flip sound"""
+        self.play("flip")
+    
+    def play(self, name):
+        """Request playback of a named sound - never blocks the caller"""
+        now = time.perf_counter()
+        if now - self.last_request.get(name, float("-inf")) < self.FLIP_DEBOUNCE:
+            return
+        self.last_request[name] = now
+        self._post(("play", name))
+    
+    def shutdown(self, timeout=1.0):
+        """Stop the worker and close the mixer"""
+        if self.worker is None:
+            return
+        self.requests.put(None)
+        self.worker.join(timeout)
+        self.worker = None
+    
+    def _post(self, request):
+        """Queue a request for the worker, starting it if needed"""
+        if self.mixer_failed:
+            return False
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name="audio", daemon=True)
+            self.worker.start()
+        self.requests.put(request)
+        return True
+    
+    def _run(self):
+        """Worker loop - owns every mixer call"""
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            
+            # Collapse a backlog of play requests into the most recent one
+            while request[0] == "play" and not self.requests.empty():
+                pending = self.requests.queue[0]
+                if pending is None or pending[0] != "play":
+                    break
+                request = self.requests.get()
+            
+            kind, name = request
+            if not self._init_mixer():
+                continue
+            sound = self._get_sound(name)
+            if kind == "play" and sound is not None:
+                self._play_on_free_channel(sound)
+        
+        if self.sound_loaded:
+            try:
+                self.mixer.quit()
+            except Exception:
+                pass
+            self.sound_loaded = False
+    
+    def _init_mixer(self):
+        """Import pygame and initialize the mixer (worker thread)"""
+        if self.sound_loaded:
+            return True
+        if self.mixer_failed:
+            return False
         
-        # Initialize pygame mixer
         try:
+            import pygame
             pygame.mixer.init()
+            pygame.mixer.set_reserved(self.MAX_VOICES)
+            self.mixer = pygame.mixer
+            self.channels = [[pygame.mixer.Channel(i), 0.0] for i in range(self.MAX_VOICES)]
             self.sound_loaded = True
-            print("Sound system initialized successfully")
+            LOG.debug("Sound system initialized")
         except Exception as e:
-            print(f"Failed to initialize sound system: {e}")
-            self.sound_loaded = False
+            LOG.warning("Failed to initialize sound system: {error}", error=e)
+            self.mixer_failed = True
+        return self.sound_loaded
     
-    def load_flip_sound(self, sound_path="flip.mp3"):
-        """Load the flip sound from file"""
-        if not self.sound_loaded:
-            return False
+    def _get_sound(self, name):
+        """Get a playable sound, decoding it to PCM the first time (worker thread)"""
+        if name in self.sounds:
+            return self.sounds[name]
+        if name not in self.sound_paths:
+            return None
+        
+        sound_path = self.sound_paths[name]
+        # Try multiple locations
+        paths_to_try = [
+            sound_path,
+            resource_path(sound_path),
+            os.path.join(os.path.dirname(__file__), sound_path)
+        ]
+        
+        sound = None
+        for path in paths_to_try:
+            if os.path.exists(path):
+                try:
+                    self.pcm[name] = self.mixer.Sound(path).get_raw()
+                    sound = self.mixer.Sound(buffer=self.pcm[name])
+                    LOG.debug("Loaded sound: {path}", path=path)
+                except Exception as e:
+                    LOG.warning("Failed to load sound: {error}", error=e)
+                break
+        else:
+            LOG.info("Sound file not found in any location")
         
+        # Cache failures too, so a missing file is only searched for once
+        self.sounds[name] = sound
+        return sound
+    
+    def _play_on_free_channel(self, sound):
+        """Play on an idle reserved channel, or restart the oldest voice"""
         try:
-            # Try multiple locations
-            paths_to_try = [
-                sound_path,
-                resource_path(sound_path),
-                os.path.join(os.path.dirname(__file__), sound_path)
-            ]
-            
-            for path in paths_to_try:
-                if os.path.exists(path):
-                    self.flip_sound = pygame.mixer.Sound(path)
-                    print(f"Loaded sound: {path}")
-                    return True
-            
-            print(f"Sound file not found in any location")
-            return False
+            voice = next((v for v in self.channels if not v[0].get_busy()), None)
+            if voice is None:
+                voice = min(self.channels, key=lambda v: v[1])
+            voice[0].play(sound)
+            voice[1] = time.perf_counter()
         except Exception as e:
-            print(f"Failed to load sound: {e}")
-            return False
-    
-    def play_flip_sound(self):
-        """Play the flip sound"""
-        if self.sound_loaded and self.flip_sound:
-            try:
-                pygame.mixer.Sound.play(self.flip_sound)
-            except Exception as e:
-                print(f"Failed to play sound: {e}")
+            LOG.warning("Failed to play sound: {error}", error=e)
 
 
 class NotebookApp:
     def __init__(self):
+        self.startup_timer = StartupTimer(STARTUP_T0)
+        self.startup_timer.mark("imports")
+        
+        # Font probing runs while the window is being built
+        start_font_discovery()
+        
         ctk.set_appearance_mode("light")
         
-        self.root = TkinterDnD.Tk()
+        # Plain Tk root - tkdnd is loaded into it after the first spread is drawn
+        self.root = tk.Tk()
         ctk.set_appearance_mode("light")
         self.root.title("Notebook App Version 0.9")
         
+        # Times UI handlers and event loop ticks - wrapped before anything binds them
+        self.latency = LatencyMonitor(self.root)
+        self.latency.instrument(self, UI_HANDLERS)
+        self.latency.instrument(FormattedTextWidget, ["apply_motion"])
+        
         self.setup_sidebar_close_binding()
 
         # Set max size to 1920x1080
@@ -1344,22 +5038,33 @@ class NotebookApp:
         # Save/Load state
         self.current_file = None
         self.modified = False
-        
-        # Print font status
-        if HAS_CUSTOM_FONT:
-            print(f"Using custom font: {CUSTOM_FONTS[0]}")
-        else:
-            print("Using default fonts")
-        
-        # Initialize sound player
+        self.file_mtime = None  # Modification time of current_file when we last read/wrote it
+        self.edit_generation = 0  # Bumped on every edit - tells a finished save if it is stale
+        self.stream_load = None  # Pages still being read by load_notebook
+        self.save_task = None  # Save running in the background
+        self.merge_task = None  # Merge reading the other copies in the background
+        self.history = None  # NotebookHistory of the file last saved/browsed
+        self.progress_panel = ProgressPanel(self.root)
+        
+        # Sound player - the mixer is started after the first spread is drawn
         self.sound_player = SoundPlayer()
-        self.sound_player.load_flip_sound("flip.mp3")
         
         # Hidden top bar
         self.top_bar_visible = False
         self.top_bar = None
         self.sidebar_visible = False
         
+        # Page thumbnails for the sidebar rows on screen
+        self.thumbnails = ThumbnailCache(self.root)
+        self.thumbnails.on_ready = self.on_thumbnails_ready
+        
+        # Catalog of known notebooks for the Library window
+        self.library = NotebookLibrary(LIBRARY_FILE, self.thumbnails)
+        self.library_task = None
+        self.library_window = None
+        self.sidebar_rows = []  # (row widget, page) in list order
+        self.thumbnail_job = None
+        
         # Text box creation state
         self.creating_textbox = False
         self.selection_start = None
@@ -1381,6 +5086,40 @@ class NotebookApp:
         )
         self.page_container.pack(fill="both", expand=True, padx=0, pady=0)
         
+        # One formatting toolbar for every textbox (built on first use)
+        self.formatting_toolbar = FormattingToolbar(self, self.page_container)
+        
+        # Evicts resources of pages that haven't been viewed recently
+        self.memory_budget = MemoryBudget(self, MEMORY_BUDGET_MB * 1024 * 1024)
+        
+        # Textbox and page canvas events are bound once per class and routed from here
+        self.events = EventDispatcher(self.root, self.latency)
+        self.textbox_press_geometry = None  # (x, y, width, height) when a textbox move/resize started
+        self.selection = GroupSelection(self)  # Multi-selection on one page
+        self.latency.instrument(self.selection, ["apply_drag"])
+        self.overview = SpreadOverview(self)  # Grid of all spreads (built on first use)
+        self.setup_textbox_events()
+        self.setup_page_canvas_bindings()
+        
+        # Recycled page frames/canvases - pages borrow one while bound
+        self.page_pool = PageSurfacePool(self.page_container, PAGE_POOL_SIZE, on_create=self.setup_page_canvas_events)
+        self.view = PageView()  # Which pages are placed, so navigation only touches those that change
+        self.prefetch_job = None
+        
+        # Held arrow keys move a pending target instead of flipping (see queue_flip)
+        self.flip_target = None  # (focus_mode, page index) to jump to
+        self.flip_job = None
+        self.last_flip_key = 0.0
+        
+        # Shared page backgrounds, rebuilt once per (debounced) window resize
+        self.background_cache = BackgroundCache(self.root)
+        if PAGE_BACKGROUNDS:
+            self.page_container.bind(
+                "<Configure>",
+                lambda e: self.background_cache.schedule_refresh(self.refresh_page_backgrounds),
+                add="+"
+            )
+        
         # Create page corner buttons with sound player reference
         self.prev_corner = PageCornerButton(self.root, is_previous=True, 
                                            command=self.previous_page, 
@@ -1392,19 +5131,14 @@ class NotebookApp:
                                            sound_player=self.sound_player)
         self.next_corner.place(relx=1.0, rely=1.0, anchor="se")
         
-        # Create top bar FIRST
-        self.create_top_bar()
-        self.top_bar.place_forget()
         self.setup_keyboard_shortcuts()
-        # Initialize pages AFTER creating top bar
+        # Initialize pages - the top bar is built later, once they are on screen
         self.initialize_pages()
         
         # Bind text box creation events
         self.setup_textbox_creation()
         # NEW: Setup global click handler
         self.setup_global_click_handler()
-        # Setup image drag and drop
-        self.setup_image_drag_drop()
         
         # Setup clipboard paste
         self.setup_clipboard_paste()
@@ -1412,14 +5146,11 @@ class NotebookApp:
         # Create seam (must be after pages are initialized)
         self.create_seam()
         
-        # Sidebar for page selector
+        # Sidebar for page selector (built after the first spread)
         self.sidebar = None
         
         # Bind mouse movement to show/hide bar
         self.setup_top_bar_behavior()
-        
-        # Create sidebar
-        self.create_sidebar()
     
         # Initialize page name editor
         self.page_name_editor = None
@@ -1429,12 +5160,62 @@ class NotebookApp:
         
         # Bind for modifications
         self.setup_modification_tracking()
+        
+        # Draw the first spread now, then finish the rest of startup step by step
+        self.root.update()
+        self.startup_timer.mark("first spread")
+        self.startup_steps = [
+            self.setup_fonts_after_startup,
+            self.setup_top_bar_after_startup,
+            self.create_sidebar,
+            self.setup_image_drag_drop,
+            lambda: self.sound_player.start_in_background("flip.mp3"),
+        ]
+        self.root.after(1, self.run_next_startup_step)
+
+    def run_next_startup_step(self):
+        """Run one deferred startup step per event loop turn so the UI stays responsive"""
+        if self.startup_steps:
+            step = self.startup_steps.pop(0)
+            try:
+                step()
+            except Exception as e:
+                LOG.error("Startup step failed: {error}", error=e)
+            self.root.after(1, self.run_next_startup_step)
+        else:
+            self.startup_timer.mark("ready")
+            LOG.info("Startup timings: {report}", report=self.startup_timer.report())
+
+    def setup_fonts_after_startup(self):
+        """Wait for background font discovery and report the result"""
+        wait_for_fonts()
+        if HAS_CUSTOM_FONT:
+            LOG.debug("Using custom font: {font}", font=CUSTOM_FONTS[0])
+        else:
+            LOG.debug("Using default fonts")
+
+    def setup_top_bar_after_startup(self):
+        """Build the (hidden) top bar once the first spread is visible"""
+        if self.top_bar is None:
+            self.create_top_bar()
+            if not self.top_bar_visible:
+                self.top_bar.place_forget()
 
     def setup_modification_tracking(self):
         """Setup tracking for modifications"""
         # Track text changes
         def on_text_change(event):
+            try:
+                if not event.widget.edit_modified():
+                    return  # Flag was reset after text was loaded, not typed
+            except (AttributeError, tk.TclError):
+                pass
             self.set_modified(True)
+            # Tk only fires <<Modified>> when the flag changes - clear it so the next edit fires again
+            try:
+                event.widget.edit_modified(False)
+            except (AttributeError, tk.TclError):
+                pass
         self.root.bind_all('<<Modified>>', on_text_change)
         
         # Track other modifications
@@ -1442,6 +5223,8 @@ class NotebookApp:
 
     def set_modified(self, modified=True):
         """Set modified flag and update window title"""
+        if modified:
+            self.edit_generation += 1
         if self.modified != modified:
             self.modified = modified
             self.update_window_title()
@@ -1466,8 +5249,9 @@ class NotebookApp:
             if response is None:  # Cancel
                 return
             elif response:  # Yes
-                if not self.save_notebook():
-                    return  # Save was cancelled
+                # Close once the save has finished
+                self.save_notebook(then=self.on_closing)
+                return
         
         # Clean up resources
         self.cleanup_resources()
@@ -1477,43 +5261,49 @@ class NotebookApp:
         # Remove the existing motion binding
         self.root.unbind("<Motion>")
         
-        # New approach: Show top bar when mouse is at top, hide when mouse moves down
-        def check_mouse_for_top_bar(event):
-            # Always show if mouse is at very top (15 pixels)
-            if event.y < 15:
-                if not self.top_bar_visible:
-                    self.show_top_bar()
-            # Hide if mouse is below 70 pixels AND top bar is visible
-            elif self.top_bar_visible and event.y > 70:
-                # But only hide if not over sidebar
-                if not (self.sidebar_visible and event.x < 250):
-                    self.hide_top_bar()
-        
         # Bind to root window (catches ALL mouse movements)
-        self.root.bind("<Motion>", check_mouse_for_top_bar)
-        
-        # Also bind to all canvases to ensure events bubble up
-        for page in self.pages:
-            page.canvas.bind("<Motion>", check_mouse_for_top_bar)
+        self.root.bind("<Motion>", self.check_mouse_for_top_bar)
+        # (Page canvases route <Motion> here through their class binding)
+    
+    def check_mouse_for_top_bar(self, event):
+        """Show top bar when mouse is at top, hide when mouse moves down"""
+        # Always show if mouse is at very top (15 pixels)
+        if event.y < 15:
+            if not self.top_bar_visible:
+                self.show_top_bar()
+        # Hide if mouse is below 70 pixels AND top bar is visible
+        elif self.top_bar_visible and event.y > 70:
+            # But only hide if not over sidebar
+            if not (self.sidebar_visible and event.x < 250):
+                self.hide_top_bar()
     def cleanup_resources(self):
         """Clean up resources before closing"""
-        try:
-            if hasattr(self, 'sound_player') and self.sound_player.sound_loaded:
-                pygame.mixer.quit()
-        except:
-            pass
+        if hasattr(self, 'sound_player'):
+            self.sound_player.shutdown()
+        self.thumbnails.shutdown()
+        self.latency.stop()
+        if self.library_task is not None:
+            self.library_task.cancel()
+        if self.merge_task is not None:
+            self.merge_task.cancel()
+        self.library.close()
+        
+        # Let a save that is still writing roll itself back
+        if self.save_task is not None:
+            self.save_task.cancel(wait=5)
+            self.save_task = None
         
         # Clear all pages
-        for page in self.pages:
-            page.clear()
-            page.frame.destroy()
+        self.cancel_streaming_load()
+        self.view.forget()
+        self.page_pool.release_all()
 
     def setup_custom_font(self):
         """Try to install custom font system-wide"""
         global HAS_CUSTOM_FONT
         
         if not HAS_CUSTOM_FONT:
-            print("No custom font files found in directory")
+            LOG.debug("No custom font files found in directory")
             return
         
         # Try to install the font
@@ -1535,7 +5325,7 @@ class NotebookApp:
             # Add the font resource
             result = AddFontResource(os.path.abspath(font_file))
             if result > 0:
-                print(f"Successfully installed font: {font_file}")
+                LOG.info("Installed font: {font}", font=font_file)
                 # Broadcast font change notification
                 HWND_BROADCAST = 0xFFFF
                 WM_FONTCHANGE = 0x001D
@@ -1543,55 +5333,39 @@ class NotebookApp:
                 SendMessage = user32.SendMessageW
                 SendMessage(HWND_BROADCAST, WM_FONTCHANGE, 0, 0)
             else:
-                print(f"Failed to install font: {font_file}")
+                LOG.warning("Failed to install font: {font}", font=font_file)
         except Exception as e:
-            print(f"Could not install font system-wide: {e}")
-            print("Font will be used locally within the application")
+            LOG.warning("Could not install font system-wide, using it locally: {error}", error=e)
 
+    def get_page_size(self):
+        """Size of one page - pages always take half of the page container"""
+        return self.page_container.winfo_width() // 2, self.page_container.winfo_height()
+    
+    def refresh_page_backgrounds(self):
+        """Re-apply backgrounds to the pages on screen after a resize"""
+        for page in self.page_pool.bound_pages():
+            if page.visible:
+                page.apply_background()
+            else:
+                # Re-applied from the shared cache when the page is shown again
+                page.bg_photo = None
+    
     def initialize_pages(self):
         """Create initial pages"""
         # Create first two pages
-        left_page = Page(self.page_container, True, 0)
-        right_page = Page(self.page_container, False, 1)
+        left_page = Page(self.page_container, True, 0, app=self)
+        right_page = Page(self.page_container, False, 1, app=self)
         
         self.pages.append(left_page)
         self.pages.append(right_page)
         
         # Show initial pages
-        left_page.show()
-        right_page.show()
-        
-        # Setup canvas events for these pages
-        self.setup_page_canvas_events(left_page)
-        self.setup_page_canvas_events(right_page)
+        self.view.show(spread=(left_page, right_page))
         
         # Update navigation
         self.update_navigation()
         # Update top bar with initial page names
         self.update_top_bar_page_name()
-    def setup_font_size_scroll(self, text_widget, display_widget):
-        """Setup mouse wheel scrolling for font size"""
-        # Store references
-        self.current_text_widget_for_scroll = text_widget
-        self.current_font_size_display = display_widget
-        
-        # Bind mouse wheel events
-        display_widget.bind("<MouseWheel>", self.on_font_size_scroll)
-        display_widget.bind("<Button-4>", self.on_font_size_scroll)  # Linux up
-        display_widget.bind("<Button-5>", self.on_font_size_scroll)  # Linux down
-        
-        # Change cursor to indicate scrollability
-        display_widget.configure(cursor="sb_v_double_arrow")
-
-    def cleanup_font_size_scroll(self):
-        """Clean up mouse wheel bindings"""
-        if hasattr(self, 'current_font_size_display') and self.current_font_size_display:
-            self.current_font_size_display.unbind("<MouseWheel>")
-            self.current_font_size_display.unbind("<Button-4>")
-            self.current_font_size_display.unbind("<Button-5>")
-            self.current_font_size_display.configure(cursor="")
-
-
     def create_seam(self):
         """Create a simple, efficient seam that stays within the app"""
         # Create seam directly on the root window
@@ -1610,9 +5384,8 @@ class NotebookApp:
         # Force seam to be above pages
         def raise_seam_above_pages():
             self.seam.lift()
-            for page in self.pages:
-                if page.frame.winfo_exists():
-                    self.seam.lift(page.frame)
+            for surface in self.page_pool.surfaces:
+                self.seam.lift(surface.frame)
         
         # Raise initially and after page changes
         self.root.after(100, raise_seam_above_pages)
@@ -1632,10 +5405,53 @@ class NotebookApp:
         self.next_page = wrapped_next_page
         self.previous_page = wrapped_previous_page
         
-    def setup_image_drag_drop(self):
-        """Setup drag and drop for images"""
-        # We'll handle this in the page-specific canvases
-        pass
+    def setup_image_drag_drop(self):
+        """Load tkdnd into the running interpreter and accept dropped image files"""
+        try:
+            from tkinterdnd2 import TkinterDnD
+            self.root.TkdndVersion = TkinterDnD._require(self.root)
+            self.dnd_available = True
+        except Exception as e:
+            LOG.info("Drag and drop not available: {error}", error=e)
+            self.dnd_available = False
+            return
+        
+        # We'll handle this in the page-specific canvases
+        for surface in self.page_pool.surfaces:
+            self.register_page_drop_target(surface)
+    
+    def register_page_drop_target(self, surface):
+        """Register a page surface's canvas as a drop target for image files"""
+        if not getattr(self, 'dnd_available', False):
+            return
+        if getattr(surface.canvas, 'dnd_registered', False):
+            return
+        
+        from tkinterdnd2 import DND_FILES
+        surface.canvas.drop_target_register(DND_FILES)
+        surface.canvas.dnd_bind('<<Drop>>', lambda e: self.handle_file_drop(e, surface.page))
+        surface.canvas.dnd_registered = True
+    
+    def handle_file_drop(self, event, page):
+        """Add dropped image files to the page they were dropped on"""
+        if page is None:
+            return event.action
+        x = event.x_root - page.canvas.winfo_rootx()
+        y = event.y_root - page.canvas.winfo_rooty()
+        
+        for path in self.root.tk.splitlist(event.data):
+            if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            try:
+                page.add_image(x, y, path)
+                self.set_modified(True)
+            except Exception as e:
+                LOG.warning("Could not add dropped image {path}: {error}", path=path, error=e)
+            # Cascade multiple drops so they don't stack exactly
+            x += 20
+            y += 20
+        
+        return event.action
     
     def setup_clipboard_paste(self):
         """Setup Ctrl+V paste for images"""
@@ -1676,15 +5492,7 @@ class NotebookApp:
         for page in self.pages:
             for textbox in page.textboxes:
                 # Check all components of the textbox
-                components = [
-                    textbox.text_widget,
-                    textbox.frame,
-                    textbox.handles_frame if hasattr(textbox, 'handles_frame') else None,
-                    textbox.move_handle if hasattr(textbox, 'move_handle') else None,
-                    textbox.resize_handle if hasattr(textbox, 'resize_handle') else None
-                ]
-                
-                for component in components:
+                for component in textbox.widgets():
                     if component and clicked_widget == component:
                         is_text_component = True
                         break
@@ -1720,168 +5528,216 @@ class NotebookApp:
         if text:
             text_widget.set_text(text)
         
-        # Create formatting toolbar
-        formatting_frame = self.create_formatting_toolbar(page.frame, text_widget)
-        text_widget.formatting_frame = formatting_frame
-        
-        # Setup focus behavior
-        def on_focus_in(e):
-            text_widget.on_focus_in()
-            formatting_frame.place(x=text_widget.x, y=text_widget.y-40)
-            
-        def on_focus_out(e):
-            text_widget.on_focus_out()
-            formatting_frame.place_forget()
-            
-        text_widget.text_widget.bind("<FocusIn>", on_focus_in)
-        text_widget.text_widget.bind("<FocusOut>", on_focus_out)
-        
-        # Clear placeholder on focus
-        def clear_placeholder(e):
-            if text_widget.get_text() == "Click to edit...":
-                text_widget.set_text("")
-                
-        text_widget.text_widget.bind("<FocusIn>", clear_placeholder, add="+")
-        
-        # Add delete on right-click
-        def delete_textbox(event):
-            if event.num == 3:  # Right click
-                text_widget.frame.destroy()
-                formatting_frame.destroy()
-                page.textboxes.remove(text_widget)
-                self.set_modified(True)
-                
-        text_widget.frame.bind("<Button-3>", delete_textbox)
-        text_widget.text_widget.bind("<Button-3>", delete_textbox)
-        
-        # Track modifications
-        def track_modification(event=None):
-            self.set_modified(True)
-            
-        text_widget.text_widget.bind("<KeyRelease>", track_modification)
-        text_widget.frame.bind("<Configure>", track_modification)
-        
-        # Bind textbox creation events to this page's canvas
-        self.setup_page_canvas_events(page)
-        
         self.set_modified(True)
         return text_widget
-    def on_font_size_scroll(self, event, text_widget):
-        """Handle mouse wheel scrolling for font size"""
-        # Determine scroll direction
-        if event.num == 4 or (hasattr(event, 'delta') and event.delta > 0):  # Scroll up
-            delta = 1
-        elif event.num == 5 or (hasattr(event, 'delta') and event.delta < 0):  # Scroll down
-            delta = -1
-        else:
-            return
-        
-        # Get current font size
-        try:
-            current_size = int(self.font_size_var.get())
-        except:
-            current_size = 45
-        
-        # Calculate new size (1-100 range)
-        new_size = current_size + delta
-        new_size = max(1, min(100, new_size))
-        
-        # Update display
-        self.font_size_var.set(str(new_size))
+    def setup_page_canvas_events(self, surface):
+        """Register a page surface's canvas with the event dispatcher (once, when the pool creates it)"""
+        # Handlers look up whichever page is bound to the surface at event time
+        self.events.register(surface.canvas, PAGE_CANVAS_TAG, surface)
         
-        # Check if text is selected
-        try:
-            sel_start = text_widget.text_widget.index("sel.first")
-            sel_end = text_widget.text_widget.index("sel.last")
-            has_selection = True
-        except tk.TclError:
-            has_selection = False
+        # Accept dropped image files (no-op until tkdnd is loaded)
+        self.register_page_drop_target(surface)
+    
+    def setup_page_canvas_bindings(self):
+        """Class bindings shared by every page canvas"""
+        bind = lambda sequence, handler: self.events.bind(PAGE_CANVAS_TAG, sequence, handler)
+        
+        bind("<Double-Button-1>", lambda surface, e: self.start_textbox_creation(e, surface.page))
+        bind("<B1-Motion>", self.on_page_canvas_drag)
+        bind("<ButtonRelease-1>", self.on_page_canvas_release)
+        bind("<Motion>", lambda surface, e: self.check_mouse_for_top_bar(e))
+        bind("<Button-1>", self.on_page_canvas_click)
+        bind("<Shift-Button-1>", self.on_page_canvas_shift_click)
+        bind("<Button-3>", self.on_page_canvas_right_click)
+    
+    def on_page_canvas_click(self, surface, event):
+        """Handle single click to remove focus from images/textboxes"""
+        page = surface.page
+        if page is None:
+            return
         
-        if has_selection:
-            # Apply to selected text
-            text_widget.change_font_size(new_size)
-            self.set_modified(True)
+        # Pressing on the selection moves the whole group
+        if self.selection.item_at(page, event.x, event.y) is not None:
+            self.selection.start_drag(event.x_root, event.y_root)
+            return "break"
+        
+        # Clicking a canvas-drawn textbox turns it into a live one for editing
+        textbox = page.textbox_at(event.x, event.y)
+        if textbox is not None:
+            self.selection.clear()
+            self.remove_image_focus()
+            self.check_click_outside_sidebar(event)
+            page.edit_textbox(textbox, event.x, event.y)
+            return "break"  # Keep the global click handler from taking focus back
+        
+        # Only handle clicks directly on canvas (not on images)
+        items = surface.canvas.find_overlapping(event.x, event.y, event.x+1, event.y+1)
+        
+        # Check if click is directly on canvas (no items at that position)
+        if not items:
+            self.remove_textbox_focus(event)
+            self.remove_image_focus()
+            # Dragging from empty canvas selects with a rubber band
+            self.selection.start_band(page, event.x, event.y)
         else:
-            # No selection - set as default for new text
-            if hasattr(text_widget, 'default_font_size'):
-                text_widget.default_font_size = new_size
+            # The click is on an item - let the image handle it
+            self.selection.clear()
+    
+    def on_page_canvas_shift_click(self, surface, event):
+        """Shift-click toggles a textbox/image in the selection (or extends it with a band)"""
+        page = surface.page
+        if page is None:
+            return
         
-        # Visual feedback on the display
-        original_color = text_widget.font_size_display.cget("fg_color")
-        text_widget.font_size_display.configure(fg_color="#d0c0a0")  # Highlight
-        text_widget.font_size_display.after(100, lambda: text_widget.font_size_display.configure(fg_color=original_color))
+        item = page.textbox_at(event.x, event.y)
+        if item is None:
+            for image in reversed(page.images):
+                if image.x <= event.x <= image.x + image.width and image.y <= event.y <= image.y + image.height:
+                    item = image
+                    break
         
+        if item is not None:
+            self.selection.toggle(page, item)
+        else:
+            self.selection.start_band(page, event.x, event.y, extend=True)
         return "break"
     
-    def reset_font_size(self, text_widget):
-        """Reset font size to default (11)"""
-        DEFAULT_SIZE = 45
-        
-        # Update the display
-        self.font_size_var.set(str(DEFAULT_SIZE))
-        
-        # Check if text is selected
-        try:
-            sel_start = text_widget.text_widget.index("sel.first")
-            sel_end = text_widget.text_widget.index("sel.last")
-            has_selection = True
-        except tk.TclError:
-            has_selection = False
-        
-        if has_selection:
-            # Apply reset to selected text only
-            text_widget.change_font_size(DEFAULT_SIZE)
+    def on_page_canvas_drag(self, surface, event):
+        """B1-Motion on a page canvas: group move, rubber band or new textbox outline"""
+        if self.selection.drag is not None:
+            self.selection.drag_to(event.x_root, event.y_root)
+        elif self.selection.band_start is not None:
+            self.selection.update_band(event.x, event.y)
         else:
-            # No selection - reset ALL text in the widget
-            # Remove all font size tags
-            for tag in list(text_widget.created_tags):
-                if tag.startswith("size"):
-                    text_widget.text_widget.tag_remove(tag, "1.0", "end")
-            
-            # Apply default size to entire widget
-            text_widget.change_font_size(DEFAULT_SIZE)
+            self.draw_selection_box(event, surface.page)
+    
+    def on_page_canvas_release(self, surface, event):
+        """ButtonRelease-1 on a page canvas: finish whatever the press started"""
+        if self.selection.drag is not None:
+            self.selection.stop_drag()
+        elif self.selection.band_start is not None:
+            self.selection.finish_band(event.x, event.y)
+        else:
+            self.finish_textbox_creation(event, surface.page)
+    
+    def on_page_canvas_right_click(self, surface, event):
+        """Right-click deletes a canvas-drawn textbox (live ones route here via the textbox tags)"""
+        page = surface.page
+        textbox = page.textbox_at(event.x, event.y) if page else None
+        if textbox is not None:
+            self.selection.discard(textbox)
+            textbox.destroy()
+            page.textboxes.remove(textbox)
+            self.set_modified(True)
+    
+    def setup_textbox_events(self):
+        """Class bindings shared by every FormattedTextWidget"""
+        bind = self.events.bind
+        
+        # Multi-selection first: shift-click toggles, the move handle of a selected box moves the group
+        for tag in (TEXTBOX_TAG, TEXTBOX_FRAME_TAG, MOVE_HANDLE_TAG):
+            bind(tag, "<Shift-Button-1>", self.on_textbox_shift_click)
+        bind(MOVE_HANDLE_TAG, "<Button-1>", self.on_group_handle_press)
+        bind(MOVE_HANDLE_TAG, "<B1-Motion>", self.on_group_handle_drag)
+        bind(MOVE_HANDLE_TAG, "<ButtonRelease-1>", self.on_group_handle_release)
+        
+        # Text area: editing, focus and the shared toolbar
+        bind(TEXTBOX_TAG, "<Button-1>", self.on_textbox_click)
+        bind(TEXTBOX_TAG, "<FocusIn>", self.on_textbox_focus_in)
+        bind(TEXTBOX_TAG, "<FocusOut>", self.on_textbox_focus_out)
+        bind(TEXTBOX_TAG, "<ButtonRelease-1>", lambda tb, e: tb.on_insert_moved(e))
+        bind(TEXTBOX_TAG, "<KeyRelease>", lambda tb, e: tb.on_insert_moved(e))
+        
+        # Frame: moving via the frame itself (alternative to the move handle)
+        bind(TEXTBOX_FRAME_TAG, "<Button-1>", self.on_textbox_press)
+        bind(TEXTBOX_FRAME_TAG, "<Button-1>", lambda tb, e: tb.start_drag_via_frame(e))
+        bind(TEXTBOX_FRAME_TAG, "<B1-Motion>", lambda tb, e: tb.do_drag(e))
+        bind(TEXTBOX_FRAME_TAG, "<ButtonRelease-1>", lambda tb, e: tb.stop_drag(e))
+        bind(TEXTBOX_FRAME_TAG, "<ButtonRelease-1>", self.on_textbox_release)
+        
+        # Move and resize handles
+        bind(MOVE_HANDLE_TAG, "<Button-1>", self.on_textbox_press)
+        bind(MOVE_HANDLE_TAG, "<Button-1>", lambda tb, e: tb.start_drag(e))
+        bind(MOVE_HANDLE_TAG, "<B1-Motion>", lambda tb, e: tb.do_drag(e))
+        bind(MOVE_HANDLE_TAG, "<ButtonRelease-1>", lambda tb, e: tb.stop_drag(e))
+        bind(MOVE_HANDLE_TAG, "<ButtonRelease-1>", self.on_textbox_release)
+        bind(RESIZE_HANDLE_TAG, "<Button-1>", self.on_textbox_press)
+        bind(RESIZE_HANDLE_TAG, "<Button-1>", lambda tb, e: tb.start_resize(e))
+        bind(RESIZE_HANDLE_TAG, "<B1-Motion>", lambda tb, e: tb.do_resize(e))
+        bind(RESIZE_HANDLE_TAG, "<ButtonRelease-1>", lambda tb, e: tb.stop_resize(e))
+        bind(RESIZE_HANDLE_TAG, "<ButtonRelease-1>", self.on_textbox_release)
+        
+        # Show handles on hover, delete on right-click
+        for tag in (TEXTBOX_TAG, TEXTBOX_FRAME_TAG):
+            bind(tag, "<Enter>", lambda tb, e: tb.show_handles(e))
+            bind(tag, "<Leave>", lambda tb, e: tb.hide_handles(e))
+            bind(tag, "<Button-3>", self.on_textbox_right_click)
+    
+    def on_textbox_shift_click(self, textbox, event):
+        """Shift-click adds/removes a live textbox to/from the selection"""
+        if textbox.page is not None:
+            self.selection.toggle(textbox.page, textbox)
+        return "break"
+    
+    def on_group_handle_press(self, textbox, event):
+        """The move handle of a selected textbox moves the whole group"""
+        if self.selection.contains(textbox):
+            self.selection.start_drag(event.x_root, event.y_root)
+            return "break"
+    
+    def on_group_handle_drag(self, textbox, event):
+        if self.selection.drag is not None:
+            self.selection.drag_to(event.x_root, event.y_root)
+            return "break"
+    
+    def on_group_handle_release(self, textbox, event):
+        if self.selection.drag is not None:
+            self.selection.stop_drag()
+            return "break"
+    
+    def on_textbox_click(self, textbox, event):
+        """Click in a textbox's text: clear the placeholder and focus it"""
+        textbox.clear_placeholder_on_first_click(event)
+        return textbox.handle_text_selection(event)
+    
+    def on_textbox_focus_in(self, textbox, event):
+        """The shared formatting toolbar follows focus"""
+        textbox.on_focus_in()
+        self.formatting_toolbar.attach(textbox)
         
+        # Clear placeholder on focus
+        if textbox.get_text() == "Click to edit...":
+            textbox.set_text("")
+    
+    def on_textbox_focus_out(self, textbox, event):
+        """Hide the toolbar and draw the box on the canvas again"""
+        textbox.on_focus_out()
+        self.formatting_toolbar.detach(textbox)
+        if textbox.page is not None:
+            textbox.page.schedule_freeze(textbox)
+    
+    def on_textbox_press(self, textbox, event):
+        """Remember the geometry a move/resize starts from"""
+        self.textbox_press_geometry = (textbox.x, textbox.y, textbox.width, textbox.height)
+    
+    def on_textbox_release(self, textbox, event):
+        """A move or resize that changed the box modifies the notebook"""
+        if self.textbox_press_geometry != (textbox.x, textbox.y, textbox.width, textbox.height):
+            self.set_modified(True)
+        self.textbox_press_geometry = None
+    
+    def on_textbox_right_click(self, textbox, event):
+        """Delete a textbox"""
+        self.selection.discard(textbox)
+        self.formatting_toolbar.detach(textbox)
+        textbox.frame.destroy()
+        if textbox.page is not None and textbox in textbox.page.textboxes:
+            textbox.page.textboxes.remove(textbox)
         self.set_modified(True)
-        
-        # Visual feedback
-        original_color = text_widget.reset_button.cget("fg_color")
-        text_widget.reset_button.configure(fg_color="#3d2c1e", text_color="#f5e8c8")
-        text_widget.reset_button.after(200, lambda: text_widget.reset_button.configure(
-            fg_color=original_color, 
-            text_color="#3d2c1e"
-        ))
-    def setup_page_canvas_events(self, page):
-        """Setup event bindings for a page's canvas"""
-        canvas = page.canvas
-        
-        # Remove existing bindings to avoid duplicates
-        canvas.unbind("<Double-Button-1>")
-        canvas.unbind("<B1-Motion>")
-        canvas.unbind("<ButtonRelease-1>")
-        canvas.unbind("<Button-1>")
-        
-        # Add new bindings
-        canvas.bind("<Double-Button-1>", lambda e: self.start_textbox_creation(e, page))
-        canvas.bind("<B1-Motion>", lambda e: self.draw_selection_box(e, page))
-        canvas.bind("<ButtonRelease-1>", lambda e: self.finish_textbox_creation(e, page))
-        
-        # NEW: Handle single click to remove focus from images/textboxes
-        def on_canvas_click(event):
-            # Only handle clicks directly on canvas (not on images)
-            items = canvas.find_overlapping(event.x, event.y, event.x+1, event.y+1)
-            
-            # Check if click is directly on canvas (no items at that position)
-            if not items:
-                self.remove_textbox_focus(event)
-                self.remove_image_focus()
-            else:
-                # Click is on an item - let the image handle it
-                pass
-        
-        canvas.bind("<Button-1>", on_canvas_click)
+        return "break"
     def remove_image_focus(self, event=None):
         """Remove focus from all images"""
-        for page in self.pages:
+        for page in self.page_pool.bound_pages():
             for image in page.images:
                 if hasattr(image, 'has_focus') and image.has_focus:
                     image.unfocus()
@@ -1896,7 +5752,7 @@ class NotebookApp:
                 event.widget.configure(cursor="") 
     def start_textbox_creation(self, event, page):
         """Start creating a text box on double-click"""
-        print(f"Double-click detected at ({event.x}, {event.y}) on page {page.page_number}")
+        LOG.debug("Double-click at ({x}, {y}) on page {page}", x=event.x, y=event.y, page=page.page_number)
         self.creating_textbox = True
         self.selection_start = (event.x, event.y)
         self.current_page = page
@@ -1954,11 +5810,10 @@ class NotebookApp:
     
     def remove_textbox_focus(self, event=None):
         """Remove focus from all textboxes"""
-        # Hide formatting toolbar for all textboxes
+        # Hide the shared formatting toolbar
+        self.formatting_toolbar.detach()
         for page in self.pages:
             for textbox in page.textboxes:
-                if hasattr(textbox, 'formatting_frame') and textbox.formatting_frame.winfo_ismapped():
-                    textbox.formatting_frame.place_forget()
                 if hasattr(textbox, 'has_focus') and textbox.has_focus:
                     textbox.on_focus_out()
         
@@ -1969,154 +5824,118 @@ class NotebookApp:
         if event and hasattr(event, 'widget'):
             event.widget.configure(cursor="")
     
-    def create_formatting_toolbar(self, parent, text_widget):
-        """Create formatting toolbar for a text widget"""
-        formatting_frame = ctk.CTkFrame(
-            parent,
-            fg_color="#f5e8c8",
-            width=140,  # Increased from 120 to fit reset button
-            height=35,
-            corner_radius=3,
-            border_width=1,
-            border_color="#a08c6e"
-        )
-        formatting_frame.pack_propagate(False)
-        formatting_frame.place_forget()
-        
-        # Set font for toolbar buttons
-        if HAS_CUSTOM_FONT:
-            toolbar_font = ("Adeliz", 24)
-        else:
-            toolbar_font = ("Arial", 24)
-        
-        # Font size control frame (contains display + reset button)
-        font_size_frame = ctk.CTkFrame(
-            formatting_frame,
-            fg_color="transparent",
-            width=85,  # Width for both elements
-            height=25
-        )
-        font_size_frame.pack_propagate(False)
-        font_size_frame.pack(side="left", padx=(2, 5), pady=5)
-        
-        # Font size display (scrollable)
-        self.font_size_var = ctk.StringVar(value="45")  # Default font size
-        
-        font_size_display = ctk.CTkLabel(
-            font_size_frame,
-            textvariable=self.font_size_var,
-            width=50,
-            height=25,
-            fg_color="#e0d0b0",
-            text_color="#3d2c1e",
-            font=("Arial", 10),
-            corner_radius=2,
-            anchor="center"
-        )
-        font_size_display.pack(side="left", padx=(0, 2))
-        
-        # Reset button (↺ symbol)
-        reset_btn = ctk.CTkButton(
-            font_size_frame,
-            text="↺",  # Reset symbol
-            width=25,
-            height=25,
-            fg_color="#a08c6e",
-            hover_color="#8c704c",
-            text_color="#3d2c1e",
-            font=("Arial", 12, "bold"),
-            corner_radius=2,
-            command=lambda: self.reset_font_size(text_widget)
-        )
-        reset_btn.pack(side="left")
-        
-        # Bind mouse wheel events to the display label
-        def setup_scroll_bindings():
-            font_size_display.bind("<MouseWheel>", lambda e, tw=text_widget: self.on_font_size_scroll(e, tw))
-            font_size_display.bind("<Button-4>", lambda e, tw=text_widget: self.on_font_size_scroll(e, tw))  # Linux up
-            font_size_display.bind("<Button-5>", lambda e, tw=text_widget: self.on_font_size_scroll(e, tw))  # Linux down
-            font_size_display.configure(cursor="sb_v_double_arrow")
-        
-        def cleanup_scroll_bindings():
-            font_size_display.unbind("<MouseWheel>")
-            font_size_display.unbind("<Button-4>")
-            font_size_display.unbind("<Button-5>")
-            font_size_display.configure(cursor="")
-        
-        font_size_display.bind("<Enter>", lambda e: setup_scroll_bindings())
-        font_size_display.bind("<Leave>", lambda e: cleanup_scroll_bindings())
-        
-        # Store references
-        text_widget.font_size_display = font_size_display
-        text_widget.reset_button = reset_btn
-        
-        return formatting_frame
-
     def next_page(self):
         """Go to next page"""
+        # A streaming load may not have read the next spread yet - stay put until it has
+        if self.page_not_read_yet(self.current_right_page_index + 2):
+            return
+        
         # Check if we need to create new pages
         if self.current_right_page_index + 1 >= len(self.pages):
             self.add_new_pages()
         
-        # Hide current pages
-        left_page = self.get_current_left_page()
-        right_page = self.get_current_right_page()
-        if left_page: left_page.hide()
-        if right_page: right_page.hide()
+        self.show_spread(self.current_left_page_index + 2)
+    
+    def previous_page(self):
+        """Go to previous page"""
+        if self.current_left_page_index > 0:
+            self.show_spread(self.current_left_page_index - 2)
+    
+    def queue_flip(self, step):
+        """Arrow key: flip by step spreads (pages in focus mode), collapsing key repeat
+        
+        A lone press flips straight away. Presses that follow within FLIP_SETTLE_MS
+        only move a pending target, and the view jumps there once the key is let
+        go, so the spreads in between are never built. A held key stops at the
+        last existing page - blank pages are only added by a separate press.
+        """
+        now = time.perf_counter()
+        repeating = (now - self.last_flip_key) * 1000 < FLIP_SETTLE_MS
+        self.last_flip_key = now
+        
+        if self.flip_target is None and not repeating:
+            if step > 0 and self.focus_mode:
+                self.next_focus_page()
+            elif step > 0:
+                self.next_page()
+            elif self.focus_mode:
+                self.previous_focus_page()
+            else:
+                self.previous_page()
+            return
         
-        # Update indices
-        self.current_left_page_index += 2
-        self.current_right_page_index += 2
+        if self.flip_target is None or self.flip_target[0] != self.focus_mode:
+            current = self.focused_page_index if self.focus_mode else self.current_left_page_index
+            self.flip_target = (self.focus_mode, current)
+        stride = 1 if self.focus_mode else 2
+        target = self.clamp_flip_target(self.flip_target[1] + step * stride)
+        self.flip_target = (self.focus_mode, target)
         
-        # Show new pages
-        left_page = self.get_current_left_page()
-        right_page = self.get_current_right_page()
-        if left_page: left_page.show()
-        if right_page: right_page.show()
+        # Only the page name follows the key while it is held (once the top bar is built)
+        if self.top_bar is not None and target < len(self.pages):
+            self.page_name_label.configure(text=f"→ {self.pages[target].get_display_text()}")
         
-        # Update navigation
-        self.update_navigation()
+        if self.flip_job is not None:
+            self.root.after_cancel(self.flip_job)
+        self.flip_job = self.root.after(FLIP_SETTLE_MS, self.apply_flip)
+    
+    def clamp_flip_target(self, index):
+        """Keep a pending flip target between the first and the last existing page"""
+        last = max(len(self.pages) - 1, 0)
+        index = min(index, last if self.focus_mode else last - last % 2)
+        return max(index, 0)
+    
+    def cancel_pending_flip(self):
+        """Forget a pending flip (another navigation took over)"""
+        if self.flip_job is not None:
+            self.root.after_cancel(self.flip_job)
+            self.flip_job = None
+        self.flip_target = None
+    
+    def apply_flip(self):
+        """Jump straight to the pending flip target"""
+        self.flip_job = None
+        target, self.flip_target = self.flip_target, None
+        if target is None:
+            return
+        focus_mode, index = target
+        if focus_mode != self.focus_mode:
+            self.update_top_bar_page_name()
+            return
+        
+        # Pages are still arriving while a load streams - only go as far as they reach
+        index = self.clamp_flip_target(index)
         
-        # Update top bar name display
+        if focus_mode:
+            if index != self.focused_page_index:
+                self.focus_on_page(index)
+                return
+        elif index != self.current_left_page_index:
+            self.show_spread(index)
+            return
         self.update_top_bar_page_name()
     
-    def previous_page(self):
-        """Go to previous page"""
-        if self.current_left_page_index > 0:
-            # Hide current pages
-            left_page = self.get_current_left_page()
-            right_page = self.get_current_right_page()
-            if left_page: left_page.hide()
-            if right_page: right_page.hide()
-            
-            # Update indices
-            self.current_left_page_index -= 2
-            self.current_right_page_index -= 2
-            
-            # Show new pages
-            left_page = self.get_current_left_page()
-            right_page = self.get_current_right_page()
-            if left_page: left_page.show()
-            if right_page: right_page.show()
-            
-            # Update navigation
-            self.update_navigation()
-            
-            # Update top bar name display
-            self.update_top_bar_page_name()
+    def show_spread(self, left_index):
+        """Swap the visible spread for the one starting at left_index (an existing page)"""
+        self.current_left_page_index = left_index
+        self.current_right_page_index = left_index + 1
+        self.view.show(spread=(self.get_current_left_page(), self.get_current_right_page()))
+        
+        self.update_navigation()
+        self.update_top_bar_page_name()
     
     def add_new_pages(self):
-        """Add two new pages to the notebook"""
+        """Add two new pages to the notebook (after the load, if one is streaming)"""
+        if self.stream_load is not None:
+            # New pages go after every page of the file being loaded
+            self.stream_load["then"].append(self.add_new_pages)
+            return
         page_count = len(self.pages)
-        left_page = Page(self.page_container, True, page_count)
-        right_page = Page(self.page_container, False, page_count + 1)
+        left_page = Page(self.page_container, True, page_count, app=self)
+        right_page = Page(self.page_container, False, page_count + 1, app=self)
         
         self.pages.append(left_page)
         self.pages.append(right_page)
-        
-        # Setup canvas events for new pages
-        self.setup_page_canvas_events(left_page)
-        self.setup_page_canvas_events(right_page)
 
         # Update sidebar to show new pages
         self.update_sidebar_page_list()
@@ -2126,7 +5945,30 @@ class NotebookApp:
         """Update navigation buttons and indicator"""
         # Update button states
         # The corner buttons will handle their own visual state
-        pass
+        
+        # Bind the neighbouring pages in the background so the next flip is cheap
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+        self.prefetch_job = self.root.after_idle(self.prefetch_neighbour_pages)
+    
+    def prefetch_neighbour_pages(self):
+        """Bind (but don't show) the pages either side of the current view"""
+        self.prefetch_job = None
+        if self.focus_mode and self.focused_page_index is not None:
+            indices = [self.focused_page_index + 1, self.focused_page_index - 1]
+        else:
+            left = self.current_left_page_index
+            indices = [left + 2, left + 3, left - 2, left - 1]
+        
+        for index in indices:
+            if 0 <= index < len(self.pages):
+                page = self.pages[index]
+                if page.surface is None:
+                    self.page_pool.acquire(page)
+                    self.memory_budget.touch(page)
+        
+        # Keep bound pages within the memory budget
+        self.memory_budget.enforce()
     
     def create_top_bar(self):
         # Create top bar
@@ -2243,6 +6085,21 @@ class NotebookApp:
             command=self.toggle_focus_mode
         )
         focus_btn.pack(side="left", padx=5, pady=5)       
+        overview_btn = ctk.CTkButton(
+            self.top_bar,
+            text="Overview",
+            fg_color="transparent",
+            hover_color="#e0d0b0",
+            text_color="#5d4037",
+            font=topbar_font,
+            width=80,
+            height=25,
+            corner_radius=3,
+            border_width=1,
+            border_color="#d4b98c",
+            command=self.toggle_overview
+        )
+        overview_btn.pack(side="left", padx=5, pady=5)
         # Add Page button
         add_page_btn = ctk.CTkButton(
             self.top_bar,
@@ -2290,9 +6147,60 @@ class NotebookApp:
             corner_radius=3,
             border_width=1,
             border_color="#d4b98c",
-            command=self.load_notebook
+            command=self.load_notebook
+        )
+        load_btn.pack(side="left", padx=5, pady=5)
+        
+        # History button
+        history_btn = ctk.CTkButton(
+            self.top_bar,
+            text="History",
+            fg_color="transparent",
+            hover_color="#e0d0b0",
+            text_color="#5d4037",
+            font=topbar_font,
+            width=70,
+            height=25,
+            corner_radius=3,
+            border_width=1,
+            border_color="#d4b98c",
+            command=self.show_history_window
+        )
+        history_btn.pack(side="left", padx=5, pady=5)
+        
+        # Library button
+        library_btn = ctk.CTkButton(
+            self.top_bar,
+            text="Library",
+            fg_color="transparent",
+            hover_color="#e0d0b0",
+            text_color="#5d4037",
+            font=topbar_font,
+            width=70,
+            height=25,
+            corner_radius=3,
+            border_width=1,
+            border_color="#d4b98c",
+            command=self.show_library_window
+        )
+        library_btn.pack(side="left", padx=5, pady=5)
+        
+        # Merge button
+        merge_btn = ctk.CTkButton(
+            self.top_bar,
+            text="Merge",
+            fg_color="transparent",
+            hover_color="#e0d0b0",
+            text_color="#5d4037",
+            font=topbar_font,
+            width=60,
+            height=25,
+            corner_radius=3,
+            border_width=1,
+            border_color="#d4b98c",
+            command=self.merge_with_file
         )
-        load_btn.pack(side="left", padx=5, pady=5)
+        merge_btn.pack(side="left", padx=5, pady=5)
         
         # New button
         new_btn = ctk.CTkButton(
@@ -2414,6 +6322,12 @@ class NotebookApp:
                 page_to_focus = page_index
             self.enter_focus_mode(page_to_focus)
 
+    def toggle_overview(self):
+        """Show or hide the grid of all spreads"""
+        if not self.overview.visible:
+            self.close_sidebar()
+        self.overview.toggle()
+
     def enter_focus_mode(self, page_index):
         """Enter single-page focus mode on a specific page"""
         if page_index >= len(self.pages):
@@ -2435,10 +6349,6 @@ class NotebookApp:
                 'relheight': 1.0
             }
         
-        # Hide all pages
-        for page in self.pages:
-            page.hide()
-        
         # Store the original root background color
         self.original_root_bg = self.root.cget("background")
         
@@ -2448,15 +6358,13 @@ class NotebookApp:
         # Also change the page container background
         self.page_container.configure(fg_color="#000000")
         
-        # Place the focused page - centered with black borders
-        focused_page.frame.place(relx=0.25, rely=0, relwidth=0.5, relheight=1.0)
-        
-        # Make sure the page is visible
-        focused_page.frame.lift()
+        # Place the focused page - centered with black borders (the spread is hidden)
+        self.view.show(focused=focused_page)
         
         # Update UI
+        self.update_navigation()
         self.update_top_bar_page_name()
-        self.update_sidebar_page_list()
+        self.update_sidebar_focus(None, page_index)
         
         # KEEP page corner buttons in focus mode, but update their commands
         self.prev_corner.command = lambda: self.previous_focus_page()
@@ -2465,7 +6373,7 @@ class NotebookApp:
         # Update seam visibility
         self.update_seam_for_focus_mode()
         
-        print(f"Entered focus mode on page {page_index + 1}")
+        LOG.debug("Entered focus mode on page {page}", page=page_index + 1)
     def next_focus_page(self):
         """Go to next page in focus mode"""
         if not self.focus_mode:
@@ -2477,6 +6385,8 @@ class NotebookApp:
         
         # Calculate next page index
         next_index = self.focused_page_index + 1
+        if self.page_not_read_yet(next_index):
+            return
         
         # Check if we need to create new pages
         if next_index >= len(self.pages):
@@ -2513,33 +6423,20 @@ class NotebookApp:
             self.root.configure(background=self.original_root_bg)
             self.page_container.configure(fg_color=self.original_root_bg)
         
-        # Hide all pages
-        for page in self.pages:
-            page.hide()
-        
-        # Restore the previously focused page to its original position
+        # The focused page goes back to normal flow (the view re-places it if it's in the spread)
         focused_page = self.pages[self.focused_page_index]
         if hasattr(focused_page, 'original_placement'):
-            # Remove the custom placement
-            focused_page.frame.place_forget()
-            # Restore the page to normal flow
             delattr(focused_page, 'original_placement')
         
         # Show the previous two-page view
         self.current_left_page_index = self.previous_left_index
         self.current_right_page_index = self.previous_right_index
-        
-        left_page = self.get_current_left_page()
-        right_page = self.get_current_right_page()
-        
-        if left_page:
-            left_page.show()
-        if right_page:
-            right_page.show()
+        self.view.show(spread=(self.get_current_left_page(), self.get_current_right_page()))
         
         # Update UI
+        self.update_navigation()
         self.update_top_bar_page_name()
-        self.update_sidebar_page_list()
+        self.update_sidebar_focus(self.focused_page_index, None)
         
         # Restore original commands to page corner buttons
         self.prev_corner.command = self.previous_page
@@ -2548,7 +6445,7 @@ class NotebookApp:
         # Update seam
         self.update_seam_for_focus_mode()
         
-        print("Exited focus mode")
+        LOG.debug("Exited focus mode")
 
     def update_seam_for_focus_mode(self):
         """Update seam visibility based on focus mode"""
@@ -2560,6 +6457,9 @@ class NotebookApp:
             self.seam.place(relx=0.5, rely=0, relheight=1.0, anchor="n") 
     def update_top_bar_page_name(self):
         """Update the page name display in top bar - modified for focus mode"""
+        if self.top_bar is None:
+            return  # Top bar not built yet - it reads the names when created
+        
         if self.focus_mode and self.focused_page_index is not None:
             # In focus mode, show only the focused page
             focused_page = self.pages[self.focused_page_index]
@@ -2581,6 +6481,12 @@ class NotebookApp:
     
     def update_sidebar_page_list(self):
         """Update the page list in sidebar - modified for focus mode"""
+        if self.sidebar is None or not self.sidebar_visible:
+            return  # The list is rebuilt when the sidebar is opened
+        self.build_sidebar_page_list()
+    
+    def build_sidebar_page_list(self):
+        """Rebuild the sidebar's page buttons (one per page)"""
         # Clear current list
         for widget in self.page_list.winfo_children():
             widget.destroy()
@@ -2592,31 +6498,34 @@ class NotebookApp:
             page_btn_font = ("Segoe UI", 20)
         
         # Add page buttons with names
+        rows = []
         for i, page in enumerate(self.pages):
             # Create button text - add indicator if this page is focused
             button_text = page.get_display_text()
             if self.focus_mode and i == self.focused_page_index:
                 button_text = f"🔍 {button_text}"
             
-            # Button command depends on focus mode
-            if self.focus_mode:
-                # In focus mode, clicking a page navigates within focus mode
-                command = lambda idx=i: self.focus_on_page(idx)
-            else:
-                # In normal mode, clicking a page goes to that page in normal view
-                command = lambda idx=i: self.go_to_page(idx)
+            # go_to_page stays in focus mode when it is on, so rows don't depend on the mode
+            command = lambda idx=i: self.go_to_page(idx)
             
-            page_btn = ctk.CTkButton(
+            page_btn = LightButton(
                 self.page_list,
                 text=button_text,
                 fg_color="#e0d0b0",
                 hover_color="#d0c0a0",
                 text_color="#3d2c1e",
                 font=page_btn_font,
-                height=50,
+                height=ThumbnailCache.SIZE[1] + 12,
                 corner_radius=5,
-                command=command
+                command=command,
+                # Thumbnail is filled in once the row scrolls into view
+                image=self.thumbnails.get_placeholder(),
+                compound="left",
+                anchor="w",
+                padx=6
             )
+            page_btn.thumbnail = None
+            rows.append((page_btn, page))
             
             # If this is the currently focused page, highlight it
             if self.focus_mode and i == self.focused_page_index:
@@ -2627,6 +6536,66 @@ class NotebookApp:
                 )
             
             page_btn.pack(fill="x", pady=8, padx=5)
+        
+        self.sidebar_rows = rows
+        self.root.after_idle(self.update_visible_thumbnails)
+    
+    def update_sidebar_focus(self, old_index, new_index):
+        """Move the focused-page highlight between two sidebar rows (no rebuild)"""
+        if not self.sidebar_visible:
+            return  # The list is rebuilt when the sidebar is opened
+        for index, focused in ((old_index, False), (new_index, True)):
+            if index is None or index >= len(self.sidebar_rows):
+                continue
+            row, page = self.sidebar_rows[index]
+            if focused:
+                row.configure(text=f"🔍 {page.get_display_text()}", fg_color="#5d4037",
+                              text_color="#f5e8c8", hover_color="#4d3027")
+            else:
+                row.configure(text=page.get_display_text(), fg_color="#e0d0b0",
+                              text_color="#3d2c1e", hover_color="#d0c0a0")
+    
+    def on_thumbnails_ready(self):
+        """Rendered thumbnails arrived - show them wherever they are on screen"""
+        self.update_visible_thumbnails()
+        self.overview.on_thumbnails_ready()
+    
+    def update_visible_thumbnails(self):
+        """Give the sidebar rows that are on screen their page thumbnails"""
+        if not self.sidebar_visible or not self.sidebar_rows:
+            return
+        rows = self.sidebar_rows
+        try:
+            top = self.page_list.winfo_rooty()
+            bottom = top + self.page_list.winfo_height()
+            
+            # Rows are stacked top to bottom - find the first one not above the view
+            low, high = 0, len(rows)
+            while low < high:
+                mid = (low + high) // 2
+                row = rows[mid][0]
+                if row.winfo_rooty() + row.winfo_height() < top:
+                    low = mid + 1
+                else:
+                    high = mid
+            
+            for row, page in rows[low:]:
+                if row.winfo_rooty() > bottom:
+                    break
+                photo = self.thumbnails.get(page, self.current_file)
+                if photo is not None and row.thumbnail is not photo:
+                    row.configure(image=photo)
+                    row.thumbnail = photo
+        except tk.TclError:
+            pass  # Rows were rebuilt meanwhile - the rebuild schedules another pass
+    
+    def poll_sidebar_thumbnails(self):
+        """Keep thumbnails current while the sidebar is open (scrolling, edits)"""
+        self.thumbnail_job = None
+        if not self.sidebar_visible:
+            return
+        self.update_visible_thumbnails()
+        self.thumbnail_job = self.root.after(250, self.poll_sidebar_thumbnails)
     def focus_on_page(self, page_index):
         """Focus on a specific page (within focus mode)"""
         if page_index >= len(self.pages):
@@ -2642,24 +6611,22 @@ class NotebookApp:
             self.sound_player.play_flip_sound()
         
         # Already in focus mode, just switch pages
-        self.focused_page_index = page_index
-        
-        # Hide all pages
-        for page in self.pages:
-            page.hide()
+        previous_index, self.focused_page_index = self.focused_page_index, page_index
         
-        # Show the new focused page
-        focused_page = self.pages[page_index]
-        focused_page.frame.place(relx=0.25, rely=0, relwidth=0.5, relheight=1.0)
-        focused_page.frame.lift()
+        # Swap the focused page
+        self.view.show(focused=self.pages[page_index])
         
         # Update UI
+        self.update_navigation()
         self.update_top_bar_page_name()
-        self.update_sidebar_page_list()
+        self.update_sidebar_focus(previous_index, page_index)
         
-        print(f"Switched focus to page {page_index + 1}")
+        LOG.debug("Switched focus to page {page}", page=page_index + 1)
     def add_new_pages_and_go(self):
         """Add new pages and navigate to them"""
+        if self.stream_load is not None:
+            self.stream_load["then"].append(self.add_new_pages_and_go)
+            return
         self.add_new_pages()
         self.next_page()
 
@@ -2710,6 +6677,8 @@ class NotebookApp:
         
         # Show image info
         try:
+            from PIL import Image
+            
             with Image.open(file_path) as img:
                 orig_width, orig_height = img.size
                 
@@ -2888,24 +6857,121 @@ class NotebookApp:
     # Add keyboard shortcuts for focus mode
     def setup_keyboard_shortcuts(self):
         """Setup keyboard shortcuts - add to __init__ or create a new method"""
-        # Escape key to exit focus mode
-        self.root.bind("<Escape>", lambda e: self.exit_focus_mode())
+        # Escape key closes the overview, then exits focus mode
+        def handle_escape_key(e):
+            if self.overview.visible:
+                self.overview.close()
+            else:
+                self.exit_focus_mode()
+        
+        self.root.bind("<Escape>", handle_escape_key)
         
         # Arrow keys to navigate pages in BOTH modes
         def handle_left_key(e):
-            if self.focus_mode:
-                self.previous_focus_page()
-            else:
-                self.previous_page()
+            if self.overview.visible:
+                return
+            self.queue_flip(-1)
         
         def handle_right_key(e):
-            if self.focus_mode:
-                self.next_focus_page()
-            else:
-                self.next_page()
+            if self.overview.visible:
+                return
+            self.queue_flip(1)
         
         self.root.bind("<Left>", handle_left_key)
         self.root.bind("<Right>", handle_right_key)
+        
+        # Ctrl+Shift+L shows the UI stall log, Ctrl+Shift+M the memory diagnostics
+        self.root.bind("<Control-L>", lambda e: self.show_latency_log())
+        self.root.bind("<Control-M>", lambda e: self.show_memory_window())
+    
+    def show_latency_log(self):
+        """Window with the recent UI stalls and what caused them"""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("UI stalls")
+        dialog.geometry("640x400")
+        dialog.transient(self.root)
+        
+        text = tk.Text(dialog, wrap="none", bg="#e0d0b0", fg="#3d2c1e", relief="flat", padx=10, pady=10)
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        text.insert("end", self.latency.report())
+        text.configure(state="disabled")
+    
+    def memory_report(self):
+        """Per-page and total memory breakdown, biggest pages first"""
+        rows = []
+        totals = {}
+        for index, page in enumerate(self.pages):
+            stats = page.diagnostics()
+            stats["bytes"] = stats["original"] + stats["display"] + stats["photo"] + stats["widgets"] * MemoryBudget.WIDGET_COST
+            rows.append((index, page, stats))
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+        rows.sort(key=lambda row: row[2]["bytes"], reverse=True)
+        
+        def line(label, stats):
+            return (f"{label[:24]:24} {stats['textboxes']:5} {stats['chars']:8} {stats['tags']:6} {stats['images']:5} "
+                    f"{format_bytes(stats['original']):>10} {format_bytes(stats['display']):>10} "
+                    f"{format_bytes(stats['photo']):>10} {stats['widgets']:7}")
+        
+        lines = [
+            f"{'Page':24} {'Boxes':>5} {'Chars':>8} {'Tags':>6} {'Imgs':>5} "
+            f"{'Original':>10} {'Display':>10} {'Photo':>10} {'Widgets':>7}"
+        ]
+        for index, page, stats in rows:
+            marker = "*" if page.visible else " " if page.surface is not None else "-"
+            lines.append(line(f"{marker}{index + 1} {page.name}", stats))
+        if totals:
+            lines.append(line(" Total", totals))
+        lines.append("")
+        lines.append("* visible   - unbound (serialized data only)")
+        lines.append("")
+        
+        budget_total = self.memory_budget.total()
+        lines.append(f"Bound pages: {len(self.page_pool.bound_pages())} of {len(self.pages)}, "
+                     f"estimated {format_bytes(budget_total)} of {format_bytes(self.memory_budget.budget_bytes)} budget")
+        lines.append(f"Cached thumbnails: {len(self.thumbnails.photos)}, page backgrounds: {len(self.background_cache.photos)}")
+        rss = current_rss()
+        if rss:
+            lines.append(f"Process RSS: {format_bytes(rss)}")
+        lines.append("")
+        lines.append("Live objects:")
+        lines.append(RESOURCES.report())
+        return "\n".join(lines)
+    
+    def show_memory_window(self):
+        """Window with the memory breakdown and an on-demand tracemalloc snapshot"""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Memory")
+        dialog.geometry("900x520")
+        dialog.transient(self.root)
+        
+        buttons = LightFrame(dialog, fg_color="transparent")
+        buttons.pack(fill="x", padx=10, pady=(10, 0))
+        
+        text = tk.Text(dialog, wrap="none", bg="#e0d0b0", fg="#3d2c1e", relief="flat", padx=10, pady=10,
+                       font=("Courier", 10))
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        def show(report):
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert("end", report)
+            text.configure(state="disabled")
+        
+        for label, command in (
+            ("Refresh", lambda: show(self.memory_report())),
+            ("Top allocations", lambda: show(tracemalloc_report(TRACEMALLOC_TOP)))
+        ):
+            LightButton(
+                buttons,
+                text=label,
+                fg_color="#a08c6e",
+                hover_color="#8c704c",
+                text_color="#3d2c1e",
+                command=command
+            ).pack(side="left", padx=(0, 8))
+        
+        show(self.memory_report())
 
     def navigate_focus_left(self):
         """Navigate to previous page in focus mode"""
@@ -2926,6 +6992,9 @@ class NotebookApp:
             self.focus_on_page(new_index)
     def go_to_page(self, page_index):
         """Go to a specific page - modified to handle focus mode"""
+        self.cancel_pending_flip()
+        if self.page_not_read_yet(page_index):
+            return
         if self.focus_mode:
             # In focus mode, just focus on the selected page
             self.focus_on_page(page_index)
@@ -2939,19 +7008,12 @@ class NotebookApp:
                 self.current_left_page_index = page_index - 1
                 self.current_right_page_index = page_index
             
-            # Ensure indices are valid
-            if self.current_right_page_index >= len(self.pages):
+            # Ensure indices are valid (a streaming load may just not have read it yet)
+            if self.current_right_page_index >= len(self.pages) and self.stream_load is None:
                 self.add_new_pages()
             
-            # Hide all pages
-            for page in self.pages:
-                page.hide()
-            
-            # Show selected pages
-            left_page = self.get_current_left_page()
-            right_page = self.get_current_right_page()
-            if left_page: left_page.show()
-            if right_page: right_page.show()
+            # Show selected pages (only the pages that change are touched)
+            self.view.show(spread=(self.get_current_left_page(), self.get_current_right_page()))
             
             # Update navigation
             self.update_navigation()
@@ -3011,16 +7073,23 @@ class NotebookApp:
             self.open_sidebar()
     
     def open_sidebar(self):
+        if self.sidebar is None:
+            self.create_sidebar()
         if not self.sidebar_visible:
             # Update page list before showing
-            self.update_sidebar_page_list()
+            self.build_sidebar_page_list()
             self.sidebar.place(x=0, y=0, relheight=1.0)
             self.sidebar_visible = True
+            if self.thumbnail_job is None:
+                self.thumbnail_job = self.root.after(50, self.poll_sidebar_thumbnails)
     
     def close_sidebar(self, event=None):
         if self.sidebar_visible:
             self.sidebar.place(x=-250, y=0, relheight=1.0)  # Updated from -200 to -250
             self.sidebar_visible = False
+            if self.thumbnail_job is not None:
+                self.root.after_cancel(self.thumbnail_job)
+                self.thumbnail_job = None
 
     def check_mouse_position(self, event):
         # Don't show top bar if sidebar is open
@@ -3042,14 +7111,7 @@ class NotebookApp:
         # Check all textbox components
         for page in self.pages:
             for textbox in page.textboxes:
-                no_top_bar_widgets.extend([
-                    textbox.frame,
-                    textbox.text_widget,
-                    textbox.handles_frame if hasattr(textbox, 'handles_frame') else None,
-                    textbox.move_handle if hasattr(textbox, 'move_handle') else None,
-                    textbox.resize_handle if hasattr(textbox, 'resize_handle') else None,
-                    textbox.formatting_frame if hasattr(textbox, 'formatting_frame') else None
-                ])
+                no_top_bar_widgets.extend(textbox.widgets())
             
             # Check all image canvases
             for image in page.images:
@@ -3058,26 +7120,24 @@ class NotebookApp:
                     no_top_bar_widgets.append(image.canvas)
         
         # Special case: check if cursor is over formatting toolbar buttons
-        # These are child widgets inside the formatting_frame
-        if widget and hasattr(widget, 'master'):
-            # Check if widget is inside a formatting toolbar
-            parent = widget.master
-            while parent:
-                # Check all pages for formatting frames
-                for page in self.pages:
-                    for textbox in page.textboxes:
-                        if hasattr(textbox, 'formatting_frame') and parent == textbox.formatting_frame:
-                            # Widget is inside a formatting toolbar
-                            if self.top_bar_visible and event.y > 50:
-                                self.hide_top_bar()
-                            return
-                parent = parent.master if hasattr(parent, 'master') else None
+        # These are child widgets inside the shared toolbar frame
+        if widget and self.formatting_toolbar.contains(widget):
+            # Widget is inside the formatting toolbar
+            if self.top_bar_visible and event.y > 50:
+                self.hide_top_bar()
+            return
         
         # Special case: check if cursor is over any canvas items (images, borders, handles)
         if isinstance(widget, tk.Canvas):
             # Get items at cursor position
             items = widget.find_overlapping(event.x, event.y, event.x+1, event.y+1)
             if items:
+                # Canvas-drawn textboxes count as textboxes
+                if any(StaticTextbox.TAG in widget.gettags(item) for item in items):
+                    if self.top_bar_visible and event.y > 50:
+                        self.hide_top_bar()
+                    return
+                
                 # Check if any of these items belong to our images
                 for page in self.pages:
                     for image in page.images:
@@ -3119,11 +7179,14 @@ class NotebookApp:
                 self.hide_top_bar()
 
     def show_top_bar(self):
+        if self.top_bar is None:
+            self.create_top_bar()
         self.top_bar.place(x=0, y=0, relwidth=1.0)
         self.top_bar_visible = True
     
     def hide_top_bar(self):
-        self.top_bar.place_forget()
+        if self.top_bar is not None:
+            self.top_bar.place_forget()
         self.top_bar_visible = False
 
     # =============================================
@@ -3140,19 +7203,21 @@ class NotebookApp:
             if response is None:  # Cancel
                 return
             elif response:  # Yes
-                if not self.save_notebook():
-                    return  # Save was cancelled
+                # Start over once the save has finished
+                self.save_notebook(then=self.new_notebook)
+                return
         
-        # Clear all pages
-        for page in self.pages:
-            page.clear()
-            page.frame.destroy()
+        # Clear all pages (their surfaces go back to the pool)
+        self.cancel_streaming_load()
+        self.view.forget()
+        self.page_pool.release_all()
         
         # Reset state
         self.pages = []
         self.current_left_page_index = 0
         self.current_right_page_index = 1
         self.current_file = None
+        self.file_mtime = None
         self.modified = False
         
         # Create new initial pages
@@ -3163,44 +7228,437 @@ class NotebookApp:
         self.update_top_bar_page_name()
         self.update_window_title()
     
-    def save_notebook(self, filepath=None):
-        """Save the current notebook to a file"""
+    def save_notebook(self, filepath=None, then=None):
+        """Save the current notebook to a file
+        
+        The pages are snapshotted here and written on a worker thread; then()
+        runs once the save has succeeded. Returns False if no save was started.
+        """
+        if self.save_task is not None:
+            return False
+        if self.stream_load is not None:
+            # Only the pages read so far could be written - save once the rest are in
+            self.stream_load["then"].append(lambda: self.save_notebook(filepath, then))
+            return False
+        
         if not filepath:
             filepath = filedialog.asksaveasfilename(
                 defaultextension=".notebook",
-                filetypes=[("Notebook files", "*.notebook"), ("All files", "*.*")],
+                filetypes=NOTEBOOK_FILETYPES,
                 initialfile="my_notebook.notebook"
             )
             if not filepath:
                 return False
         
-        try:
-            # Get notebook data
-            notebook_data = self.get_notebook_data()
-            
-            # Handle image embedding/copying
-            notebook_data = self.prepare_images_for_saving(notebook_data, filepath)
-            
-            # Save to JSON file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(notebook_data, f, indent=2, ensure_ascii=False)
-            
-            # Update state
+        # Somebody else changed the file since we read or wrote it - ask before overwriting
+        if (filepath == self.current_file and self.file_mtime is not None
+                and os.path.exists(filepath) and os.path.getmtime(filepath) != self.file_mtime):
+            if not messagebox.askyesno(
+                "File Changed",
+                f"{os.path.basename(filepath)} was changed on disk since it was opened.\n\n"
+                "Overwrite it with this notebook?"
+            ):
+                return False
+        
+        # Snapshot on the Tk thread; hashing, copying and writing happen on the worker
+        notebook_data = self.get_notebook_data()
+        generation = self.edit_generation
+        history = self.get_history(filepath) if NOTEBOOK_HISTORY else None
+        library = self.library
+        thumbnails = self.thumbnails
+        name = os.path.basename(filepath)
+        
+        def work(task):
+            # Keep the thumbnails of the pages as shown and as written (image paths rewritten)
+            keys = [thumbnails.page_data_key(page_data) for page_data in notebook_data["pages"]]
+            mtime = self.write_notebook_file(notebook_data, filepath, task, history, library)
+            keys += [thumbnails.page_data_key(page_data) for page_data in notebook_data["pages"]]
+            thumbnails.prune(filepath, keys)
+            return mtime
+        
+        def on_done(mtime):
+            self.save_task = None
             self.current_file = filepath
-            self.set_modified(False)
+            self.file_mtime = mtime
+            # Edits made while saving still need a save
+            if self.edit_generation == generation:
+                self.set_modified(False)
+            else:
+                self.update_window_title()
+            self.progress_panel.finish(f"Saved {name}")
+            if then is not None:
+                then()
+        
+        def on_error(error):
+            self.save_task = None
+            self.progress_panel.fail(f"Failed to save {name}: {error}")
+        
+        def on_cancelled():
+            self.save_task = None
+            self.progress_panel.finish("Save cancelled - nothing was changed")
+        
+        self.save_task = BackgroundTask(
+            self.root,
+            work,
+            {
+                "progress": lambda progress: self.progress_panel.update(
+                    self.describe_progress("Saving", name, progress)),
+                "done": on_done,
+                "error": on_error,
+                "cancelled": on_cancelled
+            }
+        )
+        self.progress_panel.start(f"Saving {name}...", self.save_task.cancel)
+        self.save_task.start()
+        return True
+    
+    def write_notebook_file(self, notebook_data, filepath, task, history=None, library=None):
+        """Write notebook data to filepath (runs on the save worker)
+        
+        Images are copied first and the JSON goes to a temporary file that only
+        replaces filepath once complete, so a cancelled or failed save leaves the
+        old file and images as they were. .notebookdb files are updated in one
+        SQLite transaction instead, rewriting only the pages whose hash changed.
+        Pages are also handed to history (only new ones are stored), which
+        records a version once the file is in place, and the library catalog
+        re-indexes the pages whose hash changed. Returns the new file's mtime.
+        """
+        created = []  # Image copies made by this save
+        page_keys = []  # Hash of every page's JSON, without its position
+        temp_path = filepath + ".saving"
+        pages = notebook_data["pages"]
+        progress = {"pages": 0, "total_pages": len(pages), "bytes": 0}
+        
+        def encode(page_data, indent=2):
+            """JSON of a page - hashed (position left out) and handed to history on the way"""
+            nonlocal history
+            text, key = encode_page(page_data, indent)
+            page_keys.append(key)
+            if history is not None:
+                try:
+                    history.add_page(key, text, page_data)
+                except OSError as e:
+                    # History is a bonus - never let it stop the save itself
+                    LOG.warning("Version history not updated: {error}", error=e)
+                    history = None
+            return text
+        
+        try:
+            self.prepare_images_for_saving(notebook_data, filepath, task, created)
             
-            messagebox.showinfo("Success", f"Notebook saved successfully to:\n{filepath}")
-            return True
+            header = {key: value for key, value in notebook_data.items() if key != "pages"}
+            if is_store_file(filepath):
+                for page_data in pages:
+                    task.check_cancelled()
+                    # Only hashed and kept in history - compact JSON is much faster to make
+                    progress["bytes"] += len(encode(page_data, indent=None))
+                NotebookStore(filepath).save(header, pages, page_keys, task, progress)
+            else:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    # Same layout as json.dump(indent=2), written a page at a time
+                    head = json.dumps(header, indent=2, ensure_ascii=False)
+                    f.write(head[:-2] + ',\n  "pages": [')
+                    for i, page_data in enumerate(pages):
+                        task.check_cancelled()
+                        chunk = ("," if i else "") + "\n    " + encode(page_data).replace("\n", "\n    ")
+                        f.write(chunk)
+                        progress["pages"] = i + 1
+                        progress["bytes"] += len(chunk.encode("utf-8"))
+                        task.report(progress)
+                    f.write("\n  ]\n}\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                
+                task.check_cancelled()
+                os.replace(temp_path, filepath)
+        except BaseException:
+            # Roll back - drop the partial file and the image copies made for it
+            for path in [temp_path] + created:
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    LOG.warning("Failed to remove {path}: {error}", path=path, error=e)
+            raise
+        
+        if history is not None:
+            try:
+                history.commit(header, page_keys)
+            except OSError as e:
+                LOG.warning("Version history not updated: {error}", error=e)
+        
+        mtime = os.path.getmtime(filepath)
+        if library is not None:
+            try:
+                library.update(filepath, pages, page_keys, mtime)
+            except (sqlite3.Error, OSError) as e:
+                LOG.warning("Library catalog not updated: {error}", error=e)
+        
+        # The new file is in place - images it no longer uses can go (history keeps its own links)
+        self.cleanup_unused_images(notebook_data, filepath)
+        return mtime
+    
+    def get_history(self, filepath):
+        """Version history of a notebook file (kept while it stays the same file)"""
+        if self.history is None or self.history.notebook_file != os.path.abspath(filepath):
+            self.history = NotebookHistory(filepath)
+        return self.history
+    
+    def show_history_window(self):
+        """List the saved versions of this notebook, each with a Restore button"""
+        if not self.current_file:
+            messagebox.showinfo("History", "Save the notebook first - versions are recorded on every save.")
+            return
+        versions = self.get_history(self.current_file).versions()
+        
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title(f"History - {os.path.basename(self.current_file)}")
+        dialog.geometry("520x480")
+        dialog.transient(self.root)
+        
+        if HAS_CUSTOM_FONT:
+            row_font = ("Adeliz", 16)
+        else:
+            row_font = ("Segoe UI", 16)
+        
+        version_list = ctk.CTkScrollableFrame(dialog, fg_color="#b5a184", corner_radius=0)
+        version_list.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        if not versions:
+            ctk.CTkLabel(
+                version_list,
+                text="No versions saved yet",
+                font=row_font,
+                text_color="#3d2c1e"
+            ).pack(pady=20)
+        
+        for i, version in enumerate(versions):
+            # Pages not in the next older version were added or changed by this save
+            pages = version["pages"]
+            if i + 1 < len(versions):
+                changed = len(set(pages) - set(versions[i + 1]["pages"]))
+                summary = f"{len(pages)} pages, {changed} changed"
+            else:
+                summary = f"{len(pages)} pages"
+            saved = version.get("saved", "")[:19].replace("T", " ")
             
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save notebook:\n{str(e)}")
+            row = LightFrame(version_list, fg_color="#e0d0b0")
+            row.pack(fill="x", pady=4, padx=5)
+            LightLabel(
+                row,
+                text=f"{saved}   {summary}",
+                text_color="#3d2c1e",
+                font=row_font,
+                anchor="w"
+            ).pack(side="left", fill="x", expand=True, padx=8, pady=6)
+            LightButton(
+                row,
+                text="Restore",
+                fg_color="#a08c6e",
+                hover_color="#8c704c",
+                text_color="#3d2c1e",
+                font=row_font,
+                command=lambda v=version: self.restore_version(v, dialog)
+            ).pack(side="right", padx=8, pady=6)
+    
+    def restore_version(self, version, dialog=None):
+        """Replace the open pages with a saved version (a normal save records it again)"""
+        if self.save_task is not None:
+            messagebox.showinfo("History", "Wait for the save to finish first.")
+            return
+        saved = version.get("saved", "")[:19].replace("T", " ")
+        question = f"Replace the open notebook with the version saved {saved}?"
+        if self.modified:
+            question += "\n\nUnsaved changes will be lost."
+        if not messagebox.askyesno("Restore Version", question, parent=dialog):
+            return
+        
+        try:
+            data = self.get_history(self.current_file).read_version(version)
+        except (OSError, ValueError) as e:
+            self.progress_panel.fail(f"Could not restore version: {e}")
+            return
+        
+        if dialog is not None:
+            dialog.destroy()
+        self.replace_pages(data)
+        self.progress_panel.finish(f"Restored the version saved {saved}")
+    
+    def replace_pages(self, data):
+        """Show notebook data in place of the open pages, as unsaved changes to this file"""
+        # Same teardown as opening another notebook
+        if self.focus_mode:
+            self.exit_focus_mode()
+        self.cancel_streaming_load()
+        self.overview.close()
+        self.view.forget()
+        self.page_pool.release_all()
+        self.pages = []
+        for page_data in data["pages"]:
+            self.append_page_from_data(page_data)
+        if not self.pages:
+            self.initialize_pages()
+        
+        try:
+            target = int(data.get("metadata", {}).get("last_viewed_page", 0))
+        except (TypeError, ValueError):
+            target = 0
+        self.go_to_page(min(max(0, target), len(self.pages) - 1))
+        
+        # The file on disk keeps what it had until this is saved
+        self.set_modified(True)
+        self.update_sidebar_page_list()
+    
+    def index_in_library(self, paths=None, folder=None):
+        """Catalog notebook files (or every notebook under folder) in the background"""
+        if self.library_task is not None:
             return False
+        
+        def work(task):
+            if folder is not None:
+                return self.library.index_folder(folder, task)
+            return self.library.index_files(paths, task)
+        
+        def on_done(count):
+            self.library_task = None
+            if folder is not None:
+                self.progress_panel.finish(f"Library: {count} notebooks indexed")
+            if self.library_window is not None and self.library_window.winfo_exists():
+                self.library_window.refresh()
+        
+        def on_error(error):
+            self.library_task = None
+            self.progress_panel.fail(f"Library index failed: {error}")
+        
+        def on_cancelled():
+            self.library_task = None
+            self.progress_panel.finish("Library indexing cancelled")
+        
+        handlers = {"done": on_done, "error": on_error, "cancelled": on_cancelled}
+        if folder is not None:
+            handlers["progress"] = lambda progress: self.progress_panel.update(
+                f"Indexing notebooks... {progress['pages']} of {progress['total_pages']}")
+        self.library_task = BackgroundTask(self.root, work, handlers)
+        if folder is not None:
+            self.progress_panel.start("Looking for notebooks...", self.library_task.cancel)
+        self.library_task.start()
+        return True
+    
+    def show_library_window(self):
+        """Search all catalogued notebooks"""
+        if self.library_window is not None and self.library_window.winfo_exists():
+            self.library_window.lift()
+            return
+        self.library_window = LibraryWindow(self)
+    
+    def open_from_library(self, path, page_index):
+        """Open a search result"""
+        if not os.path.exists(path):
+            messagebox.showinfo("Library", f"{path} no longer exists - removing it from the library.")
+            self.library.forget(path)
+            self.library_window.refresh()
+            return
+        if self.current_file and os.path.abspath(self.current_file) == path:
+            self.go_to_page(min(page_index, len(self.pages) - 1))
+        else:
+            self.load_notebook(path, page_index)
+    
+    def merge_with_file(self):
+        """Merge another copy of this notebook into the open one"""
+        if self.save_task is not None:
+            messagebox.showinfo("Merge", "Wait for the save to finish first.")
+            return
+        if self.merge_task is not None:
+            messagebox.showinfo("Merge", "A merge is already running.")
+            return
+        if self.stream_load is not None:
+            messagebox.showinfo("Merge", "Wait for the notebook to finish loading first.")
+            return
+        their_file = filedialog.askopenfilename(
+            title="Merge which copy into this notebook?",
+            filetypes=NOTEBOOK_FILETYPES
+        )
+        if not their_file:
+            return
+        base_file = filedialog.askopenfilename(
+            title="Copy both were made from (Cancel to merge without one)",
+            filetypes=NOTEBOOK_FILETYPES
+        )
+        
+        name = os.path.basename(their_file)
+        ours = self.get_notebook_data()
+        pages, generation = self.pages, self.edit_generation
+        
+        def work(task):
+            # Both files are read and merged on the worker - only the result is built here
+            theirs = read_notebook_data(their_file)
+            task.check_cancelled()
+            # Without a common base every difference counts as a conflict - ours wins
+            base = read_notebook_data(base_file) if base_file else {"pages": []}
+            task.check_cancelled()
+            merge = NotebookMerge(base, ours, theirs)
+            return merge.run(), merge.conflicts
+        
+        def on_done(result):
+            self.merge_task = None
+            if self.pages is not pages or self.edit_generation != generation:
+                self.progress_panel.fail(f"The notebook changed while merging {name} - merge again")
+                return
+            merged, conflicts = result
+            self.replace_pages(merged)
+            if not conflicts:
+                self.progress_panel.finish(f"Merged {name}")
+                return
+            self.progress_panel.finish(f"Merged {name} - {len(conflicts)} conflicts kept this copy's version")
+            self.show_merge_conflicts(name, conflicts)
+        
+        def on_error(error):
+            self.merge_task = None
+            self.progress_panel.fail(f"Could not merge {name}: {error}")
+        
+        def on_cancelled():
+            self.merge_task = None
+            self.progress_panel.finish("Merge cancelled")
+        
+        self.merge_task = BackgroundTask(self.root, work, {
+            "done": on_done, "error": on_error, "cancelled": on_cancelled
+        })
+        self.progress_panel.start(f"Merging {name}...", self.merge_task.cancel)
+        self.merge_task.start()
+    
+    def show_merge_conflicts(self, name, conflicts):
+        """List the conflicts of a merge"""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title(f"Merge conflicts - {name}")
+        dialog.geometry("560x400")
+        dialog.transient(self.root)
+        
+        text = tk.Text(dialog, wrap="word", bg="#e0d0b0", fg="#3d2c1e", relief="flat", padx=10, pady=10)
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        for conflict in conflicts:
+            where = conflict["page"]
+            if conflict["widget"]:
+                where += f" / {conflict['widget']}"
+            if conflict["field"]:
+                where += f" / {conflict['field']}"
+            text.insert("end", f"{where}: {conflict['reason']}\n")
+        text.configure(state="disabled")
+    
+    def describe_progress(self, action, name, progress):
+        """Progress panel text for a load/save"""
+        text = f"{action} {name}... {progress.get('pages', 0)}"
+        if progress.get("total_pages"):
+            text += f" of {progress['total_pages']}"
+        text += f" pages, {format_bytes(progress.get('bytes', 0))}"
+        if progress.get("total_bytes"):
+            text += f" of {format_bytes(progress['total_bytes'])}"
+        return text
     
-    def load_notebook(self, filepath=None):
-        """Load a notebook from a file"""
+    def load_notebook(self, filepath=None, page_index=None):
+        """Load a notebook from a file (opening at page_index, or where it was last viewed)"""
         if not filepath:
             filepath = filedialog.askopenfilename(
-                filetypes=[("Notebook files", "*.notebook"), ("All files", "*.*")]
+                filetypes=NOTEBOOK_FILETYPES
             )
             if not filepath:
                 return
@@ -3214,75 +7672,261 @@ class NotebookApp:
             if response is None:  # Cancel
                 return
             elif response:  # Yes
-                if not self.save_notebook():
-                    return  # Save was cancelled
+                # Load once the save has finished
+                self.save_notebook(then=lambda: self.load_notebook(filepath, page_index))
+                return
+        
+        # Stop any load that is still streaming in
+        self.cancel_streaming_load()
         
+        name = os.path.basename(filepath)
         try:
-            # Load JSON data
-            with open(filepath, 'r', encoding='utf-8') as f:
-                notebook_data = json.load(f)
-            
-            # Migrate data if needed
-            notebook_data = self.migrate_data(notebook_data)
-            
-            # Clear existing pages
-            for page in self.pages:
-                page.clear()
-                page.frame.destroy()
-            
-            self.pages = []
-            
-            # Restore pages from data
-            for page_data in notebook_data.get("pages", []):
-                page = Page(
-                    self.page_container,
-                    page_data.get("is_left_page", True),
-                    page_data.get("page_number", len(self.pages)),
-                    page_data.get("name", f"Page {len(self.pages) + 1}")
-                )
-                
-                # Deserialize page content
-                page.deserialize(page_data, self)
-                
-                self.pages.append(page)
-            
-            # Set current file
-            self.current_file = filepath
-            self.set_modified(False)
-            
-            # Reset view to first page
-            self.current_left_page_index = 0
-            self.current_right_page_index = 1
-            
-            # Hide all pages first
-            for page in self.pages:
-                page.hide()
-            
-            # Show first two pages
-            if len(self.pages) > 0:
-                self.pages[0].show()
-            if len(self.pages) > 1:
-                self.pages[1].show()
-            
-            # Update UI
+            reader = open_notebook_reader(filepath)
+        except OSError as e:
+            self.progress_panel.fail(f"Failed to load {name}: {e}")
+            return
+        
+        load = {
+            "filepath": filepath,
+            "target": 0,
+            "page_index": page_index,
+            "shown": False,
+            "rollback": None,  # The notebook that was open, until this one has fully arrived
+            "then": [],  # Actions that need every page (save, add pages), run once loaded
+            "task": None
+        }
+        
+        def work(task):
+            # Parsing and migration happen here; pages are built on the Tk thread
+            records = reader.records()
+            progress = {"pages": 0, "bytes": 0, "total_bytes": reader.total_bytes}
+            version = 1
+            header_seen = False
+            try:
+                for kind, data in records:
+                    task.check_cancelled()
+                    if kind == "header" and header_seen:
+                        # Keys stored after the pages (other writers) - the pages are already in
+                        kind = "header_tail"
+                    elif kind == "header":
+                        header_seen = True
+                        version = data.get("version", 1)
+                        data = self.migrate_header(data)
+                    else:
+                        data = self.migrate_page(data, version)
+                        progress["pages"] += 1
+                    task.emit(kind, data)
+                    progress["bytes"] = reader.bytes_read
+                    task.report(progress)
+            finally:
+                records.close()
+            return progress["pages"]
+        
+        task = BackgroundTask(self.root, work, {
+            "header": lambda header: self.on_load_header(load, header),
+            "header_tail": lambda header: self.on_load_header_tail(load, header),
+            "page": lambda page_data: self.add_loaded_page(load, page_data),
+            "progress": lambda progress: self.progress_panel.update(
+                self.describe_progress("Loading", name, progress)
+                + (" - saving when done" if load["then"] else "")),
+            "done": lambda count: self.on_streaming_load_done(load),
+            "error": lambda error: self.on_streaming_load_failed(load, error),
+            "cancelled": lambda: self.on_streaming_load_failed(load)
+        })
+        load["task"] = task
+        self.stream_load = load
+        self.progress_panel.start(f"Loading {name}...", lambda: self.cancel_streaming_load(rollback=True))
+        task.start()
+    
+    def on_load_header(self, load, header):
+        """Put the loading notebook in place of the open one"""
+        load["rollback"] = {
+            "pages": self.pages,
+            "current_file": self.current_file,
+            "file_mtime": self.file_mtime,
+            "modified": self.modified,
+            "left": self.current_left_page_index
+        }
+        
+        # Unbind the old pages but keep their content in case the load is cancelled
+        self.view.forget()
+        self.page_pool.release_all(keep_content=True)
+        self.pages = []
+        
+        # Set current file
+        self.current_file = load["filepath"]
+        self.file_mtime = os.path.getmtime(load["filepath"])
+        self.set_modified(False)
+        self.update_window_title()
+        
+        # Open at the requested page, else the last viewed spread (first spread for older files)
+        try:
+            target = int(header.get("metadata", {}).get("last_viewed_page", 0))
+        except (TypeError, ValueError):
+            target = 0
+        if load["page_index"] is not None:
+            target = load["page_index"]
+        load["target"] = max(0, target) // 2 * 2
+    
+    def on_load_header_tail(self, load, header):
+        """Header keys that came after the pages - open at their last viewed page"""
+        if load["page_index"] is not None or not isinstance(header.get("metadata"), dict):
+            return
+        try:
+            target = max(0, int(header["metadata"].get("last_viewed_page", 0))) // 2 * 2
+        except (TypeError, ValueError):
+            return
+        if target == load["target"] or target >= len(self.pages):
+            return
+        # Once the first spread is up, only move if the user is still looking at it
+        moved_on = self.focus_mode or self.current_left_page_index != load["target"]
+        if load["shown"] and moved_on:
+            return
+        load["target"] = target
+        if load["shown"]:
+            self.show_spread(target)
+    
+    def add_loaded_page(self, load, page_data):
+        """Create a page from a streamed (already migrated) page record"""
+        self.append_page_from_data(page_data)
+        self.overview.schedule_redraw()
+        
+        # Show the target spread as soon as both of its pages are here
+        if not load["shown"] and len(self.pages) >= load["target"] + 2:
+            self.show_loaded_spread(load)
+    
+    def append_page_from_data(self, page_data):
+        """Add a page built from serialized page data"""
+        page = Page(
+            self.page_container,
+            page_data.get("is_left_page", True),
+            page_data.get("page_number", len(self.pages)),
+            page_data.get("name", f"Page {len(self.pages) + 1}"),
+            app=self
+        )
+        
+        # Deserialize page content (widgets are built when the page is shown)
+        page.deserialize(page_data, self)
+        
+        self.pages.append(page)
+        return page
+    
+    def show_loaded_spread(self, load):
+        """Show the spread a load opens at"""
+        load["shown"] = True
+        target = load["target"]
+        if target >= len(self.pages):
+            target = 0
+        
+        # Reset view to the target spread
+        self.current_left_page_index = target
+        self.current_right_page_index = target + 1
+        
+        # Show the spread
+        self.view.show(spread=(self.get_current_left_page(), self.get_current_right_page()))
+        
+        # Update UI
+        self.update_navigation()
+        self.update_top_bar_page_name()
+        self.update_window_title()
+    
+    def page_not_read_yet(self, index):
+        """Whether page index is still to come from a streaming load"""
+        return self.stream_load is not None and index >= len(self.pages)
+    
+    def cancel_streaming_load(self, rollback=False):
+        """Stop a streaming load - the pages read so far stay unless rolling back"""
+        load = self.stream_load
+        self.stream_load = None
+        if load is None:
+            return
+        load["task"].abandon()
+        if rollback:
+            self.restore_load_rollback(load)
+            self.progress_panel.finish("Load cancelled")
+        else:
+            self.progress_panel.hide()
+    
+    def on_streaming_load_done(self, load):
+        """All pages have arrived"""
+        self.stream_load = None
+        load["rollback"] = None
+        if not load["shown"]:
+            self.show_loaded_spread(load)
+        self.update_sidebar_page_list()
+        self.update_top_bar_page_name()
+        self.progress_panel.finish(
+            f"Loaded {os.path.basename(load['filepath'])} ({len(self.pages)} pages)")
+        
+        # Notebooks opened here show up in the library too
+        self.index_in_library([load["filepath"]])
+        
+        # Saves and new pages asked for while the pages were arriving
+        for action in load["then"]:
+            action()
+    
+    def on_streaming_load_failed(self, load, error=None):
+        """The load worker failed (or was cancelled) - put the old notebook back"""
+        self.stream_load = None
+        self.restore_load_rollback(load)
+        if error is None:
+            self.progress_panel.finish("Load cancelled")
+        else:
+            self.progress_panel.fail(
+                f"Failed to load {os.path.basename(load['filepath'])}: {error}")
+    
+    def restore_load_rollback(self, load):
+        """Bring back the notebook that was open before the load started"""
+        rollback = load["rollback"]
+        load["rollback"] = None
+        if rollback is None:
+            return  # The header never arrived - nothing was replaced
+        
+        # Edits made to the pages that did arrive would go with them
+        if self.modified and messagebox.askyesno(
+            "Load Stopped",
+            f"{os.path.basename(load['filepath'])} did not finish loading, but you have edited it.\n\n"
+            f"Keep the {len(self.pages)} pages read so far as a new notebook?"
+        ):
+            # Saving them over the file would drop the pages that never arrived
+            self.current_file = None
+            self.file_mtime = None
             self.update_sidebar_page_list()
-            self.update_top_bar_page_name()
             self.update_window_title()
-            
-            messagebox.showinfo("Success", f"Notebook loaded successfully from:\n{filepath}")
-            
-        except Exception as e:
-            messagebox.showerror("Load Error", f"Failed to load notebook:\n{str(e)}")
-            # Restore default state
-            self.new_notebook()
+            return
+        
+        self.view.forget()
+        self.page_pool.release_all()
+        self.pages = rollback["pages"]
+        self.current_file = rollback["current_file"]
+        self.file_mtime = rollback["file_mtime"]
+        self.modified = rollback["modified"]
+        
+        left = rollback["left"]
+        self.current_left_page_index = left
+        self.current_right_page_index = left + 1
+        self.view.show(spread=(self.get_current_left_page(), self.get_current_right_page()))
+        
+        self.update_navigation()
+        self.update_sidebar_page_list()
+        self.update_top_bar_page_name()
+        self.update_window_title()
     
     def migrate_data(self, data):
         """Migrate data from older versions to current format"""
         version = data.get("version", 1)
+        data = self.migrate_header(data)
+        for page in data.get("pages", []):
+            self.migrate_page(page, version)
+        return data
+    
+    def migrate_header(self, data):
+        """Migrate the notebook header (everything but the pages)"""
+        version = data.get("version", 1)
         
         # Version 1 -> 2 migration
         if version == 1:
-            print("Migrating from version 1 to 2")
+            LOG.info("Migrating from version 1 to 2")
             data["version"] = 2
             
             # Add missing fields
@@ -3292,28 +7936,32 @@ class NotebookApp:
                     "modified": datetime.now().isoformat(),
                     "app_version": "1.0"
                 }
-            
-            # Ensure pages have proper structure
-            for page in data.get("pages", []):
-                # Add missing fields
-                if "is_left_page" not in page:
-                    page["is_left_page"] = (page.get("page_number", 0) % 2 == 0)
-                
-                # Migrate text widgets if needed
-                for textbox in page.get("textboxes", []):
-                    # Ensure text field has segments structure
-                    if "text" in textbox and isinstance(textbox["text"], str):
-                        # Convert plain text to segments format
-                        textbox["text"] = {
-                            "content": textbox["text"],
-                            "segments": [{
-                                "text": textbox["text"],
-                                "tags": []
-                            }]
-                        }
         
         return data
     
+    def migrate_page(self, page, version):
+        """Migrate one page saved with the given notebook version"""
+        # Version 1 -> 2 migration
+        if version == 1:
+            # Add missing fields
+            if "is_left_page" not in page:
+                page["is_left_page"] = (page.get("page_number", 0) % 2 == 0)
+            
+            # Migrate text widgets if needed
+            for textbox in page.get("textboxes", []):
+                # Ensure text field has segments structure
+                if "text" in textbox and isinstance(textbox["text"], str):
+                    # Convert plain text to segments format
+                    textbox["text"] = {
+                        "content": textbox["text"],
+                        "segments": [{
+                            "text": textbox["text"],
+                            "tags": []
+                        }]
+                    }
+        
+        return page
+    
     def get_notebook_data(self):
         """Serialize the entire notebook state"""
         notebook_data = {
@@ -3322,19 +7970,24 @@ class NotebookApp:
                 "created": datetime.now().isoformat(),
                 "modified": datetime.now().isoformat(),
                 "app_version": "1.0",
-                "min_compatible_version": 1
+                "min_compatible_version": 1,
+                "last_viewed_page": self.current_left_page_index
             },
             "pages": []
         }
         
-        # Serialize all pages
+        # Serialize all pages (saves and merges wait until a streaming load is done)
         for page in self.pages:
             notebook_data["pages"].append(page.serialize())
         
         return notebook_data
     
-    def prepare_images_for_saving(self, notebook_data, save_path):
-        """Prepare images for saving - copy to notebook directory"""
+    def prepare_images_for_saving(self, notebook_data, save_path, task=None, created=None):
+        """Prepare images for saving - copy to notebook directory
+        
+        Runs on the save worker: checks task for cancellation and records the
+        copies it makes in created so a cancelled save can remove them.
+        """
         save_dir = os.path.dirname(save_path)
         images_dir = os.path.join(save_dir, "images")
         
@@ -3348,6 +8001,8 @@ class NotebookApp:
         # Process all images in notebook
         for page_data in notebook_data["pages"]:
             for image_data in page_data["images"]:
+                if task is not None:
+                    task.check_cancelled()
                 original_path = image_data["image_path"]
                 
                 # Skip if already processed
@@ -3360,8 +8015,11 @@ class NotebookApp:
                 # Generate new filename with hash
                 import hashlib
                 try:
+                    digest = hashlib.md5()
                     with open(original_path, 'rb') as f:
-                        file_hash = hashlib.md5(f.read()).hexdigest()[:8]
+                        for block in iter(lambda: f.read(1 << 20), b""):
+                            digest.update(block)
+                    file_hash = digest.hexdigest()[:8]
                 except:
                     # Fallback to random name if can't read
                     import random
@@ -3377,9 +8035,11 @@ class NotebookApp:
                 if not os.path.exists(new_abs_path):
                     try:
                         shutil.copy2(original_path, new_abs_path)
-                        print(f"Copied image: {original_path} -> {new_abs_path}")
+                        if created is not None:
+                            created.append(new_abs_path)
+                        LOG.debug("Copied image: {source} -> {target}", source=original_path, target=new_abs_path)
                     except Exception as e:
-                        print(f"Warning: Could not copy image {original_path}: {e}")
+                        LOG.warning("Could not copy image {path}: {error}", path=original_path, error=e)
                         # Keep original path
                         new_abs_path = original_path
                         rel_path = original_path
@@ -3390,9 +8050,7 @@ class NotebookApp:
                 
                 image_map[original_path] = (rel_path, new_abs_path)
         
-        # Cleanup unused images in images directory
-        self.cleanup_unused_images(notebook_data, save_path)
-        
+        # Unused images are cleaned up by the caller once the save has gone through
         return notebook_data
 
     def cleanup_unused_images(self, notebook_data, save_path):
@@ -3416,9 +8074,9 @@ class NotebookApp:
             if filename not in referenced:
                 try:
                     os.remove(os.path.join(images_dir, filename))
-                    print(f"Removed unused image: {filename}")
+                    LOG.debug("Removed unused image: {name}", name=filename)
                 except Exception as e:
-                    print(f"Failed to remove {filename}: {e}")
+                    LOG.warning("Failed to remove {name}: {error}", name=filename, error=e)
 
     def restore_image_paths(self, notebook_data, load_path):
         """Convert relative paths back to absolute when loading"""
@@ -3434,18 +8092,20 @@ class NotebookApp:
                         if os.path.exists(abs_path):
                             image_data["image_path"] = abs_path
                         else:
-                            print(f"Warning: Image not found: {abs_path}")
+                            LOG.warning("Image not found: {path}", path=abs_path)
     
     def clear_all_pages(self):
         """Clear all pages and widgets"""
-        for page in self.pages:
-            page.clear()
-            page.frame.destroy()
+        self.view.forget()
+        self.page_pool.release_all()
         self.pages = []
     
     def run(self):
+        self.latency.start()
         self.root.mainloop()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("--diff", "--merge", "--convert", "--leak-test"):
+        sys.exit(run_command_line(sys.argv[1:]))
     app = NotebookApp()
     app.run()
\ No newline at end of file